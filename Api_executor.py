@@ -1,4 +1,4 @@
-import json
+import json_codec
 import requests
 from llm_sequence_generator import LLMSequenceGenerator
 
@@ -28,15 +28,20 @@ class ApiExecutor:
                 payload = self.sequence_generator.generate_payload(details.get("requestBody", {}))
 
             response = self._make_request(method, url, payload)
-            print(f"{method} {url} → Status: {response.status_code}, Response: {response.json()}")
+            print(f"{method} {url} → Status: {response.status_code}, Response: {json_codec.loads(response.content)}")
 
     def _make_request(self, method, url, payload=None):
         """
         Make an HTTP request with optional payload.
         """
         try:
+            headers = self.headers
+            data = None
+            if payload is not None:
+                headers = {"Content-Type": json_codec.JSON_CONTENT_TYPE, **self.headers}
+                data = json_codec.dumps(payload)
             response = requests.request(
-                method, url, headers=self.headers, json=payload
+                method, url, headers=headers, data=data
             )
             response.raise_for_status()
             return response
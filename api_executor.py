@@ -1,73 +1,117 @@
-import asyncio
 import logging
-from api_executor import APIExecutor
-from workflow_manager import APIWorkflowManager
-from llm_sequence_generator import LLMSequenceGenerator
+
+import aiohttp
+
+from executor import execute_api
+from live_metrics import METRICS
+import profiler
+import json_codec
+from request_template import PATH_PARAMETER, RequestTemplate
+from request_tracing import RequestTracer
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
-class APIWorkflow:
-    def __init__(self, base_url, headers):
+class APIExecutor:
+    def __init__(self, base_url, headers, rate_limiter=None, validator=None, tracer: RequestTracer = None,
+                 sink=None, virtual_user: int = -1, tracker=None, auth=None, transports=None,
+                 recorder=None, api_map: dict = None):
         """
-        Initializes APIWorkflow and delegates execution to APIWorkflowManager.
+        Sends workflow requests over one shared, traced aiohttp session.
+
+        With an `api_map` (`OpenAPIParser` endpoints), each operation is compiled with its spec
+        parameters and their defaults, and path parameters the caller leaves out are filled with
+        the IDs of resources this executor created (`POST /pet` -> `GET /pet/{petId}`).
         """
-        self.api_executor = APIExecutor(base_url, headers)
-        self.workflow_manager = APIWorkflowManager(base_url, headers)
-        self.llm_generator = LLMSequenceGenerator()  # ✅ Initializes LLM payload generator
+        self.base_url = base_url
+        self.headers = headers
+        self.rate_limiter = rate_limiter
+        self.validator = validator
+        self.tracer = tracer or RequestTracer()  # ✅ Per-phase timings for every request
+        self.sink = sink  # optional ResultSink, one row per request
+        self.virtual_user = virtual_user
+        self.tracker = tracker  # optional teardown.ResourceTracker, journals every created resource
+        self.auth = auth  # optional AuthProvider, shared so tokens are fetched once
+        # ✅ Per base URL: None keeps the aiohttp HTTP/1.1 session, else e.g. a multiplexing HTTP2Transport
+        self.transport = transports.for_url(base_url) if transports is not None else None
+        self.recorder = recorder  # optional TrafficRecorder, for exact replays of this run
+        self.templates = {}  # "METHOD /path" -> RequestTemplate, compiled on first use
+        self.endpoints = {f"{details['method'].upper()} {details['path']}": details
+                          for details in (api_map or {}).values() if "method" in details and "path" in details}
+        self.id_slots = {}  # "METHOD /path" -> ((path parameter, collection path), ...)
+        self.created = {}  # collection path -> fields of the last resource created there
+        self.session = None
 
-    async def execute_api(self, method: str, endpoint: str, payload: dict = None, is_first_run=True):
+    def get_session(self):
         """
-        Executes an API request and tracks execution state.
+        Returns the shared session, opening it on first use (must be called inside the event loop).
         """
-        # ✅ Generate payload only for the first API call
-        if is_first_run and self.llm_generator:
-            payload = self.llm_generator.generate_payload(endpoint)  # ✅ This is where it's called
-        
-        else:
-            payload = self.prepare_payload(method, endpoint, payload)  # ✅ Used in subsequent runs
-
-        result = await self.api_executor.execute_api(method, endpoint, payload)
-        logging.info(f"Executed API: {method} {endpoint} -> {result}")
-        return result
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(trace_configs=[self.tracer.trace_config()])
+        return self.session
 
-    def prepare_payload(self, method, endpoint, original_payload):
+    async def execute_api(self, method: str, endpoint: str, payload: dict = None, params: dict = None):
         """
-        Modifies payload by replacing placeholders with actual values from previous API responses.
+        Executes one request; the result carries `status_code`, `response` and `timings`.
         """
-        if not original_payload:
-            return None
+        api_name = f"{method.upper()} {endpoint}"
+        template = self.templates.get(api_name)
+        METRICS.cache_lookup("request_template", template is not None)
+        if template is None:
+            details = self.endpoints.get(api_name, {"method": method, "path": endpoint})
+            template = self.templates[api_name] = RequestTemplate.from_endpoint(api_name, details, self.base_url,
+                                                                                self.headers)
+            self.id_slots[api_name] = _id_slots(endpoint)
+        params = self._fill_ids(api_name, template, params)
+        missing = [name for name in template.path_slots if name not in params and name not in template.defaults]
+        if missing:
+            logging.warning(f"⚠️ Skipping {api_name}: no value for path parameters {missing}")
+            return {"api": api_name, "status": 0, "status_code": 0, "response": None,
+                    "error": f"Missing path parameters {missing}"}
+        session = self.get_session() if self.transport is None else None
+        with profiler.span("request"):
+            result = await execute_api(self.base_url, api_name, {}, self.headers, self.rate_limiter, params,
+                                       session, template, validator=self.validator, tracer=self.tracer,
+                                       payload=payload, sink=self.sink, virtual_user=self.virtual_user,
+                                       auth=self.auth, transport=self.transport, recorder=self.recorder)
+        result["status_code"] = result["status"]
+        if template.method == "POST" and 200 <= result["status"] < 300:
+            self._remember(endpoint, result["response"], payload)
+        if self.tracker is not None:
+            self.tracker.record(api_name, result, payload, params)
+        return result
 
-        modified_payload = original_payload.copy()
-        for key, value in modified_payload.items():
-            if isinstance(value, str) and value.startswith("{{") and value.endswith("}}"):
-                placeholder = value.strip("{}")
-                stored_value = self.workflow_manager.execution_state.get_created_id(placeholder)
-                if stored_value:
-                    modified_payload[key] = stored_value
-        
-        return modified_payload
+    def _fill_ids(self, api_name, template, params):
+        """Adds the created IDs for path parameters the caller and the spec leave open."""
+        params = dict(params or {})
+        for name, collection in self.id_slots[api_name]:
+            if name in params or name in template.defaults:
+                continue
+            fields = self.created.get(collection)
+            if fields:
+                value = fields.get(name, fields.get("id"))
+                if value is not None:
+                    params[name] = value
+        return params
 
-    async def run_workflow(self, api_sequence):
-        """
-        Runs the API execution workflow using APIWorkflowManager.
-        """
-        logging.info(f"Starting workflow execution for {len(api_sequence)} APIs.")
-        return await self.workflow_manager.execute_workflow(api_sequence)
+    def _remember(self, path, response, payload):
+        fields = dict(payload) if isinstance(payload, dict) else {}
+        if isinstance(response, (str, bytes)) and response:
+            try:
+                response = json_codec.loads(response)
+            except ValueError:
+                response = None
+        if isinstance(response, dict):
+            fields.update(response)
+        if fields:
+            self.created[path] = fields
 
-# Example Usage
-if __name__ == "__main__":
-    base_url = "https://petstore.swagger.io/v2"
-    headers = {"Content-Type": "application/json"}
-    
-    api_workflow = APIWorkflow(base_url, headers)
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
 
-    api_sequence = [
-        "POST /pet",
-        "GET /pet/{id}",
-        "PUT /pet/{id}",
-        "DELETE /pet/{id}"
-    ]
 
-    asyncio.run(api_workflow.run_workflow(api_sequence))
-    
+def _id_slots(path: str) -> tuple:
+    """`/owners/{ownerId}/pets/{petId}` -> `(("ownerId", "/owners"), ("petId", "/owners/{ownerId}/pets"))`."""
+    return tuple((match.group(1), path[:match.start()].rstrip("/")) for match in PATH_PARAMETER.finditer(path))
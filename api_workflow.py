@@ -2,38 +2,54 @@ import asyncio
 import time  # ✅ Added for execution time tracking
 import logging
 from api_executor import APIExecutor
+from data_feeders import bind
 from workflow_manager import APIWorkflowManager
 from llm_sequence_generator import LLMSequenceGenerator
+from profiler import Profiler, span
+from traffic_recorder import TrafficRecorder
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
 class APIWorkflow:
-    def __init__(self, base_url, headers):
+    def __init__(self, base_url, headers, feeder=None, llm_generator=None):
         """
         Initializes APIWorkflow and delegates execution to APIWorkflowManager.
+        With a DataFeeder, each call takes the next record for `{{column}}` payload slots and path parameters.
+        `llm_generator=False` skips LLM payloads (e.g. for benchmarks against the mock server).
         """
+        self.base_url = base_url
         self.api_executor = APIExecutor(base_url, headers)
+        self.feeder = feeder
         self.workflow_manager = APIWorkflowManager(base_url, headers)
-        self.llm_generator = LLMSequenceGenerator()  # ✅ Initializes LLM payload generator
+        self.llm_generator = LLMSequenceGenerator() if llm_generator is None else llm_generator  # ✅ LLM payloads
 
-    async def execute_api(self, method: str, endpoint: str, payload: dict = None, is_first_run=True):
+    async def execute_api(self, method: str, endpoint: str, payload: dict = None, is_first_run=True, executor=None):
         """
         Executes an API request, tracks execution time, and logs the result.
+        `executor` overrides `self.api_executor`, e.g. one per session with its own teardown tracker.
         """
-        start_time = time.time()  # ✅ Start execution timer
+        payload_start = time.perf_counter_ns()  # ✅ Payload generation is timed separately
 
-        # ✅ Generate payload only for the first API call
-        if is_first_run and self.llm_generator:
-            payload = self.llm_generator.generate_payload(endpoint)  # ✅ LLM-generated payload
-        
-        else:
-            payload = self.prepare_payload(method, endpoint, payload)  # ✅ Placeholder resolution
+        with span("payload"):
+            # ✅ Generate payload only for the first API call
+            if is_first_run and self.llm_generator:
+                payload = self.llm_generator.generate_payload(endpoint)  # ✅ LLM-generated payload
+
+            else:
+                payload = self.prepare_payload(method, endpoint, payload)  # ✅ Placeholder resolution
         
-        result = await self.api_executor.execute_api(method, endpoint, payload)
-        result["execution_time"] = round(time.time() - start_time, 2)  # ✅ Calculate execution time
+            record = self.feeder.next_record() if self.feeder else None
+            if record:
+                payload = bind(payload, record)  # ✅ Test data from our own datasets
 
-        logging.info(f"✅ Executed {method} {endpoint} in {result['execution_time']}s -> Response: {result}")
+        request_start = time.perf_counter_ns()
+        result = await (executor or self.api_executor).execute_api(method, endpoint, payload, record)
+        result["execution_time"] = (time.perf_counter_ns() - request_start) / 1e9  # ✅ Request only, in seconds
+        result["payload_time"] = (request_start - payload_start) / 1e9
+
+        logging.info(f"✅ Executed {method} {endpoint} in {result['execution_time'] * 1000:.3f}ms "
+                     f"{result.get('timings', {})} -> Status: {result['status_code']}")
         return result
 
     def prepare_payload(self, method, endpoint, original_payload):
@@ -53,12 +69,35 @@ class APIWorkflow:
         
         return modified_payload
 
-    async def run_workflow(self, api_sequence):
+    async def run_workflow(self, api_sequence, profile: str = None, sample_interval: float = None,
+                           record: str = None, spec: dict = None):
         """
         Runs the API execution workflow using APIWorkflowManager.
+        With `profile` (an output path prefix), stage timings and optional stack samples are written there.
+        With `record` (a .jsonl or .jsonl.gz path), every request is recorded for `TrafficReplayer`;
+        pass the OpenAPI `spec` so headers carrying its API keys are redacted too.
         """
         logging.info(f"🚀 Starting workflow execution for {len(api_sequence)} APIs.")
-        return await self.workflow_manager.execute_workflow(api_sequence)
+        recorder = TrafficRecorder(record, self.base_url, spec=spec) if record else None
+        executors = (self.api_executor, self.workflow_manager.api_executor)
+        if recorder is not None:
+            for executor in executors:
+                executor.recorder = recorder
+        try:
+            if not profile:
+                return await self.workflow_manager.execute_workflow(api_sequence)
+
+            run_profiler = Profiler(sample_interval).start()
+            try:
+                return await self.workflow_manager.execute_workflow(api_sequence)
+            finally:
+                run_profiler.stop()
+                run_profiler.write(profile)
+        finally:
+            if recorder is not None:
+                recorder.close()
+                for executor in executors:
+                    executor.recorder = None
 
 # Example Usage
 if __name__ == "__main__":
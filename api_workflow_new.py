@@ -19,11 +19,12 @@ class APIWorkflow:
         """
         Executes an API request, tracks execution time, and logs the result.
         """
-        start_time = time.time()
+        start_time = time.perf_counter_ns()
         result = await self.api_executor.execute_api(method, endpoint, payload)
-        result["execution_time"] = round(time.time() - start_time, 2)
+        result["execution_time"] = (time.perf_counter_ns() - start_time) / 1e9
 
-        logging.info(f"✅ Executed {method} {endpoint} in {result['execution_time']}s -> Response: {result}")
+        logging.info(f"✅ Executed {method} {endpoint} in {result['execution_time'] * 1000:.3f}ms "
+                     f"{result.get('timings', {})} -> Status: {result['status_code']}")
         return result
 
     async def run_workflow(self, api_sequence):
@@ -0,0 +1,327 @@
+import asyncio
+import base64
+import concurrent.futures
+import logging
+import threading
+import time
+from typing import NamedTuple
+from urllib.parse import quote_plus
+
+import json_codec
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+HTTP_METHODS = {"get", "put", "post", "delete", "options", "head", "patch", "trace"}
+
+
+class TokenFetchError(Exception):
+    """The token endpoint refused or could not be reached."""
+
+
+class Token(NamedTuple):
+    value: str
+    expires_at: float
+    refresh_at: float
+
+
+class StaticCredential:
+    """A secret that never changes (API key, basic credentials, long-lived bearer token)."""
+
+    def __init__(self, value: str):
+        self._value = value
+
+    async def value(self) -> str:
+        return self._value
+
+    def invalidate(self, value: str = None):
+        pass  # nothing to refresh
+
+
+class ClientCredentials:
+    """
+    OAuth2 client-credentials token shared by every coroutine, thread and event loop.
+
+    The cached token is returned without awaiting anything until `refresh_margin` of its
+    lifetime is left; from then on one background refresh is started while callers keep
+    using the still-valid token. Only a missing or expired token makes callers wait, and
+    they all wait on the same (single-flight) fetch. A failed background refresh is retried
+    after `retry_interval` as long as the old token is valid.
+
+    `fetch` (an async callable returning the token response dict) replaces the built-in
+    form POST, e.g. for identity providers with extra parameters.
+    """
+
+    def __init__(self, token_url: str, client_id: str, client_secret: str, scopes=(), audience: str = None,
+                 auth_method: str = "basic", refresh_margin: float = 0.2, retry_interval: float = 5.0,
+                 default_expires_in: float = 3600.0, fetch=None, clock=time.monotonic):
+        if auth_method not in ("basic", "post"):
+            raise ValueError(f"Unknown client authentication method: {auth_method}")
+        self.token_url = token_url
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.scopes = list(scopes)
+        self.audience = audience
+        self.auth_method = auth_method
+        self.refresh_margin = refresh_margin
+        self.retry_interval = retry_interval
+        self.default_expires_in = default_expires_in
+        self.fetch = fetch or self._post
+        self.clock = clock
+        self.fetches = 0
+        self._token = None
+        self._lock = threading.Lock()
+        self._inflight = None  # concurrent.futures.Future of the running fetch
+        self._task = None
+        self._failure = None  # (retry after, error) while the token endpoint is failing and no token is left
+
+    async def value(self) -> str:
+        token, now = self._token, self.clock()
+        if token is not None and now < token.refresh_at:
+            return token.value  # hot path: no lock, no await
+        if token is not None and now < token.expires_at:
+            self._refresh()  # refresh ahead of expiry; this request still uses the current token
+            return token.value
+        failure = self._failure
+        if failure is not None and now < failure[0]:
+            raise failure[1]  # fail fast instead of queueing every request behind a dead endpoint
+        # shielded: a caller that gives up (timeout, cancelled task) must not cancel everyone's fetch
+        return await asyncio.shield(asyncio.wrap_future(self._refresh()))
+
+    def invalidate(self, value: str = None):
+        """Drops the token after a 401; a stale `value` (already replaced) is ignored."""
+        with self._lock:
+            if self._token is not None and (value is None or self._token.value == value):
+                self._token = None
+
+    def _refresh(self) -> concurrent.futures.Future:
+        with self._lock:
+            if self._inflight is None:
+                self._inflight = concurrent.futures.Future()
+                self._task = asyncio.get_running_loop().create_task(self._run(self._inflight))
+            return self._inflight
+
+    async def _run(self, future):
+        started = self.clock()
+        try:
+            response = await self.fetch()
+            self.fetches += 1
+            value = response["access_token"]
+            expires_in = float(response.get("expires_in") or self.default_expires_in)
+        except Exception as e:
+            error = e if isinstance(e, TokenFetchError) else TokenFetchError(str(e))
+            with self._lock:
+                token = self._token
+                if token is not None and started < token.expires_at:
+                    # keep serving the old token and try again shortly
+                    self._token = token._replace(refresh_at=min(token.expires_at, started + self.retry_interval))
+                else:
+                    self._failure = (self.clock() + self.retry_interval, error)
+                self._inflight = None
+            logging.warning(f"⚠️ Token refresh from {self.token_url} failed: {e}")
+            future.set_exception(error)
+            return
+        except BaseException:
+            # e.g. the fetch's event loop ended: nothing is cached and the next caller starts a new fetch
+            with self._lock:
+                self._inflight = None
+            if not future.done():
+                future.set_exception(TokenFetchError(f"Token refresh from {self.token_url} was interrupted"))
+            raise
+        token = Token(value, started + expires_in, started + expires_in * (1 - self.refresh_margin))
+        with self._lock:
+            self._token = token
+            self._inflight = self._failure = None
+        logging.info(f"🔑 Fetched a token from {self.token_url}, valid for {expires_in:.0f}s")
+        future.set_result(value)
+
+    async def _post(self) -> dict:
+        import aiohttp
+
+        form = {"grant_type": "client_credentials"}
+        if self.scopes:
+            form["scope"] = " ".join(self.scopes)
+        if self.audience:
+            form["audience"] = self.audience
+        headers = {"Accept": "application/json"}
+        if self.auth_method == "basic":
+            secret = f"{quote_plus(self.client_id)}:{quote_plus(self.client_secret)}".encode("utf-8")
+            headers["Authorization"] = "Basic " + base64.b64encode(secret).decode("ascii")
+        else:
+            form.update(client_id=self.client_id, client_secret=self.client_secret)
+
+        async with aiohttp.ClientSession() as session:
+            async with session.post(self.token_url, data=form, headers=headers) as response:
+                body = await response.read()
+                if response.status != 200:
+                    raise TokenFetchError(f"{response.status} from token endpoint: {body[:200]!r}")
+                return json_codec.loads(body)
+
+
+class SecurityScheme:
+    """Where one scheme's credential goes: a header, query parameter or cookie, with an optional prefix."""
+
+    __slots__ = ("name", "location", "field", "prefix", "credential")
+
+    def __init__(self, name, location, field, prefix, credential):
+        self.name = name
+        self.location = location
+        self.field = field
+        self.prefix = prefix
+        self.credential = credential
+
+    async def apply(self, headers: dict, query: list):
+        value = await self.credential.value()
+        if self.location == "header":
+            headers[self.field] = self.prefix + value
+        elif self.location == "query":
+            query.append(f"{quote_plus(self.field)}={quote_plus(value)}")
+        else:
+            cookie = f"{self.field}={value}"
+            headers["Cookie"] = f"{headers['Cookie']}; {cookie}" if headers.get("Cookie") else cookie
+
+    def sent_value(self, request):
+        """The credential a rejected request carried (header schemes only)."""
+        if self.location != "header":
+            return None
+        sent = request.headers.get(self.field, "")
+        return sent[len(self.prefix):] if sent.startswith(self.prefix) else None
+
+
+def build_scheme(name: str, definition: dict, config) -> SecurityScheme:
+    """
+    Turns a `securitySchemes` (or Swagger 2 `securityDefinitions`) entry plus our secrets into a scheme.
+
+    `config` is a credential object or a dict: `{"value": ...}` for apiKey, `{"username", "password"}`
+    for basic, `{"token": ...}` for bearer, `{"client_id", "client_secret", "scopes"?, "token_url"?}`
+    for oauth2 / openIdConnect.
+    """
+    kind = definition.get("type")
+    scheme = (definition.get("scheme") or "").lower()
+    if kind == "apiKey":
+        credential = _credential(config, lambda: StaticCredential(config["value"]))
+        return SecurityScheme(name, definition.get("in", "header"), definition["name"], "", credential)
+    if kind == "basic" or (kind == "http" and scheme == "basic"):
+        def basic():
+            secret = f"{config['username']}:{config['password']}".encode("utf-8")
+            return StaticCredential(base64.b64encode(secret).decode("ascii"))
+        return SecurityScheme(name, "header", "Authorization", "Basic ", _credential(config, basic))
+    if kind == "http":
+        prefix = "Bearer " if scheme == "bearer" else f"{definition.get('scheme', '')} "
+        return SecurityScheme(name, "header", "Authorization", prefix,
+                              _credential(config, lambda: StaticCredential(config["token"])))
+    if kind in ("oauth2", "openIdConnect"):
+        def client_credentials():
+            flows = definition.get("flows", {})
+            flow = flows.get("clientCredentials") or (definition if definition.get("flow") == "application" else {})
+            token_url = config.get("token_url") or flow.get("tokenUrl")
+            if not token_url:
+                raise ValueError(f"Security scheme '{name}' has no client-credentials token URL; set 'token_url'")
+            scopes = config.get("scopes", list(flow.get("scopes", {})))
+            options = {key: value for key, value in config.items()
+                       if key not in ("token_url", "client_id", "client_secret", "scopes")}
+            return ClientCredentials(token_url, config["client_id"], config["client_secret"], scopes, **options)
+        return SecurityScheme(name, "header", "Authorization", "Bearer ", _credential(config, client_credentials))
+    raise ValueError(f"Unsupported security scheme '{name}' of type {kind!r}")
+
+
+def _credential(config, build):
+    return build() if isinstance(config, dict) else config
+
+
+class AuthProvider:
+    """
+    Signs requests with the credentials the spec asks for.
+
+    Schemes come from the spec's `securitySchemes`; secrets from `credentials`
+    (scheme name -> config, see `build_scheme`). Each operation uses the first of its
+    `security` alternatives (else the document's) whose schemes are all configured. One
+    provider is meant to be shared by every virtual user and worker, so each token is
+    fetched once and refreshed in the background before it expires.
+    """
+
+    def __init__(self, schemes: dict = None, credentials: dict = None, security: list = None,
+                 operations: dict = None):
+        self.schemes = {}
+        for name, config in (credentials or {}).items():
+            if name not in (schemes or {}):
+                raise ValueError(f"No security scheme named '{name}' in the spec")
+            self.schemes[name] = build_scheme(name, schemes[name], config)
+        self.security = security  # document-wide requirement alternatives
+        self.operations = operations or {}  # operation name -> its own requirement alternatives
+        self._selected = {}  # operation name -> schemes to apply
+
+    @classmethod
+    def from_parser(cls, parser, credentials: dict):
+        spec = parser.spec
+        if not spec:
+            parser.load_openapi_spec()
+            spec = parser.spec
+        return cls(credentials=credentials, **cls.security_from_spec(spec))
+
+    @staticmethod
+    def security_from_spec(spec: dict) -> dict:
+        """The spec's `schemes`, document `security` and per-operation requirements, as plain data."""
+        schemes = spec.get("components", {}).get("securitySchemes", spec.get("securityDefinitions", {}))
+        operations = {}
+        for path, methods in spec.get("paths", {}).items():
+            for method, details in methods.items():
+                if method in HTTP_METHODS and isinstance(details, dict) and "security" in details:
+                    operations[f"{method.upper()} {path}"] = details["security"]
+                    if "operationId" in details:
+                        operations[details["operationId"]] = details["security"]
+        return {"schemes": schemes, "security": spec.get("security"), "operations": operations}
+
+    def schemes_for(self, api_name: str = None) -> tuple:
+        selected = self._selected.get(api_name)
+        if selected is None:
+            selected = self._selected[api_name] = self._select(self.operations.get(api_name, self.security))
+        return selected
+
+    def _select(self, alternatives):
+        if alternatives is None:  # the spec says nothing: send everything we have
+            return tuple(self.schemes.values())
+        for requirement in alternatives:
+            if all(name in self.schemes for name in requirement):
+                return tuple(self.schemes[name] for name in requirement)  # `{}` means anonymous access
+        if alternatives:
+            logging.warning(f"⚠️ No configured credentials satisfy {alternatives}; sending the request unsigned")
+        return ()
+
+    async def authorize(self, request, api_name: str = None):
+        """Returns a copy of the `PreparedRequest` carrying the operation's credentials."""
+        schemes = self.schemes_for(api_name)
+        if not schemes:
+            return request
+        headers, query = dict(request.headers), []
+        for scheme in schemes:
+            await scheme.apply(headers, query)
+        url = request.url
+        if query:
+            url = f"{url}{'&' if '?' in url else '?'}{'&'.join(query)}"
+        return request._replace(url=url, headers=headers)
+
+    def rejected(self, request, api_name: str = None):
+        """Call on a 401: drops the tokens the request carried so the next request fetches fresh ones."""
+        for scheme in self.schemes_for(api_name):
+            scheme.credential.invalidate(scheme.sent_value(request))
+
+
+def add_auth_arguments(cli):
+    """The `--spec`/`--credentials` options shared by the command-line tools."""
+    cli.add_argument("--spec", help="OpenAPI file declaring the security schemes (with --credentials)")
+    cli.add_argument("--credentials", help="YAML/JSON file: security scheme name -> secrets (see build_scheme)")
+
+
+def auth_from_args(args):
+    """An `AuthProvider` from `add_auth_arguments` options, or None when no credentials were given."""
+    if not args.credentials:
+        return None
+    if not args.spec:
+        raise ValueError("--credentials needs --spec to know the security schemes")
+    import yaml
+    from openapi_parser import OpenAPIParser
+
+    with open(args.credentials, "r", encoding="utf-8") as file:
+        credentials = yaml.safe_load(file) or {}
+    return AuthProvider.from_parser(OpenAPIParser(args.spec), credentials)
@@ -0,0 +1,414 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import yaml
+
+import json_codec
+from live_metrics import LiveMetrics
+from mock_server import MockAPIServer
+from openapi_parser import OpenAPIParser
+from payload_generator import generate_payload
+from request_template import RequestTemplate
+from response_validator import ResponseValidator
+from scenarios import AliasTable
+from sequence_planner import SequencePlanner
+from spec_generator import SyntheticSpecGenerator
+
+# Configure logging
+logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(levelname)s - %(message)s")
+
+BENCHMARKS = {}  # name -> benchmark function
+
+
+class SkipBenchmark(Exception):
+    """Raised by a benchmark whose optional dependencies are not installed."""
+
+
+def benchmark(name):
+    """Register a benchmark function under `name`."""
+    def register(fn):
+        BENCHMARKS[name] = fn
+        return fn
+    return register
+
+
+def measure(fn, repeat=5, min_time=0.2):
+    """
+    Times `fn` like `timeit`: calibrates a loop count that runs for at least `min_time`,
+    then reports per-call timings across `repeat` rounds.
+    """
+    fn()  # warm-up
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - start >= min_time or number >= 1_000_000:
+            break
+        number *= 2
+
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        rounds.append((time.perf_counter() - start) / number)
+    median = statistics.median(rounds)
+    return {"seconds_per_op": median, "best_s": min(rounds), "ops_per_sec": 1 / median if median else None,
+            "loops": number, "repeat": repeat}
+
+
+def synthetic_spec(scale, **overrides):
+    """
+    Builds a synthetic spec with roughly `100 * scale` operations.
+    """
+    settings = {"paths": 50 * scale, "methods_per_path": 2, "components": 25 * scale, "seed": 0}
+    settings.update(overrides)
+    return SyntheticSpecGenerator(**settings).generate()
+
+
+def _write_spec(spec):
+    handle = tempfile.NamedTemporaryFile("w", suffix=".yaml", delete=False)
+    with handle:
+        yaml.safe_dump(spec, handle, sort_keys=False)
+    return handle.name
+
+
+# --------------------------
+# Benchmarks
+# --------------------------
+
+@benchmark("parser.load_openapi_spec")
+def bench_load_spec(scale):
+    path = _write_spec(synthetic_spec(scale))
+    try:
+        result = measure(lambda: OpenAPIParser(path).load_openapi_spec(), repeat=3)
+    finally:
+        os.unlink(path)
+    return result
+
+
+@benchmark("parser.resolve_schema")
+def bench_resolve_schema(scale):
+    spec = synthetic_spec(scale)
+    names = list(spec["components"]["schemas"])
+
+    def resolve_all():
+        parser = OpenAPIParser("<memory>")  # fresh parser so memoised resolutions are not reused
+        parser.load_openapi_dict(spec)
+        for name in names:
+            parser.resolve_schema(name)
+
+    result = measure(resolve_all)
+    result["schemas"] = len(names)
+    return result
+
+
+@benchmark("parser.extract_api_endpoints")
+def bench_extract_endpoints(scale):
+    return _extract_endpoints(synthetic_spec(scale))
+
+
+@benchmark("parser.extract_api_endpoints[cyclic]")
+def bench_extract_endpoints_cyclic(scale):
+    return _extract_endpoints(synthetic_spec(scale, cycle_ratio=0.2))
+
+
+def _extract_endpoints(spec):
+    def extract():
+        parser = OpenAPIParser("<memory>")
+        parser.load_openapi_dict(spec)
+        return parser.extract_api_endpoints()
+
+    result = measure(extract, repeat=3)
+    result["operations"] = len(extract())
+    return result
+
+
+@benchmark("payload_generator.generate_payload")
+def bench_payload_generator(scale):
+    spec = synthetic_spec(scale)  # acyclic: resolve_ref has no cycle guard
+    components = spec["components"]["schemas"]
+    refs = [{"$ref": f"#/components/schemas/{name}"} for name in components]
+
+    def generate_all():
+        for ref in refs:
+            generate_payload(ref, components)
+
+    result = measure(generate_all)
+    result["payloads_per_sec"] = len(refs) * result["ops_per_sec"]
+    return result
+
+
+@benchmark("executor.requests_per_sec")
+def bench_executor(scale):
+    try:
+        import aiohttp
+        from executor import execute_api
+    except ImportError as e:
+        raise SkipBenchmark(f"executor dependencies missing: {e}")
+
+    spec = synthetic_spec(1, paths=10, components=5)
+    parser = OpenAPIParser("<memory>")
+    parser.load_openapi_dict(spec)
+    server = MockAPIServer(parser.extract_api_endpoints(), seed=1)
+    total, concurrency = 500 * scale, 50
+
+    async def run():
+        async with server, aiohttp.ClientSession() as session:
+            semaphore = asyncio.Semaphore(concurrency)
+            template = RequestTemplate.from_endpoint("GET /resource0", {"payload": None}, server.base_url)
+
+            async def call(i):
+                async with semaphore:
+                    await execute_api(server.base_url, "GET /resource0", {}, {}, session=session, template=template)
+
+            start = time.perf_counter()
+            await asyncio.gather(*[call(i) for i in range(total)])
+            return time.perf_counter() - start
+
+    elapsed = asyncio.run(run())
+    return {"seconds_per_op": elapsed / total, "ops_per_sec": total / elapsed, "requests": total,
+            "concurrency": concurrency}
+
+
+@benchmark("json.encode_decode")
+def bench_json_codec(scale):
+    spec = synthetic_spec(scale)
+    parser = OpenAPIParser("<memory>")
+    parser.load_openapi_dict(spec)
+    payloads = [parser.resolve_schema(name) for name in spec["components"]["schemas"]]
+
+    def round_trip():
+        for payload in payloads:
+            json_codec.loads(json_codec.dumps(payload))
+
+    result = measure(round_trip)
+    result["codec"] = json_codec.codec.name
+    result["payloads"] = len(payloads)
+    return result
+
+
+@benchmark("validator.validate_response")
+def bench_validate_response(scale):
+    parser = OpenAPIParser("<memory>")
+    parser.load_openapi_dict(synthetic_spec(scale, cycle_ratio=0.2))
+    validator = ResponseValidator(parser)
+    responses = [(name, int(status), json_codec.dumps(body))
+                 for name, endpoint in parser.extract_api_endpoints().items()
+                 for status, body in endpoint["responses"].items() if status.isdigit() and body is not None]
+
+    def validate_all():
+        for response in responses:
+            validator.validate(*response)
+
+    result = measure(validate_all)
+    result["seconds_per_response"] = result["seconds_per_op"] / len(responses)
+    result["violations"] = sum(stats["violations"] for stats in validator.stats.values())
+    return result
+
+
+@benchmark("executor.render_request")
+def bench_render_request(scale):
+    template = RequestTemplate(
+        "GET /store/{storeId}/pet/{petId}", "GET", "/store/{storeId}/pet/{petId}",
+        [{"name": "storeId", "in": "path"}, {"name": "petId", "in": "path"}, {"name": "limit", "in": "query"},
+         {"name": "X-Trace-Id", "in": "header"}],
+        "http://127.0.0.1:8080", {"Authorization": "Bearer token"},
+    )
+    params = [{"storeId": i % 7, "petId": i, "limit": 10, "X-Trace-Id": f"trace-{i}"} for i in range(1000 * scale)]
+
+    def render_all():
+        for values in params:
+            template.render(values)
+
+    result = measure(render_all)
+    result["seconds_per_request"] = result["seconds_per_op"] / len(params)
+    return result
+
+
+@benchmark("planner.plan_sequence")
+def bench_plan_sequence(scale):
+    parser = OpenAPIParser("<memory>")
+    parser.load_openapi_dict(synthetic_spec(scale * 10))
+    endpoints = parser.extract_api_endpoints()
+    planner = SequencePlanner()
+
+    result = measure(lambda: planner.plan(endpoints))
+    result["operations"] = len(endpoints)
+    return result
+
+
+@benchmark("scenarios.alias_sample")
+def bench_alias_sample(scale):
+    rng = random.Random(0)
+    table = AliasTable({f"op{i}": rng.randint(1, 100) for i in range(1000 * scale)})  # sampling cost is size-free
+    draws = 10_000
+
+    def sample_all():
+        for _ in range(draws):
+            table.sample(rng)
+
+    result = measure(sample_all)
+    result["seconds_per_sample"] = result["seconds_per_op"] / draws
+    result["operations"] = len(table)
+    return result
+
+
+@benchmark("metrics.record_request")
+def bench_record_request(scale):
+    metrics = LiveMetrics()
+    operations = [f"op{i % (10 * scale)}" for i in range(1000)]
+
+    def record_all():
+        for operation in operations:
+            metrics.request_finished(operation, 200, metrics.request_started(operation))
+
+    result = measure(record_all)
+    result["seconds_per_request"] = result["seconds_per_op"] / len(operations)
+    start = time.perf_counter()
+    metrics.render()
+    result["render_seconds"] = time.perf_counter() - start
+    return result
+
+
+@benchmark("workflow.execute_api")
+def bench_workflow(scale):
+    try:
+        from api_executor import APIExecutor
+        from api_workflow import APIWorkflow
+    except ImportError as e:
+        raise SkipBenchmark(f"workflow dependencies missing: {e}")
+
+    endpoints = {
+        "POST /pet": {"method": "POST", "path": "/pet", "responses": {"200": {"id": 1, "name": "doggie"}}},
+        "GET /store/inventory": {"method": "GET", "path": "/store/inventory", "responses": {"200": {"available": 1}}},
+    }
+    server = MockAPIServer(endpoints, seed=1)
+    calls = [("POST", "/pet", {"name": "doggie"}), ("GET", "/store/inventory", None)] * (100 * scale)
+
+    async def run():
+        async with server:
+            workflow = APIWorkflow(server.base_url, {}, llm_generator=False)
+            direct = APIExecutor(server.base_url, {})
+            senders = {"direct": direct.execute_api,
+                       "workflow": lambda method, path, payload: workflow.execute_api(method, path, payload,
+                                                                                      is_first_run=False)}
+            timings = {}
+            try:
+                for label, send in senders.items():
+                    await send(*calls[0])  # warm-up: opens the session and compiles the template
+                    start = time.perf_counter()
+                    for call in calls:
+                        await send(*call)
+                    timings[label] = time.perf_counter() - start
+            finally:
+                await workflow.api_executor.close()
+                await direct.close()
+            return timings
+
+    timings = asyncio.run(run())
+    per_request = timings["workflow"] / len(calls)
+    # The workflow layer's own cost: payload preparation, feeder, timing and logging on top of APIExecutor
+    return {"seconds_per_op": per_request, "ops_per_sec": 1 / per_request, "requests": len(calls),
+            "overhead_s_per_request": (timings["workflow"] - timings["direct"]) / len(calls)}
+
+
+@benchmark("graph.serialize_json")
+def bench_graph_serialization(scale):
+    try:
+        from graph_visualization_new import APIGraphVisualizer
+    except ImportError as e:
+        raise SkipBenchmark(f"networkx not installed: {e}")
+
+    visualizer = APIGraphVisualizer()
+    for i in range(500 * scale):
+        visualizer.add_api_dependency(f"GET /resource{i}", f"GET /resource{i + 1}")
+    return measure(visualizer.get_execution_graph_json)
+
+
+# --------------------------
+# Running & comparing
+# --------------------------
+
+def run_benchmarks(names=None, scale=1):
+    """
+    Runs the selected benchmarks and returns a JSON-serialisable report.
+    """
+    results = {}
+    for name, fn in BENCHMARKS.items():
+        if names and not any(pattern in name for pattern in names):
+            continue
+        try:
+            results[name] = fn(scale)
+        except SkipBenchmark as e:
+            results[name] = {"skipped": str(e)}
+        print(f"{name:40} {_describe(results[name])}", file=sys.stderr)
+    return {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                 "timestamp": time.time(), "scale": scale},
+        "results": results,
+    }
+
+
+def compare(baseline, candidate, threshold=0.10):
+    """
+    Compares `seconds_per_op` per benchmark and returns (rows, regressions).
+    """
+    rows, regressions = [], []
+    for name, result in candidate["results"].items():
+        before = baseline.get("results", {}).get(name, {}).get("seconds_per_op")
+        after = result.get("seconds_per_op")
+        if not before or not after:
+            continue
+        change = after / before - 1
+        rows.append({"benchmark": name, "baseline_s": before, "candidate_s": after, "change": change})
+        if change > threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def _describe(result):
+    if "skipped" in result:
+        return f"skipped ({result['skipped']})"
+    return f"{result['seconds_per_op'] * 1e6:12.1f} µs/op  {result['ops_per_sec']:12.1f} ops/s"
+
+
+def main(argv=None):
+    cli = argparse.ArgumentParser(description="Benchmark the parser, payload, executor and workflow hot paths.")
+    cli.add_argument("-k", "--filter", action="append", help="Only run benchmarks whose name contains this")
+    cli.add_argument("--scale", type=int, default=1, help="Multiply synthetic input sizes")
+    cli.add_argument("--output", help="Write the JSON report here (default: stdout)")
+    cli.add_argument("--baseline", help="Compare against a previous JSON report")
+    cli.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown before failing (0.10 = 10%%)")
+    args = cli.parse_args(argv)
+    logging.getLogger().setLevel(logging.WARNING)  # keep per-iteration parser logs out of the timings
+
+    report = run_benchmarks(args.filter, args.scale)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as file:
+        rows, regressions = compare(json.load(file), report, args.threshold)
+    for row in rows:
+        flag = "❌" if row["benchmark"] in regressions else "✅"
+        print(f"{flag} {row['benchmark']:40} {row['change']:+8.1%}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
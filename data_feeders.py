@@ -0,0 +1,210 @@
+import csv
+import io
+import logging
+import mmap
+import os
+import re
+import threading
+
+import json_codec
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".parquet": "parquet"}
+MODES = ("circular", "unique")
+PLACEHOLDER = re.compile(r"\{\{\s*([^{}]+?)\s*\}\}")
+
+
+class FeederExhausted(Exception):
+    """Raised by a `unique` feeder once every record of its partition has been handed out."""
+
+
+def bind(template, record: dict):
+    """
+    Fills `{{column}}` placeholders in a payload template from a record.
+
+    A string that is exactly one placeholder takes the column's value with its type
+    (`"{{age}}"` -> `42`); placeholders inside longer strings are interpolated. Unknown
+    names are left alone, so later steps (e.g. created-ID substitution) can still fill them.
+    Subtrees without placeholders are returned as-is, not copied.
+    """
+    if isinstance(template, str):
+        if "{{" not in template:
+            return template
+        whole = PLACEHOLDER.fullmatch(template)
+        if whole:
+            return record.get(whole.group(1), template)
+        return PLACEHOLDER.sub(lambda match: str(record[match.group(1)]) if match.group(1) in record
+                               else match.group(0), template)
+    if isinstance(template, dict):
+        bound = {key: bind(value, record) for key, value in template.items()}
+        return template if all(bound[key] is value for key, value in template.items()) else bound
+    if isinstance(template, list):
+        bound = [bind(value, record) for value in template]
+        return template if all(new is old for new, old in zip(bound, template)) else bound
+    return template
+
+
+class DataFeeder:
+    """
+    Streams test-data records (dicts) from CSV, JSONL or Parquet without loading the file.
+
+    CSV and JSONL files are memory-mapped and read line by line. `partition(user, users)`
+    gives each virtual user its own byte range (aligned to line starts), so partitions open
+    in O(1) and never overlap; Parquet is split by row group. In `circular` mode a feeder
+    restarts at the beginning of its partition; in `unique` mode every record is handed out
+    once (one shared feeder is also unique across users) and then `FeederExhausted` is raised.
+
+    CSV values are strings unless a `converters` entry (column -> callable) says otherwise.
+    CSV fields containing line breaks need an unpartitioned feeder.
+    """
+
+    def __init__(self, path: str, mode: str = "circular", format: str = None, columns=None, converters: dict = None,
+                 batch_size: int = 1024, virtual_user: int = 0, virtual_users: int = 1):
+        if mode not in MODES:
+            raise ValueError(f"Unknown feeder mode '{mode}'; expected one of {MODES}")
+        self.path = path
+        self.mode = mode
+        self.format = format or FORMATS.get(os.path.splitext(path)[1].lower())
+        if self.format not in ("csv", "jsonl", "parquet"):
+            raise ValueError(f"Unknown data format for '{path}'; expected one of {sorted(FORMATS)}")
+        self.columns = list(columns) if columns else None
+        self.converters = converters or {}
+        self.batch_size = batch_size
+        self.virtual_user = virtual_user
+        self.virtual_users = virtual_users
+        self.served = 0
+        self._lock = threading.Lock()
+        self._file = self._map = None
+        self._header = None
+        self._records = None
+
+    def partition(self, virtual_user: int, virtual_users: int) -> "DataFeeder":
+        """A feeder over this file's share for one virtual user."""
+        return DataFeeder(self.path, self.mode, self.format, self.columns, self.converters, self.batch_size,
+                          virtual_user, virtual_users)
+
+    # --------------------------
+    # Reading
+    # --------------------------
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> dict:
+        try:
+            return self.next_record()
+        except FeederExhausted:
+            raise StopIteration from None
+
+    def next_record(self) -> dict:
+        with self._lock:
+            if self._records is None:
+                self._records = self._read()
+            try:
+                record = next(self._records)
+            except StopIteration:
+                if self.mode == "unique" or not self.served:
+                    raise FeederExhausted(f"{self.path} (user {self.virtual_user}/{self.virtual_users}) "
+                                          f"has no more records") from None
+                self._records = self._read()  # circular: start over
+                record = next(self._records)
+            self.served += 1
+            return record
+
+    def _read(self):
+        if self.format == "parquet":
+            return self._read_parquet()
+        return self._read_lines()
+
+    def _open(self):
+        if self._map is None:
+            self._file = open(self.path, "rb")
+            size = os.fstat(self._file.fileno()).st_size
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        return self._map
+
+    def _range(self, data, first_line: int):
+        """Byte range `[start, end)` of this partition; a line belongs to the range its first byte is in."""
+        size = len(data) - first_line
+        start = first_line + size * self.virtual_user // self.virtual_users
+        end = first_line + size * (self.virtual_user + 1) // self.virtual_users
+        return start, end
+
+    def _lines(self, data, start, end, first_line):
+        if start > first_line:  # skip the line the previous partition started
+            newline = data.find(b"\n", start - 1)
+            start = len(data) if newline < 0 else newline + 1
+        position = start
+        while position < end:
+            newline = data.find(b"\n", position)
+            stop = len(data) if newline < 0 else newline
+            yield data[position:stop]
+            position = stop + 1
+
+    def _read_lines(self):
+        data = self._open()
+        first_line = 0
+        if self.format == "csv":
+            newline = data.find(b"\n")
+            header_end = len(data) if newline < 0 else newline + 1
+            if self._header is None:
+                self._header = next(csv.reader(io.StringIO(data[:header_end].decode("utf-8-sig"))), [])
+            first_line = header_end
+        start, end = self._range(data, first_line)
+        lines = self._lines(data, start, end, first_line)
+
+        if self.format == "jsonl":
+            for line in lines:
+                if line.strip():
+                    yield self._project(json_codec.loads(line))
+            return
+
+        header, converters = self._header, self.converters
+        for row in csv.reader(line.decode("utf-8") for line in lines):
+            if not row:
+                continue
+            record = dict(zip(header, row))
+            for column, convert in converters.items():
+                if column in record:
+                    record[column] = convert(record[column])
+            yield self._project(record)
+
+    def _read_parquet(self):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as error:
+            raise ImportError("Reading Parquet test data needs pyarrow; use .csv or .jsonl instead") from error
+
+        parquet = pq.ParquetFile(self.path, memory_map=True)
+        groups = parquet.num_row_groups
+        if groups >= self.virtual_users:
+            selected, stride = [g for g in range(groups) if g % self.virtual_users == self.virtual_user], 1
+        else:  # fewer row groups than users: stride over rows instead
+            selected, stride = list(range(groups)), self.virtual_users
+        index = 0
+        for batch in parquet.iter_batches(batch_size=self.batch_size, row_groups=selected, columns=self.columns):
+            for record in batch.to_pylist():
+                if stride == 1 or index % stride == self.virtual_user:
+                    yield record
+                index += 1
+
+    def _project(self, record):
+        if self.columns is None or not isinstance(record, dict):
+            return record
+        return {column: record.get(column) for column in self.columns}
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        if self._file is not None:
+            self._file.close()
+        self._file = self._map = None
+        self._records = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,564 @@
+import argparse
+import asyncio
+import hmac
+import logging
+import os
+import random
+import secrets
+import socket
+import subprocess
+import sys
+import time
+from time import perf_counter_ns
+
+import json_codec
+from histogram import LatencyHistogram
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+PROTOCOL_VERSION = 1
+MESSAGE_LIMIT = 64 * 1024 * 1024  # a plan carries the whole compiled spec on one line
+DEFAULT_PORT = 5557
+TOKEN_ENV = "DISTRIBUTED_TOKEN"  # the run token, for workers started without --token
+
+
+async def send_message(writer, message: dict):
+    """One message per line: newline-delimited JSON over TCP."""
+    writer.write(json_codec.dumps(message) + b"\n")
+    await writer.drain()
+
+
+async def read_message(reader) -> dict:
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("peer closed the connection")
+    return json_codec.loads(line)
+
+
+# --------------------------
+# Scenario
+# --------------------------
+
+class Scenario:
+    """
+    What the virtual users run: each loops over `sequence` for `duration` seconds (or
+    `iterations` times), starting `ramp_up` seconds apart in total. `endpoints` is the
+    `OpenAPIParser` output the request templates are compiled from; `payloads` and
+    `params` are fixed per operation, so workers never call the LLM. `rate` (requests
+    per second, all workers together) is optional. `data` (`DataFeeder` options, the file
+    at the same path on every host) gives each user its own partition of records, one per
+    loop, for path parameters and `{{column}}` payload slots. With `credentials`, every
+    worker builds one `AuthProvider` from `security` (see `AuthProvider.security_from_spec`)
+    that all its users share.
+
+    With a `mix` (see `scenarios.build_mix`), each loop runs one flow sampled from the
+    traffic mix instead of the whole `sequence`, and the summary reports the achieved
+    versus the target mix. Every user has its own seeded random stream.
+    """
+
+    def __init__(self, base_url: str, endpoints: dict, sequence=None, virtual_users: int = 10,
+                 duration: float = 30.0, iterations: int = None, rate: float = None, ramp_up: float = 0.0,
+                 headers: dict = None, payloads: dict = None, params: dict = None, mix: dict = None,
+                 data: dict = None, security: dict = None, credentials: dict = None):
+        self.base_url = base_url
+        self.endpoints = endpoints
+        self.sequence = list(sequence) if sequence else list(endpoints)
+        self.virtual_users = virtual_users
+        self.duration = duration
+        self.iterations = iterations
+        self.rate = rate
+        self.ramp_up = ramp_up
+        self.headers = headers or {}
+        self.payloads = payloads or {}
+        self.params = params or {}
+        self.mix = mix
+        self.data = data
+        self.security = security
+        self.credentials = credentials
+
+    @classmethod
+    def from_spec(cls, openapi_file: str, base_url: str, **kwargs):
+        from auth_provider import AuthProvider
+        from openapi_parser import OpenAPIParser
+        from sequence_planner import plan_sequence
+
+        parser = OpenAPIParser(openapi_file)
+        endpoints = parser.extract_api_endpoints()
+        kwargs.setdefault("sequence", plan_sequence(endpoints))
+        kwargs.setdefault("security", AuthProvider.security_from_spec(parser.spec))
+        return cls(base_url, endpoints, **kwargs)
+
+    def to_dict(self) -> dict:
+        return dict(vars(self))
+
+    def operations(self) -> set:
+        if self.mix:
+            from scenarios import build_mix
+            return build_mix(self.mix, self.endpoints).operations()
+        return set(self.sequence)
+
+    def unfillable(self) -> dict:
+        """Operations with path parameters that no example, default, `params` entry or data column fills."""
+        from data_feeders import DataFeeder
+        from request_template import RequestTemplate
+
+        columns = set()
+        if self.data:
+            with DataFeeder(**self.data) as feeder:
+                columns = set(feeder.next_record())
+        missing = {}
+        for name in sorted(self.operations()):
+            template = RequestTemplate.from_endpoint(name, self.endpoints.get(name, {}))
+            known = set(template.defaults) | set(self.params.get(name) or {}) | columns
+            slots = [slot for slot in template.path_slots if slot not in known]
+            if slots:
+                missing[name] = slots
+        return missing
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(**data)
+
+    def split(self, workers: int) -> list:
+        """One plan per worker: a contiguous block of virtual users and the matching share of `rate`."""
+        plans, first = [], 0
+        for index in range(workers):
+            users = self.virtual_users // workers + (1 if index < self.virtual_users % workers else 0)
+            plans.append({"worker": index, "workers": workers, "first_user": first, "virtual_users": users,
+                          "rate": self.rate * users / self.virtual_users if self.rate and users else None})
+            first += users
+        return plans
+
+
+class LoadStats:
+    """Per-operation latency histograms and status counts since the last `take()`."""
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self.histograms = {}
+        self.statuses = {}
+        self.errors = {}
+        self.requests = 0
+
+    def record(self, api_name: str, status: int, latency_ns: int):
+        histogram = self.histograms.get(api_name)
+        if histogram is None:
+            histogram = self.histograms[api_name] = LatencyHistogram()
+        histogram.record(latency_ns)
+        counts = self.statuses.setdefault(api_name, {})
+        counts[str(status)] = counts.get(str(status), 0) + 1
+        self.requests += 1
+
+    def error(self, api_name: str, error: Exception):
+        key = f"{api_name}: {type(error).__name__}"
+        self.errors[key] = self.errors.get(key, 0) + 1
+        self.requests += 1
+
+    def take(self) -> dict:
+        """The delta since the previous snapshot, ready to send; the coordinator adds them up."""
+        snapshot = {"requests": self.requests, "errors": self.errors, "statuses": self.statuses,
+                    "histograms": {name: histogram.to_dict() for name, histogram in self.histograms.items()}}
+        self._reset()
+        return snapshot
+
+
+# --------------------------
+# Worker
+# --------------------------
+
+class Worker:
+    """
+    Connects to a coordinator, receives its share of the scenario, waits for the common
+    start time and runs its virtual users, streaming a `LoadStats` delta every
+    `snapshot_interval` seconds (as told by the coordinator). `token` is the coordinator's
+    run token.
+    """
+
+    def __init__(self, host: str, port: int = DEFAULT_PORT, name: str = None, connect_timeout: float = 30.0,
+                 token: str = None):
+        self.host = host
+        self.token = token
+        self.port = port
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.connect_timeout = connect_timeout
+        self.stats = LoadStats()
+
+    async def _connect(self):
+        deadline = time.monotonic() + self.connect_timeout
+        while True:
+            try:
+                return await asyncio.open_connection(self.host, self.port, limit=MESSAGE_LIMIT)
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                await asyncio.sleep(0.2)  # the coordinator may not be listening yet
+
+    async def run(self):
+        import aiohttp
+        from request_template import compile_templates
+
+        reader, writer = await self._connect()
+        try:
+            await send_message(writer, {"type": "hello", "name": self.name, "version": PROTOCOL_VERSION,
+                                        "token": self.token})
+            message = await read_message(reader)
+            if message["type"] != "plan":
+                logging.warning(f"⚠️ Coordinator refused worker {self.name}: {message.get('reason')}")
+                return
+            scenario, plan = Scenario.from_dict(message["scenario"]), message["plan"]
+            templates = compile_templates({name: scenario.endpoints.get(name, {}) for name in scenario.operations()},
+                                          scenario.base_url, scenario.headers)
+            connector = aiohttp.TCPConnector(limit=max(plan["virtual_users"], 1))
+            async with aiohttp.ClientSession(connector=connector) as session:
+                await send_message(writer, {"type": "ready"})
+                start = await read_message(reader)
+                if start["type"] != "start":
+                    return
+                logging.info(f"🛰️ Worker {self.name}: {plan['virtual_users']} users from #{plan['first_user']}")
+                await asyncio.sleep(max(0.0, start["at"] - time.time()))  # everybody starts together
+                load = asyncio.create_task(self._load(scenario, plan, templates, session))
+                stop = asyncio.create_task(read_message(reader))
+                while not load.done():
+                    await asyncio.wait({load, stop}, timeout=message["snapshot_interval"],
+                                       return_when=asyncio.FIRST_COMPLETED)
+                    if stop.done():  # told to stop, or the coordinator went away
+                        load.cancel()
+                        break
+                    if not load.done():
+                        await send_message(writer, {"type": "snapshot", **self.stats.take()})
+                if not stop.done():
+                    stop.cancel()
+                await asyncio.gather(load, return_exceptions=True)
+                await send_message(writer, {"type": "done", **self.stats.take()})
+        except ConnectionError as e:
+            logging.warning(f"⚠️ Worker {self.name} lost the coordinator: {e}")
+        finally:
+            writer.close()
+
+    async def _load(self, scenario, plan, templates, session):
+        from auth_provider import AuthProvider
+        from data_feeders import DataFeeder, FeederExhausted, bind
+        from executor import execute_api
+        from rate_limiter import RateLimiter
+        from scenarios import build_mix
+
+        limiter = RateLimiter(plan["rate"]) if plan["rate"] else None
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + scenario.duration if scenario.duration else float("inf")
+        stats = self.stats
+        mix = build_mix(scenario.mix, scenario.endpoints) if scenario.mix else None
+        auth = AuthProvider(credentials=scenario.credentials, **(scenario.security or {})) \
+            if scenario.credentials else None  # one token cache for every user of this worker
+
+        async def virtual_user(user):
+            await asyncio.sleep(scenario.ramp_up * user / max(scenario.virtual_users, 1))
+            rng = random.Random(user)
+            feeder = DataFeeder(**scenario.data).partition(user, scenario.virtual_users) if scenario.data else None
+            iteration = 0
+            while scenario.iterations is None or iteration < scenario.iterations:
+                if loop.time() >= deadline:
+                    return
+                await asyncio.sleep(0)  # an empty flow (e.g. a session that ends at once) must still yield
+                try:
+                    record = feeder.next_record() if feeder else None  # one record per loop
+                except FeederExhausted:
+                    return
+                for api_name in (mix.next_flow(rng) if mix else scenario.sequence):
+                    if loop.time() >= deadline:
+                        return
+                    params, payload = scenario.params.get(api_name), scenario.payloads.get(api_name)
+                    if record:
+                        params = {**params, **record} if params else record
+                        template_payload = payload if payload is not None else templates[api_name].payload
+                        if template_payload is not None:
+                            bound = bind(template_payload, record)
+                            payload = bound if bound is not template_payload else payload  # no slots: keep bytes
+                    sent = perf_counter_ns()
+                    try:
+                        result = await execute_api(scenario.base_url, api_name, {}, scenario.headers, limiter,
+                                                   params, session, templates[api_name], payload=payload,
+                                                   virtual_user=user, auth=auth)
+                        stats.record(api_name, result["status"], perf_counter_ns() - sent)
+                    except Exception as e:
+                        stats.error(api_name, e)
+                iteration += 1
+            if feeder is not None:
+                feeder.close()
+
+        first = plan["first_user"]
+        await asyncio.gather(*[virtual_user(user) for user in range(first, first + plan["virtual_users"])])
+
+
+# --------------------------
+# Coordinator
+# --------------------------
+
+class Coordinator:
+    """
+    Splits a `Scenario` over `workers` worker processes (on any hosts), starts them at the
+    same wall-clock time and merges the histogram deltas they stream while the run is
+    going: `summary()` is live at any point. `on_snapshot(coordinator)` is called after
+    each merge, e.g. to update a dashboard.
+
+    Workers must run the same code version; start times assume synchronized (NTP) clocks.
+
+    The channel is plain, unauthenticated TCP and the plan carries the scenario's credentials:
+    the coordinator listens on localhost unless `host` says otherwise, and with a `token` only
+    workers that send it in their hello get a plan. Across hosts, use a trusted network or an
+    SSH tunnel.
+    """
+
+    def __init__(self, scenario: Scenario, workers: int, host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                 snapshot_interval: float = 1.0, start_delay: float = 1.0, connect_timeout: float = 60.0,
+                 on_snapshot=None, token: str = None):
+        self.scenario = scenario
+        self.token = token
+        self.workers = workers
+        self.host = host
+        self.port = port
+        self.snapshot_interval = snapshot_interval
+        self.start_delay = start_delay
+        self.connect_timeout = connect_timeout
+        self.on_snapshot = on_snapshot
+        self.histograms = {}  # api name -> merged LatencyHistogram
+        self.statuses = {}
+        self.errors = {}
+        self.requests = 0
+        self.per_worker = {}  # worker name -> requests
+        self.lost = []
+        self.started_at = None
+        self.finished_at = None
+        self._server = None
+        self._connections = []
+        self._all_connected = asyncio.Event()
+
+    async def start(self):
+        """
+        Checks the scenario, then starts listening (with `port=0`, an ephemeral port is chosen).
+        A scenario that cannot run raises `ValueError` before any worker can connect.
+        """
+        if self._server is None:
+            missing = self.scenario.unfillable()
+            if missing:  # every request would fail with a missing path parameter
+                raise ValueError(f"No values for path parameters {missing}: add them to the params plan, "
+                                 f"a data file or the spec's examples")
+            self._server = await asyncio.start_server(self._accept, self.host, self.port, limit=MESSAGE_LIMIT)
+            self.port = self._server.sockets[0].getsockname()[1]
+            logging.info(f"📡 Coordinator waiting for {self.workers} workers on {self.host}:{self.port}")
+        return self
+
+    async def _accept(self, reader, writer):
+        try:
+            hello = await read_message(reader)
+        except (ConnectionError, ValueError):
+            writer.close()
+            return
+        if self.token is not None and not hmac.compare_digest(str(hello.get("token")), self.token):
+            logging.warning(f"⚠️ Rejected worker {hello.get('name')!r}: wrong run token")
+            await send_message(writer, {"type": "reject", "reason": "wrong run token"})
+            writer.close()
+            return
+        if hello.get("version") != PROTOCOL_VERSION or len(self._connections) >= self.workers:
+            reason = "protocol version mismatch" if hello.get("version") != PROTOCOL_VERSION else "run is full"
+            await send_message(writer, {"type": "reject", "reason": reason})
+            writer.close()
+            return
+        self._connections.append((hello["name"], reader, writer))
+        self.per_worker[hello["name"]] = 0
+        if len(self._connections) == self.workers:
+            self._all_connected.set()
+
+    async def run(self) -> dict:
+        await self.start()
+        try:
+            await asyncio.wait_for(self._all_connected.wait(), self.connect_timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Only {len(self._connections)} of {self.workers} workers connected") from None
+
+        scenario = self.scenario.to_dict()
+        for (name, reader, writer), plan in zip(self._connections, self.scenario.split(self.workers)):
+            await send_message(writer, {"type": "plan", "scenario": scenario, "plan": plan,
+                                        "snapshot_interval": self.snapshot_interval})
+        for name, reader, writer in self._connections:
+            ready = await read_message(reader)
+            if ready["type"] != "ready":
+                raise ConnectionError(f"Worker {name} failed to prepare: {ready}")
+
+        start_at = time.time() + self.start_delay
+        for name, reader, writer in self._connections:
+            await send_message(writer, {"type": "start", "at": start_at})
+        self.started_at = start_at
+        logging.info(f"🚀 {self.workers} workers start at {time.strftime('%H:%M:%S', time.localtime(start_at))}")
+
+        await asyncio.gather(*[self._collect(name, reader) for name, reader, _ in self._connections])
+        self.finished_at = time.time()
+        await self.close()
+        summary = self.summary()
+        logging.info(f"✅ Distributed run: {summary['requests']} requests, {summary['rps']} req/s "
+                     f"from {self.workers} workers")
+        if self.scenario.mix:
+            self.mix_report().log()
+        return summary
+
+    async def _collect(self, name, reader):
+        while True:
+            try:
+                message = await read_message(reader)
+            except (ConnectionError, ValueError) as e:
+                logging.warning(f"⚠️ Lost worker {name}: {e}")
+                self.lost.append(name)
+                return
+            self.merge(name, message)
+            if message["type"] == "done":
+                return
+
+    def merge(self, worker: str, snapshot: dict):
+        """Adds one worker delta into the run totals."""
+        for api_name, data in snapshot.get("histograms", {}).items():
+            delta = LatencyHistogram.from_dict(data)
+            merged = self.histograms.get(api_name)
+            if merged is None:
+                self.histograms[api_name] = delta
+            else:
+                merged.merge(delta)
+        for api_name, counts in snapshot.get("statuses", {}).items():
+            merged = self.statuses.setdefault(api_name, {})
+            for status, count in counts.items():
+                merged[status] = merged.get(status, 0) + count
+        for key, count in snapshot.get("errors", {}).items():
+            self.errors[key] = self.errors.get(key, 0) + count
+        self.requests += snapshot.get("requests", 0)
+        self.per_worker[worker] = self.per_worker.get(worker, 0) + snapshot.get("requests", 0)
+        if self.on_snapshot is not None:
+            self.on_snapshot(self)
+
+    def mix_report(self):
+        """Requests sent per operation (errors included) against the scenario's target mix."""
+        from scenarios import MixReport, build_mix
+
+        report = MixReport(build_mix(self.scenario.mix, self.scenario.endpoints).target())
+        report.update({name: histogram.count for name, histogram in self.histograms.items()})
+        for key, count in self.errors.items():
+            report.record(key.rsplit(": ", 1)[0], count)
+        return report
+
+    def summary(self) -> dict:
+        end = self.finished_at or time.time()
+        duration = max(end - self.started_at, 0.0) if self.started_at else 0.0
+        summary = {
+            "workers": self.workers,
+            "lost_workers": self.lost,
+            "requests": self.requests,
+            "errors": sum(self.errors.values()),
+            "duration_s": round(duration, 3),
+            "rps": round(self.requests / duration, 1) if duration > 0 else 0.0,
+            "per_worker": dict(self.per_worker),
+            "operations": {name: {**histogram.summary(), "statuses": self.statuses.get(name, {})}
+                           for name, histogram in sorted(self.histograms.items())},
+            "error_types": dict(self.errors),
+        }
+        if self.scenario.mix:
+            summary["mix"] = self.mix_report().summary()
+        return summary
+
+    async def close(self):
+        for _, _, writer in self._connections:
+            writer.close()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+
+def spawn_local_workers(count: int, host: str, port: int, token: str = None) -> list:
+    """Starts `count` worker processes on this machine (to use every core, or to test the protocol)."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [here, os.environ.get("PYTHONPATH")])))
+    if token is not None:
+        env[TOKEN_ENV] = token  # not on the command line, where every local user could read it
+    return [subprocess.Popen([sys.executable, os.path.join(here, "distributed.py"), "worker", f"{host}:{port}",
+                              "--name", f"local-{index}"], env=env) for index in range(count)]
+
+
+def _load_yaml(path: str) -> dict:
+    import yaml
+
+    with open(path, "r", encoding="utf-8") as file:
+        return yaml.safe_load(file) or {}
+
+
+def main(argv=None):
+    cli = argparse.ArgumentParser(description="Distributed load generation: one coordinator, many workers.")
+    commands = cli.add_subparsers(dest="command", required=True)
+
+    coordinator = commands.add_parser("coordinator", help="Split a scenario over workers and merge their results")
+    coordinator.add_argument("spec", help="OpenAPI file")
+    coordinator.add_argument("--base-url", required=True)
+    coordinator.add_argument("--workers", type=int, required=True)
+    coordinator.add_argument("--users", type=int, default=100, help="Virtual users over all workers")
+    coordinator.add_argument("--duration", type=float, default=60.0, help="Seconds")
+    coordinator.add_argument("--iterations", type=int, help="Loops per user instead of a duration")
+    coordinator.add_argument("--rate", type=float, help="Requests per second over all workers")
+    coordinator.add_argument("--ramp-up", type=float, default=0.0, help="Seconds until every user runs")
+    coordinator.add_argument("--mix", help="YAML/JSON traffic mix (weights and flows, or a Markov session)")
+    coordinator.add_argument("--plan", help="YAML/JSON with fixed per-operation 'params' and 'payloads', and 'headers'")
+    coordinator.add_argument("--data", help="CSV/JSONL/Parquet records, one per loop (same path on every worker)")
+    coordinator.add_argument("--data-mode", choices=("circular", "unique"), default="circular")
+    coordinator.add_argument("--credentials", help="YAML/JSON: security scheme name -> secrets, sent to the workers")
+    coordinator.add_argument("--host", default="127.0.0.1", help="Listen address; 0.0.0.0 for remote workers")
+    coordinator.add_argument("--token", default=os.environ.get(TOKEN_ENV),
+                             help=f"Run token workers must present (default ${TOKEN_ENV}, else a random one)")
+    coordinator.add_argument("--port", type=int, default=DEFAULT_PORT)
+    coordinator.add_argument("--local", action="store_true", help="Also start the workers on this machine")
+
+    worker = commands.add_parser("worker", help="Run load for a coordinator")
+    worker.add_argument("coordinator", help="host:port")
+    worker.add_argument("--name")
+    worker.add_argument("--token", default=os.environ.get(TOKEN_ENV),
+                        help=f"The coordinator's run token (default ${TOKEN_ENV})")
+    args = cli.parse_args(argv)
+
+    if args.command == "worker":
+        host, _, port = args.coordinator.rpartition(":")
+        asyncio.run(Worker(host, int(port), args.name, token=args.token).run())
+        return 0
+
+    plan = _load_yaml(args.plan) if args.plan else {}
+    scenario = Scenario.from_spec(args.spec, args.base_url, virtual_users=args.users,
+                                  duration=None if args.iterations else args.duration, iterations=args.iterations,
+                                  rate=args.rate, ramp_up=args.ramp_up, headers=plan.get("headers"),
+                                  payloads=plan.get("payloads"), params=plan.get("params"),
+                                  mix=_load_yaml(args.mix) if args.mix else None,
+                                  data={"path": args.data, "mode": args.data_mode} if args.data else None,
+                                  credentials=_load_yaml(args.credentials) if args.credentials else None)
+
+    token = args.token
+    if token is None:
+        token = secrets.token_urlsafe(16)
+        if not args.local:
+            logging.info(f"🔐 Start the workers with --token {token}")
+
+    async def coordinate():
+        run = await Coordinator(scenario, args.workers, args.host, args.port, token=token).start()  # validates first
+        processes = spawn_local_workers(args.workers, "127.0.0.1", run.port, token) if args.local else []
+        try:
+            return await run.run()
+        except BaseException:
+            await run.close()
+            for process in processes:
+                process.terminate()  # they would wait for a plan forever
+            raise
+        finally:
+            await asyncio.gather(*[asyncio.to_thread(process.wait) for process in processes])
+
+    summary = asyncio.run(coordinate())
+    print(json_codec.dumps(summary).decode("utf-8"))
+    return 1 if summary["lost_workers"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
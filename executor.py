@@ -1,25 +1,130 @@
 import aiohttp
 import asyncio
+import functools
 
-async def execute_api(base_url, api_name, details, headers):
-    """Execute API request asynchronously."""
-    url = f"{base_url}{api_name.split(' ', 1)[1]}"
-    method = api_name.split(' ', 1)[0]
-    payload = details.get("payload", {})
-    
-    async with aiohttp.ClientSession() as session:
-        async with session.request(method, url, json=payload, headers=headers) as response:
-            return {
-                "api": api_name,
-                "status": response.status,
-                "response": await response.text()
-            }
-
-async def execute_all_apis(base_url, api_sequence, api_map, headers):
-    """Execute all APIs in sequence."""
+import profiler
+from live_metrics import METRICS
+from request_template import RequestTemplate, compile_templates
+from transports import Transport
+
+async def execute_api(base_url, api_name, details, headers, rate_limiter=None, params=None, session=None,
+                      template=None, *, validator=None, tracer=None, payload=None, sink=None, virtual_user=-1,
+                      auth=None, transport=None, recorder=None):
+    """
+    Execute API request asynchronously, optionally shaped by a RateLimiter.
+
+    `params` fills path/query/header parameters and `payload` overrides the template's body.
+    Pass a precompiled `template` and a shared `session` when sending many requests. With a
+    `ResponseValidator`, sampled responses get a `schema_errors` list; with a `RequestTracer`
+    (installed on the session), every result gets a `timings` phase breakdown. A `ResultSink`
+    gets one row per request. An `AuthProvider` signs the request and is told about 401s. A
+    `Transport` (e.g. `HTTP2Transport`) sends the request instead of the aiohttp session. A
+    `TrafficRecorder` keeps the resolved request for replay. Options after `template` are
+    keyword-only, so a new one can never be passed in the wrong slot.
+    """
+    template = template or RequestTemplate.from_endpoint(api_name, details, base_url, headers)
+    request = template.render(params, payload)
+    return await execute_prepared(request, api_name, rate_limiter, session, validator=validator, tracer=tracer,
+                                  sink=sink, virtual_user=virtual_user, auth=auth, transport=transport,
+                                  recorder=recorder)
+
+async def execute_prepared(request, api_name, rate_limiter=None, session=None, *, validator=None, tracer=None,
+                           sink=None, virtual_user=-1, auth=None, transport=None, recorder=None):
+    """
+    Sends an already rendered `PreparedRequest` (see `execute_api` for the options).
+    """
+    # Recorded unsigned (no credentials on disk), once the rate limiter lets it go (replays keep the throttling)
+    admitted = functools.partial(recorder.record, api_name, request, virtual_user) if recorder is not None else None
+    if auth is not None:
+        request = await auth.authorize(request, api_name)
+
+    try:
+        if transport is not None:
+            result = await _execute(transport, request, api_name, rate_limiter, tracer, admitted)
+        elif session is None:
+            trace_configs = [tracer.trace_config()] if tracer else None
+            async with aiohttp.ClientSession(trace_configs=trace_configs) as session:
+                result = await _execute(session, request, api_name, rate_limiter, tracer, admitted)
+        else:
+            result = await _execute(session, request, api_name, rate_limiter, tracer, admitted)
+    except Exception as error:
+        if sink is not None:
+            sink.write({"api": api_name, "bytes_sent": len(request.body) if request.body else 0}, virtual_user,
+                       type(error).__name__)
+        raise
+    if sink is not None:
+        sink.write(result, virtual_user)
+    if auth is not None and result["status"] == 401:
+        auth.rejected(request, api_name)
+
+    if validator is not None:
+        errors = validator.validate(api_name, result["status"], result["response"])
+        if errors is not None:
+            result["schema_errors"] = errors
+    return result
+
+async def _execute(session, request, api_name, rate_limiter, tracer=None, admitted=None):
+    """Sends under the rate limiter; `admitted()` is called right before the request goes out."""
+    if rate_limiter is None:
+        if admitted is not None:
+            admitted()
+        result, _ = await _send_request(session, request, api_name, tracer)
+        return result
+
+    async with rate_limiter.limit(request.url, api_name):
+        if admitted is not None:
+            admitted()
+        result, retry_after = await _send_request(session, request, api_name, tracer)
+    rate_limiter.observe(request.url, api_name, result["status"], retry_after)
+    return result
+
+async def _send_request(session, request, api_name, tracer=None):
+    """Send one request over an aiohttp session or a `Transport`; returns the result and any `Retry-After` header."""
+    timings = tracer.start() if tracer else None
+    started = METRICS.request_started(api_name)
+    try:
+        with profiler.span("network"):
+            if isinstance(session, Transport):
+                response = await session.send(request, timings)
+                result = {
+                    "api": api_name,
+                    "status": response.status,
+                    "response": response.body.decode("utf-8", "replace"),
+                    "bytes_sent": len(request.body) if request.body else 0,
+                    "bytes_received": len(response.body),
+                    "protocol": response.protocol
+                }
+            else:
+                async with session.request(request.method, request.url, data=request.body, headers=request.headers,
+                                           trace_request_ctx=timings) as response:
+                    body = await response.read()
+                    result = {
+                        "api": api_name,
+                        "status": response.status,
+                        "response": await response.text(),  # decodes the body read above
+                        "bytes_sent": len(request.body) if request.body else 0,
+                        "bytes_received": len(body),
+                        "protocol": f"HTTP/{response.version.major}.{response.version.minor}"
+                    }
+    except BaseException as error:
+        METRICS.request_failed(api_name, error, started)
+        raise
+    METRICS.request_finished(api_name, result["status"], started)
+    if timings is not None:
+        result["timings"] = tracer.finish(api_name, timings)
+    return result, response.headers.get("Retry-After")
+
+async def execute_all_apis(base_url, api_sequence, api_map, headers, rate_limiter=None, params=None, validator=None,
+                           tracer=None, sink=None):
+    """Execute all APIs in sequence over one session, compiling each operation once."""
+    templates = compile_templates({name: api_map.get(name, {}) for name in dict.fromkeys(api_sequence)},
+                                  base_url, headers)
     results = []
-    for api_name in api_sequence:
-        details = api_map.get(api_name, {})
-        result = await execute_api(base_url, api_name, details, headers)
-        results.append(result)
+    trace_configs = [tracer.trace_config()] if tracer else None
+    async with aiohttp.ClientSession(trace_configs=trace_configs) as session:
+        for api_name in api_sequence:
+            result = await execute_api(base_url, api_name, api_map.get(api_name, {}), headers, rate_limiter,
+                                       params, session, templates[api_name], validator=validator, tracer=tracer,
+                                       sink=sink)
+            results.append(result)
     return results
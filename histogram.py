@@ -0,0 +1,122 @@
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+
+class LatencyHistogram:
+    """
+    Log-linear histogram of non-negative integers (nanoseconds), in the style of HdrHistogram.
+
+    Every power of two is split into `2 ** (precision_bits - 1)` equal buckets, so any
+    recorded value is reproduced within `2 ** (1 - precision_bits)` relative error
+    (about 3% with the default 6 bits) using a few hundred sparse buckets at most.
+    Histograms with the same precision can be merged losslessly, e.g. across workers.
+    """
+
+    def __init__(self, precision_bits: int = 6):
+        self.precision_bits = precision_bits
+        self._half = 1 << (precision_bits - 1)
+        self.counts = {}  # bucket index -> count
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def bucket_index(self, value: int) -> int:
+        exponent = max(value.bit_length() - self.precision_bits, 0)
+        return exponent * self._half + (value >> exponent)
+
+    def bucket_bounds(self, index: int):
+        """
+        Returns the `(lowest, highest)` values that fall into bucket `index`.
+        """
+        exponent = max(index // self._half - 1, 0)
+        mantissa = index - exponent * self._half
+        return mantissa << exponent, ((mantissa + 1) << exponent) - 1
+
+    def record(self, value, count: int = 1):
+        value = max(int(value), 0)
+        index = self.bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.count += count
+        self.total += value * count
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other: "LatencyHistogram"):
+        if other.precision_bits != self.precision_bits:
+            raise ValueError("can only merge histograms with the same precision")
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> int:
+        """
+        Value at percentile `q` (0-100), accurate to the bucket width.
+        """
+        if not self.count:
+            return 0
+        rank = max(1, -(-self.count * q // 100))  # ceil without floats drifting
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                low, high = self.bucket_bounds(index)
+                return min(max((low + high) // 2, self.min), self.max)
+        return self.max
+
+    def cumulative(self, bounds):
+        """
+        Counts of values `<=` each bound (bucket-accurate), e.g. for Prometheus `le` buckets.
+        """
+        ordered = sorted(self.counts.items())
+        result, seen, position = [], 0, 0
+        for bound in bounds:
+            while position < len(ordered) and self.bucket_bounds(ordered[position][0])[1] <= bound:
+                seen += ordered[position][1]
+                position += 1
+            result.append(seen)
+        return result
+
+    def summary(self, unit: float = 1e6) -> dict:
+        """
+        count/mean/min/p50/p90/p99/max, divided by `unit` (default: nanoseconds -> milliseconds).
+        """
+        def scaled(value):
+            return round(value / unit, 3)
+
+        return {
+            "count": self.count,
+            "mean": scaled(self.mean),
+            "min": scaled(self.min or 0),
+            "p50": scaled(self.percentile(50)),
+            "p90": scaled(self.percentile(90)),
+            "p99": scaled(self.percentile(99)),
+            "max": scaled(self.max or 0),
+        }
+
+    def to_dict(self) -> dict:
+        return {"precision_bits": self.precision_bits, "counts": {str(k): v for k, v in self.counts.items()},
+                "count": self.count, "total": self.total, "min": self.min, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LatencyHistogram":
+        histogram = cls(data.get("precision_bits", 6))
+        histogram.counts = {int(k): v for k, v in data.get("counts", {}).items()}
+        histogram.count = data.get("count", sum(histogram.counts.values()))
+        histogram.total = data.get("total", 0)
+        histogram.min = data.get("min")
+        histogram.max = data.get("max")
+        return histogram
@@ -0,0 +1,117 @@
+import json
+import logging
+import os
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+JSON_CONTENT_TYPE = "application/json"
+
+
+class JSONCodec:
+    """
+    A JSON backend: `dumps` returns UTF-8 bytes ready to send, `loads` accepts bytes or str.
+
+    Objects the fast backends refuse (e.g. integers beyond 64 bits) fall back to the
+    standard library, so every codec accepts what `json.dumps` accepts.
+    """
+
+    def __init__(self, name: str, dumps, loads):
+        self.name = name
+        self._dumps = dumps
+        self._loads = loads
+
+    def dumps(self, obj) -> bytes:
+        try:
+            return self._dumps(obj)
+        except (TypeError, OverflowError):  # orjson raises TypeError, msgspec OverflowError for big ints
+            return _stdlib_dumps(obj)
+
+    def loads(self, data):
+        return self._loads(data)
+
+    def dumps_str(self, obj) -> str:
+        return self.dumps(obj).decode("utf-8")
+
+    def __repr__(self):
+        return f"JSONCodec({self.name!r})"
+
+
+def _stdlib_dumps(obj) -> bytes:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _make_orjson():
+    import orjson
+
+    option = orjson.OPT_NON_STR_KEYS
+    return JSONCodec("orjson", lambda obj: orjson.dumps(obj, option=option), orjson.loads)
+
+
+def _make_msgspec():
+    import msgspec
+
+    encoder, decoder = msgspec.json.Encoder(), msgspec.json.Decoder()
+    return JSONCodec("msgspec", encoder.encode, decoder.decode)
+
+
+def _make_stdlib():
+    return JSONCodec("json", _stdlib_dumps, json.loads)
+
+
+BACKENDS = {"orjson": _make_orjson, "msgspec": _make_msgspec, "json": _make_stdlib}  # in order of preference
+_codecs = {}
+
+
+def get_codec(name: str = None) -> JSONCodec:
+    """
+    Returns the named codec, or the fastest installed one (`OPENAPI_JSON_CODEC` overrides).
+    """
+    name = name or os.environ.get("OPENAPI_JSON_CODEC")
+    if name:
+        if name not in _codecs:
+            if name not in BACKENDS:
+                raise ValueError(f"Unknown JSON codec {name!r}; choose from {', '.join(BACKENDS)}")
+            _codecs[name] = BACKENDS[name]()  # ImportError if the backend is not installed
+        return _codecs[name]
+    for candidate in BACKENDS:
+        try:
+            return get_codec(candidate)
+        except ImportError:
+            continue
+
+
+def available_codecs():
+    """
+    Names of the backends that can be imported here.
+    """
+    names = []
+    for name in BACKENDS:
+        try:
+            get_codec(name)
+            names.append(name)
+        except ImportError:
+            pass
+    return names
+
+
+codec = get_codec()
+logging.debug(f"JSON codec: {codec.name}")
+
+
+def set_codec(name: str) -> JSONCodec:
+    """
+    Switches the process-wide default codec used by `dumps`/`loads`.
+    """
+    global codec
+    codec = get_codec(name)
+    logging.info(f"🔧 JSON codec set to {codec.name}")
+    return codec
+
+
+def dumps(obj) -> bytes:
+    return codec.dumps(obj)
+
+
+def loads(data):
+    return codec.loads(data)
@@ -0,0 +1,241 @@
+import logging
+import math
+import threading
+from time import perf_counter_ns
+
+from histogram import LatencyHistogram
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value) -> str:
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    return str(value)
+
+
+class MetricFamily:
+    """
+    A labelled metric whose updates never take a lock.
+
+    Each thread writes into its own shard (a plain dict, so updates are a dict get and
+    set under the GIL); shards are only summed when the metric is scraped.
+    """
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._shards = []
+        self._local = threading.local()
+        self._lock = threading.Lock()  # only taken when a thread writes for the first time
+
+    def _shard(self) -> dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+            return shard
+
+    def _labels(self, labels, extra=()):
+        pairs = list(zip(self.labelnames, labels)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class Counter(MetricFamily):
+    type = "counter"
+
+    def inc(self, labels=(), amount=1):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def values(self) -> dict:
+        merged = {}
+        for shard in list(self._shards):
+            for labels, value in list(shard.items()):
+                merged[labels] = merged.get(labels, 0) + value
+        return merged
+
+    def samples(self, openmetrics=False):
+        for labels, value in sorted(self.values().items()):
+            yield f"{self.name}{self._labels(labels)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    """
+    Up/down gauge, or a computed one when `function` returns `{labels: value}` at scrape time.
+    """
+
+    type = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), function=None):
+        super().__init__(name, documentation, labelnames)
+        self.function = function
+
+    def dec(self, labels=(), amount=1):
+        self.inc(labels, -amount)
+
+    def values(self) -> dict:
+        return self.function() if self.function else super().values()
+
+
+class Histogram(MetricFamily):
+    """
+    Latency histogram recorded in nanoseconds (`LatencyHistogram` per label set and thread)
+    and exposed in seconds; `le` bucket counts are accurate to ~3% of the bucket bound.
+    """
+
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        self._bounds_ns = [int(bound * 1e9) for bound in self.buckets]
+
+    def observe(self, labels, nanoseconds):
+        shard = self._shard()
+        histogram = shard.get(labels)
+        if histogram is None:
+            histogram = shard[labels] = LatencyHistogram()
+        histogram.record(nanoseconds)
+
+    def values(self) -> dict:
+        merged = {}
+        for shard in list(self._shards):
+            for labels, histogram in list(shard.items()):
+                merged.setdefault(labels, LatencyHistogram()).merge(histogram)
+        return merged
+
+    def samples(self, openmetrics=False):
+        return self.histogram_samples(self.values())
+
+    def histogram_samples(self, histograms: dict):
+        for labels, histogram in sorted(histograms.items()):
+            for bound, count in zip(self.buckets, histogram.cumulative(self._bounds_ns)):
+                yield f"{self.name}_bucket{self._labels(labels, [('le', _format_value(float(bound)))])} {count}"
+            yield f"{self.name}_bucket{self._labels(labels, [('le', '+Inf')])} {histogram.count}"
+            yield f"{self.name}_sum{self._labels(labels)} {_format_value(histogram.total / 1e9)}"
+            yield f"{self.name}_count{self._labels(labels)} {histogram.count}"
+
+
+class LiveMetrics:
+    """
+    Process-wide live metrics for the executor, LLM calls and caches, exposed in the
+    Prometheus text format (or OpenMetrics) by `render()`.
+    """
+
+    def __init__(self, prefix: str = "openapi"):
+        self.requests = Counter(f"{prefix}_requests_total", "Requests started, by operation.", ("operation",))
+        self.responses = Counter(f"{prefix}_responses_total", "Responses received, by operation and status code.",
+                                 ("operation", "status"))
+        self.request_errors = Counter(f"{prefix}_request_errors_total", "Requests that raised instead of responding.",
+                                      ("operation", "error"))
+        self.latency = Histogram(f"{prefix}_request_duration_seconds", "Request latency, by operation.",
+                                 ("operation",))
+        self.in_flight = Gauge(f"{prefix}_requests_in_flight", "Requests currently waiting for a response.",
+                               ("operation",))
+        self.llm_calls = Counter(f"{prefix}_llm_calls_total", "LLM calls, by kind and outcome.", ("kind", "outcome"))
+        self.llm_latency = Histogram(f"{prefix}_llm_call_duration_seconds", "LLM call latency, by kind.", ("kind",))
+        self.cache_lookups = Counter(f"{prefix}_cache_lookups_total", "Cache lookups, by cache and result.",
+                                     ("cache", "result"))
+        self.cache_hit_ratio = Gauge(f"{prefix}_cache_hit_ratio", "Share of cache lookups that were hits.",
+                                     ("cache",), function=self._cache_hit_ratio)
+        self.phases = Histogram(f"{prefix}_request_phase_seconds",
+                                "Request phases (queued, dns, connect, ttfb, transfer) from registered tracers.",
+                                ("operation", "phase"))
+        self.families = [self.requests, self.responses, self.request_errors, self.latency, self.in_flight,
+                         self.llm_calls, self.llm_latency, self.cache_lookups, self.cache_hit_ratio, self.phases]
+        self.tracers = []
+
+    # --------------------------
+    # Hot path
+    # --------------------------
+
+    def request_started(self, operation: str) -> int:
+        labels = (operation,)
+        self.requests.inc(labels)
+        self.in_flight.inc(labels)
+        return perf_counter_ns()
+
+    def request_finished(self, operation: str, status, started_ns: int):
+        labels = (operation,)
+        self.in_flight.dec(labels)
+        self.responses.inc((operation, str(status)))
+        self.latency.observe(labels, perf_counter_ns() - started_ns)
+
+    def request_failed(self, operation: str, error: BaseException, started_ns: int):
+        labels = (operation,)
+        self.in_flight.dec(labels)
+        self.request_errors.inc((operation, type(error).__name__))
+        self.latency.observe(labels, perf_counter_ns() - started_ns)
+
+    @staticmethod
+    def llm_call_started() -> int:
+        return perf_counter_ns()
+
+    def llm_call(self, kind: str, started_ns: int, ok: bool = True):
+        self.llm_calls.inc((kind, "ok" if ok else "error"))
+        self.llm_latency.observe((kind,), perf_counter_ns() - started_ns)
+
+    def cache_lookup(self, cache: str, hit: bool):
+        self.cache_lookups.inc((cache, "hit" if hit else "miss"))
+
+    def register_tracer(self, tracer):
+        """
+        Exports a `RequestTracer`'s phase histograms as `<prefix>_request_phase_seconds`.
+        """
+        if tracer not in self.tracers:
+            self.tracers.append(tracer)
+
+    # --------------------------
+    # Exposition
+    # --------------------------
+
+    def _cache_hit_ratio(self):
+        totals = {}
+        for (cache, result), count in self.cache_lookups.values().items():
+            hits, lookups = totals.get(cache, (0, 0))
+            totals[cache] = (hits + (count if result == "hit" else 0), lookups + count)
+        return {(cache,): hits / lookups for cache, (hits, lookups) in totals.items() if lookups}
+
+    def _phase_histograms(self):
+        merged = {}
+        for tracer in self.tracers:
+            for (operation, phase), histogram in list(tracer.histograms.items()):
+                if operation != "*" and phase != "total":
+                    merged.setdefault((operation, phase), LatencyHistogram(histogram.precision_bits)).merge(histogram)
+        return merged
+
+    def render(self, openmetrics: bool = False) -> str:
+        lines = []
+        for family in self.families:
+            name = family.name[:-len("_total")] if openmetrics and family.type == "counter" else family.name
+            lines.append(f"# HELP {name} {family.documentation}")
+            lines.append(f"# TYPE {name} {family.type}")
+            if family is self.phases:
+                lines.extend(family.histogram_samples(self._phase_histograms()))
+            else:
+                lines.extend(family.samples(openmetrics))
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = LiveMetrics()
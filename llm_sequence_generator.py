@@ -1,10 +1,24 @@
-import json
+import json_codec
+from live_metrics import METRICS
+import profiler
+from prompt_encoder import PromptEncoder, count_tokens
+from sequence_stream import IncrementalArrayParser
 from langchain_core.runnables import RunnableLambda, RunnablePassthrough, RunnableSequence
 from langchain.chat_models import AzureChatOpenAI
 from langchain.prompts import PromptTemplate
 
+SEQUENCE_PROMPT = """Order these API operations for execution: create before use, update after read, delete last.
+Reply with JSON only, using the operations exactly as written: {{"execution_order": ["POST /pet", "GET /pet/{{petId}}"]}}
+
+{api_list}"""
+
+PAYLOAD_PROMPT = """Generate one sample JSON value for this schema (`?` optional, `A|B` either, `A&B` both, `Name=` defines a type).
+Reply with JSON only.
+
+{schema}"""
+
 class LLMSequenceGenerator:
-    def __init__(self, azure_endpoint: str, azure_key: str, deployment_name: str):
+    def __init__(self, azure_endpoint: str, azure_key: str, deployment_name: str, prompt_encoder: PromptEncoder = None):
         """Initialize Azure OpenAI chat model."""
         self.llm = AzureChatOpenAI(
             openai_api_base=azure_endpoint,
@@ -12,58 +26,89 @@ class LLMSequenceGenerator:
             deployment_name=deployment_name,
             openai_api_key=azure_key
         )
+        self.prompt_encoder = prompt_encoder or PromptEncoder()  # ✅ Terse, token-budgeted prompts
 
     def generate_sequence(self, api_map):
-        """Generate API execution order using LLM and RunnableSequence."""
-        prompt = PromptTemplate(
-            template="""
-            Given the following OpenAPI endpoints, determine the correct execution order.
-            Always return JSON in this format:
-            {{
-                "execution_order": ["POST /pet", "GET /pet/{petId}", "PUT /pet", "DELETE /pet/{petId}"]
-            }}
-
-            Endpoints:
-            {api_list}
-            """,
-            input_variables=["api_list"]
-        )
+        """
+        Generate API execution order using LLM and RunnableSequence.
+        Large endpoint lists are sent in token-budgeted chunks; operations the LLM leaves out are appended.
+        """
+        prompt = PromptTemplate(template=SEQUENCE_PROMPT, input_variables=["api_list"])
+        names = list(api_map.keys())
+        chunks = self.prompt_encoder.chunk(names, reserve=count_tokens(SEQUENCE_PROMPT))
 
-        api_list = "\n".join(api_map.keys())
+        order = []
+        for api_list in chunks:
+            sequence = (
+                RunnablePassthrough()
+                | RunnableLambda(lambda _, api_list=api_list: {"api_list": api_list})
+                | prompt
+                | self.llm
+                | RunnableLambda(lambda response: json_codec.loads(response.content).get("execution_order", []))
+            )
+            order.extend(self._invoke("sequence", sequence))
 
-        sequence = (
-            RunnablePassthrough()
-            | RunnableLambda(lambda _: {"api_list": api_list})
-            | prompt
-            | self.llm
-            | RunnableLambda(lambda response: json.loads(response.content).get("execution_order", []))
-        )
+        known, seen = set(names), set()
+        ordered = [name for name in order if name in known and not (name in seen or seen.add(name))]
+        return ordered + [name for name in names if name not in seen]  # Return ordered API list
 
-        return sequence.invoke({})  # Return ordered API list
+    async def stream_sequence(self, api_map):
+        """
+        Streams the execution order: each operation is yielded as soon as its entry in the
+        LLM's JSON reply is complete, so callers can start executing before the reply ends.
+        Operations the LLM leaves out are yielded last.
+        """
+        prompt = PromptTemplate(template=SEQUENCE_PROMPT, input_variables=["api_list"])
+        names = list(api_map.keys())
+        known, seen = set(names), set()
 
-    def generate_payload(self, endpoint_details):
-        """Generate a sample JSON payload for POST/PUT requests."""
-        prompt = PromptTemplate(
-            template="""
-            Given the following OpenAPI request schema, generate a sample JSON payload.
-            Ensure the response is a valid JSON object.
+        for api_list in self.prompt_encoder.chunk(names, reserve=count_tokens(SEQUENCE_PROMPT)):
+            parser = IncrementalArrayParser("execution_order")
+            started = METRICS.llm_call_started()
+            ok = False
+            try:
+                async for chunk in (prompt | self.llm).astream({"api_list": api_list}):
+                    for name in parser.feed(chunk.content):
+                        if name in known and name not in seen:
+                            seen.add(name)
+                            yield name
+                ok = True
+            finally:
+                METRICS.llm_call("sequence_stream", started, ok)
 
-            Schema:
-            {schema}
+        for name in names:
+            if name not in seen:
+                yield name
 
-            Output JSON:
-            """,
-            input_variables=["schema"]
-        )
+    def generate_payload(self, endpoint_details):
+        """Generate a sample JSON payload for POST/PUT requests."""
+        prompt = PromptTemplate(template=PAYLOAD_PROMPT, input_variables=["schema"])
 
-        schema = json.dumps(endpoint_details, indent=2)  # Convert schema to JSON string
+        if isinstance(endpoint_details, str):
+            schema = endpoint_details
+        else:  # Terse type notation instead of indented JSON
+            schema = self.prompt_encoder.fit(endpoint_details,
+                                             self.prompt_encoder.token_budget - count_tokens(PAYLOAD_PROMPT))
 
         sequence = (
             RunnablePassthrough()
             | RunnableLambda(lambda _: {"schema": schema})
             | prompt
             | self.llm
-            | RunnableLambda(lambda response: json.loads(response.content))
+            | RunnableLambda(lambda response: json_codec.loads(response.content))
         )
 
-        return sequence.invoke({})
+        return self._invoke("payload", sequence)
+
+    @staticmethod
+    def _invoke(kind, sequence):
+        """Run the chain, counting the call and its latency in the live metrics."""
+        started = METRICS.llm_call_started()
+        try:
+            with profiler.span("llm"):
+                result = sequence.invoke({})
+        except Exception:
+            METRICS.llm_call(kind, started, ok=False)
+            raise
+        METRICS.llm_call(kind, started)
+        return result
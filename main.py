@@ -1,15 +1,24 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse
 import uvicorn
 import asyncio
 import json
 import logging
-from openapi_parser import OpenAPIParser
+import os
+import uuid
+from live_metrics import METRICS, OPENMETRICS_CONTENT_TYPE, PROMETHEUS_CONTENT_TYPE
+from spec_registry import SpecRegistry
 from llm_sequence_generator import LLMSequenceGenerator
+from prompt_encoder import PromptEncoder
+from sequence_planner import SequencePlanner, operation_runner, plan_sequence
+from sequence_stream import dependency_map, run_pipelined
 from api_executor import APIExecutor
 from api_workflow import APIWorkflow
 from graph_visualization import APIGraphVisualizer
+from response_validator import ResponseValidator
+from transports import Transports
+from teardown import ResourceTracker, Teardown, TeardownJournal
 from utils.result_storage import ResultStorage
 
 app = FastAPI()
@@ -27,27 +36,81 @@ app.add_middleware(
 # Global Initialization
 # --------------------------
 
-openapi_file_path = "openapi_specs/petstore.yaml"
-base_url = "https://petstore.swagger.io/v2"
+openapi_specs_dir = "openapi_specs"
+default_spec = "petstore"
+base_urls = {"petstore": "https://petstore.swagger.io/v2"}  # spec name -> base URL; others use their `servers`
 auth_headers = {}
+# Per spec, secrets per security scheme, e.g. {"petstore": {"petstore_auth": {"client_id": ..., "client_secret": ...}}}
+auth_credentials = {}
+transports = Transports({})  # base URL -> "http1" | "http2" | "h2c", e.g. {base_url: "http2"}
+refine_sequence_with_llm = False  # ask the LLM only about operations the planner cannot order
+stream_sequence_from_llm = False  # execute LLM-ordered operations while the reply is still streaming
+teardown_after_run = True  # delete what each session created; `python teardown.py teardown/*.jsonl` resumes
+teardown_dir = "teardown"  # one journal per session, so a session only tears down its own resources
+validate_responses = 0.0  # share of responses checked against the spec's schemas (0 = off)
 
 # Initialize components
-parser = OpenAPIParser(openapi_file_path)
-api_map = parser.get_all_endpoints()
-llm_gen = LLMSequenceGenerator()
-execution_sequence = llm_gen.generate_sequence(api_map)
+spec_registry = SpecRegistry()
+spec_registry.load_directory(openapi_specs_dir)  # ✅ All specs parsed once, concurrently
+parser = spec_registry.get_parser(default_spec)
+api_map = spec_registry.get_endpoints(default_spec)
+llm_gen = LLMSequenceGenerator(prompt_encoder=PromptEncoder.from_parser(parser))  # ✅ Components alias as `Pet`
+execution_sequences = {}  # spec name -> API order, planned on first use
+response_validators = {}  # spec name -> ResponseValidator, built on first use
 result_storage = ResultStorage()
-api_executor = APIExecutor(base_url, auth_headers)
-workflow_manager = APIWorkflow(base_url, auth_headers, websocket_uri="ws://localhost:8000/ws")
+base_url = spec_registry.get_base_url(default_spec, base_urls.get(default_spec))
+auth_provider = spec_registry.get_auth_provider(default_spec, auth_credentials.get(default_spec))  # ✅ One token cache
+api_executor = APIExecutor(base_url, auth_headers, auth=auth_provider, transports=transports)
+METRICS.register_tracer(api_executor.tracer)  # ✅ Phase histograms on /metrics
+workflow_manager = APIWorkflow(base_url, auth_headers, websocket_uri="ws://localhost:8000/ws", llm_generator=llm_gen)
+workflow_manager.api_executor.auth = auth_provider
 visualizer = APIGraphVisualizer()
+os.makedirs(teardown_dir, exist_ok=True)
 
 # Store connected WebSocket clients
 connected_clients = set()
 
+def on_spec_reload(spec_name, diff):
+    """Drops cached work for a spec whose operations changed on disk."""
+    if diff.operations:
+        execution_sequences.pop(spec_name, None)  # regenerated on the next session
+    if spec_name == default_spec:
+        llm_gen.prompt_encoder = PromptEncoder.from_parser(parser)  # aliases point at the re-resolved schemas
+    if spec_name in response_validators:
+        response_validators[spec_name].reload(diff)  # changed operations are validated against the new schemas
+    logging.info(f"🔄 Spec '{spec_name}' reloaded: {diff.summary()}")
+
+def spec_target(spec_name):
+    """Returns the base URL and the (shared) AuthProvider for a registered spec's requests."""
+    return (spec_registry.get_base_url(spec_name, base_urls.get(spec_name)),
+            spec_registry.get_auth_provider(spec_name, auth_credentials.get(spec_name)))
+
+def get_response_validator(spec_name):
+    """Returns the spec's ResponseValidator, or None when `validate_responses` is off."""
+    if not validate_responses:
+        return None
+    if spec_name not in response_validators:
+        response_validators[spec_name] = ResponseValidator(spec_registry.get_parser(spec_name), validate_responses)
+    return response_validators[spec_name]
+
+def get_execution_sequence(spec_name):
+    """Returns the (cached) execution order for a registered spec."""
+    cached = spec_name in execution_sequences
+    METRICS.cache_lookup("execution_sequence", cached)
+    if not cached:
+        refine = llm_gen.generate_sequence if refine_sequence_with_llm else None
+        execution_sequences[spec_name] = plan_sequence(spec_registry.get_endpoints(spec_name), refine)  # ✅ Local, ms
+    return execution_sequences[spec_name]
+
 # --------------------------
 # FastAPI Endpoints
 # --------------------------
 
+@app.on_event("startup")
+async def watch_specs():
+    """Applies spec edits incrementally while the server runs."""
+    asyncio.create_task(spec_registry.watch(interval=1.0, on_reload=on_spec_reload))
+
 @app.get("/")
 async def serve_index():
     """Serve the unified chat & graph visualization UI."""
@@ -58,22 +121,47 @@ async def websocket_endpoint(websocket: WebSocket):
     """Handles WebSocket connections for real-time API execution updates."""
     await websocket.accept()
     connected_clients.add(websocket)
+    spec_name = default_spec  # Each session can pick its own target spec
+    session_executor = journal = None
 
     try:
-        await websocket.send_json({"message": "Welcome to API Testing! Type 'start' to begin."})
+        await websocket.send_json({"message": "Welcome to API Testing! Type 'start' to begin, or 'use <spec>' to switch spec."})
         command = await websocket.receive_text()
+        while command.lower().startswith("use "):
+            requested = command[4:].strip()
+            if requested in spec_registry.parsers:
+                spec_name = requested
+                await websocket.send_json({"message": f"Using spec '{spec_name}'. Type 'start' to begin."})
+            else:
+                await websocket.send_json({"message": f"Unknown spec '{requested}'. Available: {spec_registry.names()}"})
+            command = await websocket.receive_text()
+
         if command.lower() != "start":
             await websocket.send_json({"message": "Invalid command. Closing connection."})
             await websocket.close()
             return
 
+        api_map = spec_registry.get_endpoints(spec_name)
+        try:
+            session_base_url, session_auth = spec_target(spec_name)  # ✅ The spec's own host and credentials
+        except ValueError as e:
+            await websocket.send_json({"message": f"{e}. Closing connection."})
+            await websocket.close()
+            return
         await websocket.send_json({"message": f"Extracted {len(api_map)} endpoints."})
-        await websocket.send_json({"message": f"Execution Sequence: {execution_sequence}"})
+        # ✅ Per session: concurrent sessions (and specs) never share a tracker or tear down each other's resources
+        journal = TeardownJournal(os.path.join(teardown_dir, f"session-{uuid.uuid4().hex}.jsonl"))
+        session_executor = APIExecutor(session_base_url, auth_headers, tracer=api_executor.tracer, auth=session_auth,
+                                       transports=transports, tracker=ResourceTracker(api_map, journal),
+                                       api_map=api_map, validator=get_response_validator(spec_name))
 
         prev_api = None
-        for api in execution_sequence:
-            result = await workflow_manager.execute_api(*api.split(" ", 1))
-            
+
+        # planned names are operationIds: each is routed to its method and path
+        execute = operation_runner(api_map, workflow_manager.execute_api, executor=session_executor)
+
+        async def report(api, result):
+            nonlocal prev_api
             # Update visualization
             if prev_api:
                 await broadcast_update({"from": prev_api, "to": api})
@@ -83,16 +171,59 @@ async def websocket_endpoint(websocket: WebSocket):
 
             # Send real-time execution updates
             await websocket.send_json({
-                "api": api, 
-                "status": result["status_code"], 
+                "api": api,
+                "status": result["status_code"],
                 "time": result["execution_time"]
             })
 
+        if stream_sequence_from_llm:
+            # ✅ Requests start as soon as the LLM has named them and their producers have run
+            plan = SequencePlanner().plan(api_map)
+            await websocket.send_json({"message": "Execution Sequence: streaming from the LLM"})
+            await run_pipelined(llm_gen.stream_sequence(api_map), execute, dependency_map(plan.edges, plan.order),
+                                on_result=report)
+        else:
+            execution_sequence = get_execution_sequence(spec_name)
+            await websocket.send_json({"message": f"Execution Sequence: {execution_sequence}"})
+            for api in execution_sequence:
+                await report(api, await execute(api))
+
         await websocket.send_json({"message": "✅ API Execution Completed!"})
+
+        if teardown_after_run and len(journal):
+            summary = await Teardown(session_base_url, auth_headers, journal, auth=session_auth).run()
+            await websocket.send_json({"message": f"🧹 Teardown: {summary}"})
     except WebSocketDisconnect:
         logging.info("WebSocket disconnected.")
     finally:
         connected_clients.remove(websocket)
+        if session_executor is not None:
+            await session_executor.close()
+            journal.close()
+            if not len(journal):
+                journal.compact()  # nothing left: drop the file; otherwise it stays for `python teardown.py`
+
+@app.get("/specs")
+async def specs_endpoint():
+    """Lists the OpenAPI specs available to WebSocket sessions."""
+    return {"default": default_spec, "specs": spec_registry.names()}
+
+@app.post("/specs/{spec_name}/reload")
+async def reload_spec_endpoint(spec_name: str):
+    """Re-reads one spec now and reports what changed."""
+    if spec_name not in spec_registry.parsers:
+        return {"error": f"Unknown spec '{spec_name}'", "specs": spec_registry.names()}
+    diff = await asyncio.to_thread(spec_registry.reload, spec_name)
+    if diff:
+        on_spec_reload(spec_name, diff)
+    return diff.summary()
+
+@app.get("/metrics")
+async def metrics_endpoint(request: Request):
+    """Live request, LLM and cache metrics for Prometheus (OpenMetrics when the scraper asks for it)."""
+    if "application/openmetrics-text" in request.headers.get("accept", ""):
+        return PlainTextResponse(METRICS.render(openmetrics=True), media_type=OPENMETRICS_CONTENT_TYPE)
+    return PlainTextResponse(METRICS.render(), media_type=PROMETHEUS_CONTENT_TYPE)
 
 @app.get("/graph")
 async def graph_endpoint():
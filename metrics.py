@@ -2,6 +2,8 @@ from pydantic import BaseModel
 from typing import Optional, Dict, List
 import time
 
+from profiler import Profiler, span
+
 class APIExecutionState(BaseModel):
     """
     Tracks API execution metrics during load testing.
@@ -24,38 +26,63 @@ class APIExecutionState(BaseModel):
 
 
 
-async def run_load_test():
+async def run_load_test(profile: str = None, sample_interval: float = None):
     """
     Runs a load test with 100 concurrent users using LangGraph.
+    With `profile` (an output path prefix), a per-stage profile of the whole run is written there.
     """
     chain = langgraph.compile()  # Compile workflow
     states = [APIExecutionState() for _ in range(100)]  # Create 100 state instances
 
-    async for result in chain.abatch(states, stream_mode="values"):
-        print(result)  # Process each result
+    run_profiler = Profiler(sample_interval).start() if profile else None
+    try:
+        async for result in chain.abatch(states, stream_mode="values"):
+            print(result)  # Process each result
+    finally:
+        if run_profiler:
+            run_profiler.stop()
+            run_profiler.write(profile)
 
     generate_report(states)  # Generate performance report
 
-# Run load test
-asyncio.run(run_load_test())
-
-
-
 import asyncio
+import contextlib
 
-async def execute_api(state: APIExecutionState, api_name: str, request_func):
+from live_metrics import METRICS
+
+async def execute_api(state: APIExecutionState, api_name: str, request_func, rate_limiter=None, sink=None,
+                      virtual_user: int = -1):
     """
     Executes an API, records execution time, and updates state.
+    When a RateLimiter is given, the call waits for a token first (not counted in the timing).
+    With a ResultSink, each call is also streamed out as a row instead of only kept in `state`.
     """
-    start_time = time.time()  # Start timing
-    response = await request_func()  # Simulate API request (Replace with actual API call)
-    end_time = time.time()  # End timing
+    limit = rate_limiter.limit(api_name=api_name) if rate_limiter else contextlib.nullcontext()
+    async with limit:
+        start_time = time.time()  # Start timing
+        started = METRICS.request_started(api_name)  # ✅ Live counters for /metrics
+        try:
+            with span("network"):
+                response = await request_func()  # Simulate API request (Replace with actual API call)
+        except Exception as error:
+            METRICS.request_failed(api_name, error, started)
+            raise
+        end_time = time.time()  # End timing
+        METRICS.request_finished(api_name, response.status_code if response else "unknown", started)
+
+    if rate_limiter and response is not None:
+        rate_limiter.observe(api_name=api_name, status=response.status_code,
+                             retry_after=getattr(response, "headers", {}).get("Retry-After"))
 
     # Calculate execution time
     execution_time = end_time - start_time
 
     # Log API execution metrics
     state.log_api_execution(api_name, execution_time)
+    if sink is not None:
+        sink.record(api_name, getattr(response, "status_code", 0), start_time, virtual_user,
+                    bytes_received=len(getattr(response, "content", b"") or b""),
+                    phases={"total_ms": execution_time * 1000})
 
     # Store result
     state.execution_results[api_name] = {
@@ -91,3 +118,8 @@ def generate_report(states: List[APIExecutionState]):
         print(f"   - Avg Time per Call: {avg_time:.2f}s\n")
 
     print(f"🚀 Total Execution Time: {total_time:.2f}s\n")
+
+
+# Run load test
+if __name__ == "__main__":
+    asyncio.run(run_load_test())
@@ -0,0 +1,395 @@
+import asyncio
+import copy
+import logging
+import random
+import re
+import threading
+from urllib.parse import urlsplit
+
+import json_codec
+from openapi_parser import OpenAPIParser
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+H2_PREFACE = b"PRI * HTTP/2.0\r\n\r\nSM\r\n\r\n"
+REASONS = {200: "OK", 201: "Created", 204: "No Content", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 429: "Too Many Requests", 500: "Internal Server Error",
+           502: "Bad Gateway", 503: "Service Unavailable", 504: "Gateway Timeout"}
+
+
+class LatencyModel:
+    """
+    Samples artificial response latency (in seconds).
+
+    Supported distributions: "none", "fixed", "uniform", "normal", "exponential" and "lognormal".
+    """
+
+    DISTRIBUTIONS = ("none", "fixed", "uniform", "normal", "exponential", "lognormal")
+
+    def __init__(self, distribution: str = "none", mean: float = 0.0, stddev: float = 0.0,
+                 low: float = 0.0, high: float = 0.0, rng: random.Random = None):
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {distribution}")
+        self.distribution = distribution
+        self.mean = mean
+        self.stddev = stddev
+        self.low = low
+        self.high = high
+        self.rng = rng or random.Random()
+
+    def sample(self) -> float:
+        if self.distribution == "none":
+            return 0.0
+        if self.distribution == "fixed":
+            return self.mean
+        if self.distribution == "uniform":
+            return self.rng.uniform(self.low, self.high)
+        if self.distribution == "normal":
+            return max(0.0, self.rng.gauss(self.mean, self.stddev))
+        if self.distribution == "exponential":
+            return self.rng.expovariate(1.0 / self.mean) if self.mean > 0 else 0.0
+        # lognormal: `mean`/`stddev` describe the underlying normal distribution
+        return self.rng.lognormvariate(self.mean, self.stddev)
+
+
+class MockRoute:
+    def __init__(self, method: str, path: str, endpoint: dict):
+        """
+        Precomputes everything needed to answer one operation.
+        """
+        self.method = method
+        self.path = path
+        self.api_name = f"{method} {path}"
+        self.param_names = re.findall(r"{([^}]+)}", path)
+        pattern = "".join("([^/]+)" if part.startswith("{") else re.escape(part)
+                          for part in re.split(r"({[^}]+})", path))
+        self.regex = re.compile(f"^{pattern}$")
+        self.literal_segments = sum(1 for part in path.split("/") if part and not part.startswith("{"))
+
+        segments = path.rstrip("/").split("/")
+        self.item_param = segments[-1][1:-1] if segments[-1].startswith("{") else None
+        self.collection = "/".join(segments[:-1]) if self.item_param else path.rstrip("/")
+
+        self.status, self.example = self._success_response(endpoint.get("responses", {}))
+        self.request_example = endpoint.get("request_body")
+
+    @staticmethod
+    def _success_response(responses):
+        for status in sorted(responses):
+            if status.startswith("2"):
+                return int(status), responses[status]
+        if "default" in responses:
+            return 200, responses["default"]
+        return 200, {}
+
+
+class MockAPIServer:
+    """
+    In-process HTTP mock generated from the `OpenAPIParser` endpoint map.
+
+    Answers every operation with an example body built from its response schema,
+    keeps created resources in memory (POST creates, GET/PUT/DELETE act on them)
+    and can inject latency and errors. Seed it for deterministic runs. Speaks HTTP/1.1,
+    and cleartext HTTP/2 (h2c, prior knowledge) when the `h2` package is installed.
+    """
+
+    def __init__(self, endpoints: dict, host: str = "127.0.0.1", port: int = 0, base_path: str = "",
+                 latency: LatencyModel = None, operation_latency: dict = None, error_rate: float = 0.0,
+                 error_statuses=(500, 503), operation_error_rates: dict = None, stateful: bool = True,
+                 seed: int = None):
+        self.host = host
+        self.port = port
+        self.base_path = base_path.rstrip("/")
+        self.rng = random.Random(seed)
+        self.latency = latency or LatencyModel(rng=self.rng)
+        self.operation_latency = operation_latency or {}
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.operation_error_rates = operation_error_rates or {}
+        self.stateful = stateful
+
+        self.routes = {}  # method -> [MockRoute], most specific first
+        self.static_routes = {}  # (method, path) -> MockRoute for templates without parameters
+        for endpoint in endpoints.values():
+            route = MockRoute(endpoint["method"], endpoint["path"], endpoint)
+            self.routes.setdefault(route.method, []).append(route)
+            if not route.param_names:
+                self.static_routes[(route.method, route.path)] = route
+        for routes in self.routes.values():
+            routes.sort(key=lambda r: (-r.literal_segments, len(r.param_names)))
+
+        # Collections that can be created through POST are served from the in-memory store
+        self.creatable = {r.collection for r in self.routes.get("POST", []) if not r.item_param}
+        self.resources = {collection: {} for collection in self.creatable}
+        self.next_id = 1
+        self.request_counts = {}  # api_name -> requests served
+        self.injected_errors = 0
+        self.connections_opened = 0  # sockets accepted, to compare HTTP/1.1 with multiplexed HTTP/2
+        self._server = None
+        self._connections = {}  # writer -> handler task
+        self._thread_loop = None
+
+    @classmethod
+    def from_spec(cls, openapi_file: str, **kwargs):
+        """
+        Builds a mock server straight from an OpenAPI file.
+        """
+        return cls(OpenAPIParser(openapi_file).get_all_endpoints(), **kwargs)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}{self.base_path}"
+
+    # --------------------------
+    # Request handling
+    # --------------------------
+
+    def match(self, method: str, path: str):
+        """
+        Finds the route and path parameters for a request path.
+        """
+        route = self.static_routes.get((method, path))
+        if route:
+            return route, {}
+        for route in self.routes.get(method, []):
+            found = route.regex.match(path)
+            if found:
+                return route, dict(zip(route.param_names, found.groups()))
+        return None, {}
+
+    def respond(self, method: str, path: str, payload=None):
+        """
+        Computes the (status, body) answer for a request without any latency.
+        """
+        _, status, body = self._respond(method, path, payload)
+        return status, body
+
+    def _respond(self, method, path, payload):
+        if self.base_path and path.startswith(self.base_path):
+            path = path[len(self.base_path):] or "/"
+        route, params = self.match(method.upper(), path)
+        if route is None:
+            return None, 404, {"code": 404, "message": f"No operation for {method} {path}"}
+
+        self.request_counts[route.api_name] = self.request_counts.get(route.api_name, 0) + 1
+        error_rate = self.operation_error_rates.get(route.api_name, self.error_rate)
+        if error_rate and self.rng.random() < error_rate:
+            self.injected_errors += 1
+            status = self.rng.choice(self.error_statuses)
+            return route, status, {"code": status, "message": "Injected error"}
+
+        if self.stateful and route.collection in self.creatable:
+            return (route, *self._crud(route, params, payload))
+        return route, route.status, route.example
+
+    def _crud(self, route, params, payload):
+        store = self.resources[route.collection]
+        item_id = params.get(route.item_param) if route.item_param else None
+        if item_id is None and isinstance(payload, dict) and "id" in payload:
+            item_id = payload["id"]
+
+        if route.method == "POST" and not route.item_param:
+            resource = copy.deepcopy(route.example) if isinstance(route.example, dict) else {}
+            resource.pop("id", None)  # never reuse the schema's example id
+            if isinstance(payload, dict):
+                resource.update(payload)
+            if resource.get("id") is None:
+                resource["id"] = self.next_id
+                self.next_id += 1
+            store[str(resource["id"])] = resource
+            return route.status, resource
+
+        if item_id is None:
+            if route.method == "GET":
+                return route.status, list(store.values())
+            return 400, {"code": 400, "message": "Missing resource id"}
+
+        resource = store.get(str(item_id))
+        if resource is None:
+            return 404, {"code": 404, "message": f"{route.collection} {item_id} not found"}
+        if route.method == "DELETE":
+            del store[str(item_id)]
+            return route.status, {"code": route.status, "message": str(item_id)}
+        if route.method in ("PUT", "PATCH", "POST") and isinstance(payload, dict):
+            resource.update({k: v for k, v in payload.items() if k != "id"})
+        return route.status, resource
+
+    async def handle(self, method: str, target: str, body: bytes = b""):
+        """
+        Answers one HTTP request, applying the configured latency.
+        """
+        path = urlsplit(target).path
+        try:
+            payload = json_codec.loads(body) if body else None
+        except ValueError:
+            return 400, {"code": 400, "message": "Invalid JSON body"}
+
+        route, status, response = self._respond(method, path, payload)
+        model = self.operation_latency.get(route.api_name, self.latency) if route else self.latency
+        delay = model.sample()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return status, response
+
+    # --------------------------
+    # HTTP/1.1 transport
+    # --------------------------
+
+    async def _serve_connection(self, reader, writer):
+        self._connections[writer] = asyncio.current_task()
+        self.connections_opened += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                if request_line == H2_PREFACE[:16]:
+                    await self._serve_http2(reader, writer)
+                    break
+                method, target, version = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                body = await reader.readexactly(length) if length else b""
+
+                status, response = await self.handle(method, target, body)
+                data = b"" if status == 204 else json_codec.dumps(response)
+                keep_alive = version.strip() == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS.get(status, 'Unknown')}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError, ValueError):
+            pass
+        finally:
+            self._connections.pop(writer, None)
+            writer.close()
+
+    # --------------------------
+    # HTTP/2 transport (cleartext h2c with prior knowledge; needs the `h2` package)
+    # --------------------------
+
+    async def _serve_http2(self, reader, writer):
+        try:
+            import h2.config
+            import h2.connection
+            import h2.events
+        except ImportError:
+            logging.warning("⚠️ HTTP/2 client connected but the `h2` package is not installed; closing")
+            return
+
+        connection = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False, header_encoding="utf-8"))
+        connection.initiate_connection()
+        connection.receive_data(H2_PREFACE[:16] + await reader.readexactly(len(H2_PREFACE) - 16))
+        writer.write(connection.data_to_send())
+        streams, responders = {}, set()  # stream id -> (headers, body)
+
+        async def respond(stream_id, headers, body):
+            status, response = await self.handle(headers[":method"], headers[":path"], bytes(body))
+            data = b"" if status == 204 else json_codec.dumps(response)
+            connection.send_headers(stream_id, [(":status", str(status)), ("content-type", "application/json"),
+                                                ("content-length", str(len(data)))], end_stream=not data)
+            for offset in range(0, len(data), connection.max_outbound_frame_size):
+                chunk = data[offset:offset + connection.max_outbound_frame_size]
+                connection.send_data(stream_id, chunk, end_stream=offset + len(chunk) >= len(data))
+            writer.write(connection.data_to_send())
+
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                break
+            for event in connection.receive_data(data):
+                if isinstance(event, h2.events.RequestReceived):
+                    streams[event.stream_id] = (dict(event.headers), bytearray())
+                elif isinstance(event, h2.events.DataReceived):
+                    streams[event.stream_id][1].extend(event.data)
+                    connection.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                elif isinstance(event, h2.events.StreamEnded):
+                    task = asyncio.create_task(respond(event.stream_id, *streams.pop(event.stream_id)))
+                    responders.add(task)  # streams are answered concurrently, in any order
+                    task.add_done_callback(responders.discard)
+                elif isinstance(event, h2.events.ConnectionTerminated):
+                    return
+            writer.write(connection.data_to_send())
+            await writer.drain()
+
+    async def start(self):
+        """
+        Starts listening; with `port=0` an ephemeral port is chosen.
+        """
+        self._server = await asyncio.start_server(self._serve_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logging.info(f"🧪 Mock API server listening on {self.base_url}")
+        return self
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            handlers = list(self._connections.values())
+            for writer in list(self._connections):
+                writer.close()  # wakes idle keep-alive readers so they exit cleanly
+            await asyncio.gather(*handlers, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    def start_in_thread(self) -> str:
+        """
+        Runs the server on a background event loop (for synchronous clients) and returns its base URL.
+        """
+        started = threading.Event()
+
+        def run():
+            self._thread_loop = asyncio.new_event_loop()
+            self._thread_loop.run_until_complete(self.start())
+            started.set()
+            self._thread_loop.run_forever()
+
+        threading.Thread(target=run, name="mock-api-server", daemon=True).start()
+        started.wait()
+        return self.base_url
+
+    def stop_thread(self):
+        if self._thread_loop:
+            asyncio.run_coroutine_threadsafe(self.stop(), self._thread_loop).result()
+            self._thread_loop.call_soon_threadsafe(self._thread_loop.stop)
+            self._thread_loop = None
+
+
+# Example Usage
+if __name__ == "__main__":
+    import argparse
+
+    cli = argparse.ArgumentParser(description="Serve a mock API generated from an OpenAPI spec.")
+    cli.add_argument("spec", nargs="?", default="openapi_specs/petstore.yaml")
+    cli.add_argument("--port", type=int, default=8080)
+    cli.add_argument("--latency-ms", type=float, default=0.0, help="Mean exponential latency")
+    cli.add_argument("--error-rate", type=float, default=0.0)
+    cli.add_argument("--seed", type=int, default=None)
+    args = cli.parse_args()
+
+    rng = random.Random(args.seed)
+    latency = LatencyModel("exponential", mean=args.latency_ms / 1000, rng=rng) if args.latency_ms else None
+    server = MockAPIServer.from_spec(args.spec, port=args.port, latency=latency,
+                                     error_rate=args.error_rate, seed=args.seed)
+
+    async def serve_forever():
+        async with server:
+            await asyncio.Event().wait()
+
+    asyncio.run(serve_forever())
@@ -1,10 +1,32 @@
+import json
 import yaml
 import os
 import logging
+import profiler
+from schema_resolver import SchemaResolver
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
+HTTP_METHODS = {"get", "put", "post", "delete", "options", "head", "patch", "trace"}
+MAX_EXAMPLE_DEPTH = 10
+EMPTY_SCHEMA = {}  # shared default, so example memoisation never sees a short-lived id
+
+
+def load_document(openapi_file: str) -> dict:
+    """
+    Parses a JSON or YAML spec file (module-level so process pools can pickle it).
+    """
+    with open(openapi_file, "r", encoding="utf-8") as file:
+        if openapi_file.endswith(".json"):
+            return json.load(file)
+        return yaml.load(file, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+
+def _is_leaf(schema) -> bool:
+    return isinstance(schema, dict) and ("example" in schema or "enum" in schema or
+                                         schema.get("type") in ("string", "integer", "number", "boolean"))
+
+
 class OpenAPIParser:
     def __init__(self, openapi_file: str):
         """
@@ -13,6 +35,9 @@ class OpenAPIParser:
         self.openapi_file = openapi_file
         self.api_map = {}  # Caches API details
         self.schema_definitions = {}  # Stores schema references
+        self.spec = {}  # Full parsed document (needed for non-schema `$ref`s)
+        self._resolver = None
+        self._examples = {}  # (id(resolved schema), variant) -> (complete example, reach), shared across calls
 
     def load_openapi_spec(self):
         """
@@ -22,15 +47,35 @@ class OpenAPIParser:
             raise FileNotFoundError(f"OpenAPI spec not found: {self.openapi_file}")
 
         try:
-            with open(self.openapi_file, "r", encoding="utf-8") as file:
-                spec = yaml.safe_load(file)
-                self.schema_definitions = spec.get("components", {}).get("schemas", {})
-                self.api_map = spec.get("paths", {})
-                logging.info("OpenAPI spec loaded successfully.")
+            with profiler.span("parse"):
+                self.load_openapi_dict(load_document(self.openapi_file))
+            logging.info("OpenAPI spec loaded successfully.")
         except Exception as e:
             logging.error(f"Failed to load OpenAPI spec: {e}")
-            self.schema_definitions = {}
-            self.api_map = {}
+            self.load_openapi_dict({})
+
+    def load_openapi_dict(self, spec: dict):
+        """
+        Uses an already-parsed OpenAPI document.
+        """
+        self.spec = spec
+        # Swagger 2 keeps schemas under `definitions`
+        self.schema_definitions = spec.get("components", {}).get("schemas", spec.get("definitions", {}))
+        self.api_map = spec.get("paths", {})
+        self._resolver = None
+        self._examples = {}
+
+    @property
+    def resolver(self) -> SchemaResolver:
+        """
+        Shared `$ref` resolver; resolved components are memoised across all calls.
+        """
+        if not self.spec and not self.schema_definitions and os.path.exists(self.openapi_file):
+            self.load_openapi_spec()
+        if self._resolver is None:
+            spec = self.spec or {"components": {"schemas": self.schema_definitions}}
+            self._resolver = SchemaResolver(spec, self.openapi_file)
+        return self._resolver
 
     def extract_api_endpoints(self):
         """
@@ -40,86 +85,163 @@ class OpenAPIParser:
             self.load_openapi_spec()
 
         extracted_endpoints = {}
-        for path, methods in self.api_map.items():
-            for method, details in methods.items():
-                operation_id = details.get("operationId", f"{method.upper()} {path}")
-                extracted_endpoints[operation_id] = {
-                    "method": method.upper(),
-                    "path": path,
-                    "parameters": details.get("parameters", []),
-                    "request_body": self.extract_request_body(details),
-                }
+        with profiler.span("parse"):
+            for path, methods in self.api_map.items():
+                for method, details in methods.items():
+                    if method not in HTTP_METHODS:
+                        continue
+                    operation_id, endpoint = self.extract_operation(path, method)
+                    extracted_endpoints[operation_id] = endpoint
         return extracted_endpoints
 
+    def extract_operation(self, path, method):
+        """
+        Extracts a single operation, returning `(operation id, endpoint details)`.
+        """
+        path_item = self.api_map[path]
+        details = path_item[method]
+        path_parameters = path_item.get("parameters", [])  # shared by every operation on the path
+        operation_id = details.get("operationId", f"{method.upper()} {path}")
+        return operation_id, {
+            "method": method.upper(),
+            "path": path,
+            "parameters": self.resolver.resolve(path_parameters + details.get("parameters", [])),
+            "request_body": self.extract_request_body(details),
+            "responses": self.extract_response_bodies(details),
+        }
+
     def extract_request_body(self, details):
         """
         Extracts request body, resolving `$ref` if present.
         """
-        request_body = details.get("requestBody", {}).get("content", {}).get("application/json", {})
-        schema = request_body.get("schema", {})
-
-        if "$ref" in schema:
-            ref_key = schema["$ref"].split("/")[-1]
-            return self.resolve_schema(ref_key)
+        request_body = self.resolver.resolve(details.get("requestBody", {}))
+        schema = request_body.get("content", {}).get("application/json", {}).get("schema", {})
         return self.extract_example_payload(schema)
 
-    def resolve_schema(self, schema_name, depth=0):
+    def extract_response_bodies(self, details):
+        """
+        Extracts an example JSON body for each declared response status code.
+        """
+        responses = {}
+        for status, response in details.get("responses", {}).items():
+            response = self.resolver.resolve(response)
+            # OpenAPI 3 nests the schema under `content`; Swagger 2 puts it on the response itself
+            content = response.get("content", {}).get("application/json", response)
+            responses[str(status)] = self.extract_example_payload(content["schema"]) if "schema" in content else None
+        return responses
+
+    def get_schema(self, schema_name):
+        """
+        Returns the resolved schema for a component name or any `$ref` string.
+
+        The result is shared with every other reference to the same component; do not mutate it.
+        """
+        ref = schema_name if "#" in schema_name or "/" in schema_name else f"#/components/schemas/{schema_name}"
+        if ref.startswith("#/components/schemas/") and not self.spec.get("components") and "definitions" in self.spec:
+            ref = ref.replace("#/components/schemas/", "#/definitions/", 1)
+        try:
+            return self.resolver.resolve_ref(ref)
+        except (KeyError, FileNotFoundError) as e:
+            logging.warning(f"Could not resolve schema {schema_name}: {e}")
+            return {}
+
+    def get_schema_variants(self, schema_name):
+        """
+        Returns every `oneOf`/`anyOf` alternative of a schema (a single-item list otherwise).
+        """
+        return self.resolver.variants(self.get_schema(schema_name))
+
+    def resolve_schema(self, schema_name, depth=0, variant=0):
         """
-        Recursively resolves OpenAPI `$ref` schema references, `allOf`, `oneOf`, and `anyOf`.
+        Resolves an OpenAPI schema (`$ref`, deep-merged `allOf`, `oneOf`/`anyOf`) and returns an example payload.
 
-        :param schema_name: The schema name to resolve.
-        :param depth: Recursion depth to prevent infinite loops.
-        :return: The fully resolved schema.
+        :param schema_name: The schema name (or `$ref` string) to resolve.
+        :param depth: Starting depth; nesting beyond 10 levels is cut off.
+        :param variant: Which `oneOf`/`anyOf` alternative to use for composed schemas.
+        :return: An example payload conforming to the schema.
         """
-        if depth > 10:  # Prevent infinite loops
+        if depth > MAX_EXAMPLE_DEPTH:  # Prevent infinite loops
             return {}
+        return self.build_example(self.get_schema(schema_name), variant, depth)
 
-        schema = self.schema_definitions.get(schema_name, {})
-        resolved_schema = {}
-
-        # Handle `allOf` - Merge all schemas
-        if "allOf" in schema:
-            for subschema in schema["allOf"]:
-                ref_key = subschema.get("$ref", "").split("/")[-1] if "$ref" in subschema else None
-                resolved_part = self.resolve_schema(ref_key, depth + 1) if ref_key else subschema
-                resolved_schema.update(resolved_part)
-
-        # Handle `oneOf` and `anyOf` - Pick the first valid schema
-        elif "oneOf" in schema or "anyOf" in schema:
-            options = schema.get("oneOf", schema.get("anyOf", []))
-            ref_key = options[0].get("$ref", "").split("/")[-1] if options and "$ref" in options[0] else None
-            return self.resolve_schema(ref_key, depth + 1) if ref_key else options[0]
-
-        # Process `properties`
-        if "properties" in schema:
-            for key, value in schema["properties"].items():
-                if "$ref" in value:
-                    ref_key = value["$ref"].split("/")[-1]
-                    resolved_schema[key] = self.resolve_schema(ref_key, depth + 1)
-                elif "enum" in value:
-                    resolved_schema[key] = value["enum"][0]  # Pick first enum value
-                else:
-                    resolved_schema[key] = self.extract_example_payload(value)
-
-        return resolved_schema
-
-    def extract_example_payload(self, schema):
+    def extract_example_payload(self, schema, variant=0):
         """
         Generates an example payload based on schema properties.
         """
-        if "example" in schema:
-            return schema["example"]
-        elif schema.get("type") == "string":
-            return "sample_string"
-        elif schema.get("type") == "integer":
-            return 123
-        elif schema.get("type") == "boolean":
-            return True
-        elif schema.get("type") == "array":
-            return [self.extract_example_payload(schema.get("items", {}))]
-        elif schema.get("type") == "object":
-            return {k: self.extract_example_payload(v) for k, v in schema.get("properties", {}).items()}
-        return None  # Default case
+        return self.build_example(self.resolver.resolve(schema), variant)
+
+    def build_example(self, schema, variant=0, depth=0):
+        """
+        Builds an example from a resolved schema.
+
+        Examples are memoised per resolved subschema, so every component is built once and
+        shared by all payloads that use it (copy before mutating). Subschemas reached
+        through a cycle are omitted. Only complete subtrees are memoised, so a payload
+        never depends on which schema happened to be built first.
+        """
+        return self._example(schema, variant, depth, set())[0]
+
+    def _example(self, schema, variant, depth, active):
+        """
+        Returns `(example, truncated, reach)`: `truncated` when a cycle or the depth limit cut
+        something off below `schema`, `reach` the deepest non-leaf level below it (-1 for leaves).
+        """
+        if not isinstance(schema, dict):
+            return None, False, -1
+        if id(schema) in active:
+            return None, True, 0
+        if depth > MAX_EXAMPLE_DEPTH and not _is_leaf(schema):
+            return None, True, 0  # leaves are still filled in, so a cut-off object keeps its scalar fields
+        key = (id(schema), variant)
+        cached = self._examples.get(key)
+        if cached is not None and depth + cached[1] <= MAX_EXAMPLE_DEPTH:
+            return cached[0], False, cached[1]  # a complete subtree that still fits below `depth`
+
+        truncated, reach = False, -1 if _is_leaf(schema) else 0
+
+        def child(subschema):
+            nonlocal truncated, reach
+            example, cut, child_reach = self._example(subschema, variant, depth + 1, active)
+            truncated = truncated or cut
+            if child_reach >= 0:
+                reach = max(reach, child_reach + 1)
+            return example
+
+        active.add(id(schema))
+        try:
+            if "example" in schema:
+                example = schema["example"]
+            elif "enum" in schema:
+                example = schema["enum"][0]  # Pick first enum value
+            elif "oneOf" in schema or "anyOf" in schema:
+                options = schema.get("oneOf") or schema.get("anyOf")
+                example = child(options[min(variant, len(options) - 1)])
+            elif schema.get("type") == "string":
+                example = "sample_string"
+            elif schema.get("type") == "integer":
+                example = 123
+            elif schema.get("type") == "number":
+                example = 1.5
+            elif schema.get("type") == "boolean":
+                example = True
+            elif schema.get("type") == "array":
+                item = child(schema.get("items", EMPTY_SCHEMA))
+                example = [item] if item is not None else []
+            elif schema.get("type") == "object" or "properties" in schema:
+                example = {}
+                for name, value in schema.get("properties", {}).items():
+                    value_example = child(value)
+                    cut = id(value) in active or (depth + 1 > MAX_EXAMPLE_DEPTH and not _is_leaf(value))
+                    if value_example is not None or not cut:
+                        example[name] = value_example
+            else:
+                example = None  # Default case
+        finally:
+            active.discard(id(schema))
+
+        if not truncated:
+            self._examples[key] = (example, reach)
+        return example, truncated, reach
 
     def get_all_endpoints(self):
         """
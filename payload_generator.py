@@ -30,4 +30,12 @@ def generate_example_value(schema):
     elif schema_type == "array":
         item_schema = schema.get("items", {})
         return [generate_example_value(item_schema)]
-    elif schema_ty
+    elif schema_type == "number":
+        return round(random.uniform(1, 100), 2)
+    elif schema_type == "object" or "properties" in schema:
+        return {key: generate_example_value(value) for key, value in schema.get("properties", {}).items()}
+    return None
+
+def generate_payload(schema, components):
+    """Generate an example payload for a request schema, resolving $ref against components."""
+    return generate_example_value(resolve_ref(schema, components))
@@ -0,0 +1,234 @@
+import asyncio
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import sys
+import threading
+from time import perf_counter_ns
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+NETWORK_STAGE = "network"  # time spent waiting on the target API; everything else is framework overhead
+
+_current = contextvars.ContextVar("profiler_span", default=None)
+_disabled = contextlib.nullcontext()
+active = None  # the running Profiler, if any
+
+
+def span(stage: str):
+    """
+    Times `stage` under the running profiler (a shared no-op when profiling is off).
+    Works as a plain `with` block in sync and async code alike.
+    """
+    return active.span(stage) if active is not None else _disabled
+
+
+class _Span:
+    __slots__ = ("profiler", "stage", "path", "parent", "child_ns", "start", "token", "owner")
+
+    def __init__(self, profiler, stage):
+        self.profiler = profiler
+        self.stage = stage
+
+    def __enter__(self):
+        parent = self.parent = _current.get()
+        self.path = (parent.path if parent is not None else ()) + (self.stage,)
+        self.child_ns = 0
+        self.token = _current.set(self)
+        if self.profiler.sampling:
+            self.owner = _owner()
+            self.profiler.owners[self.owner] = self.path
+        self.start = perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = perf_counter_ns() - self.start
+        _current.reset(self.token)
+        parent = self.parent
+        if parent is not None:
+            parent.child_ns += elapsed
+        if self.profiler.sampling:
+            if parent is not None:
+                self.profiler.owners[self.owner] = parent.path
+            else:
+                self.profiler.owners.pop(self.owner, None)
+        # concurrent children (gather) can overlap, so self time is clamped at zero
+        self.profiler._record(self.path, elapsed, max(elapsed - self.child_ns, 0))
+        return False
+
+
+def _owner():
+    """The asyncio task running this code, or the thread when there is none."""
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    return task if task is not None else threading.get_ident()
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class Profiler:
+    """
+    Opt-in profiler for workflow and load-test runs.
+
+    Stage spans (`parse`, `llm`, `payload`, `request`, `network`, `workflow`, ...) follow
+    asyncio tasks through a context variable, so concurrent virtual users each keep their
+    own stage stack. With `sample_interval` set, a background thread also samples the
+    Python stacks of every other thread and tags them with the stage the running task is in.
+
+    `write(prefix)` produces folded stacks (`<prefix>.spans.folded`, `<prefix>.samples.folded`)
+    for flamegraph.pl / speedscope / inferno, and a per-stage summary (`<prefix>.summary.json`)
+    that splits wall time into target latency (`network`) and framework overhead.
+    """
+
+    def __init__(self, sample_interval: float = None, max_depth: int = 64):
+        self.sample_interval = sample_interval
+        self.max_depth = max_depth
+        self.sampling = bool(sample_interval)
+        self.stats = {}  # stage path -> [count, total ns, self ns]
+        self.samples = {}  # folded stack -> count
+        self.owners = {}  # task or thread id -> stage path it is in
+        self.started = self.stopped = 0
+        self._loop = None
+        self._loop_thread = None
+        self._sampler = None
+        self._stop = threading.Event()
+        self._previous = None
+
+    def span(self, stage: str) -> _Span:
+        return _Span(self, stage)
+
+    def _record(self, path, elapsed, self_ns):
+        entry = self.stats.get(path)
+        if entry is None:
+            self.stats[path] = [1, elapsed, self_ns]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] += self_ns
+
+    # --------------------------
+    # Start / stop
+    # --------------------------
+
+    def start(self):
+        global active
+        self._previous, active = active, self
+        self.started = perf_counter_ns()
+        if self.sampling:
+            try:
+                self._loop = asyncio.get_running_loop()
+                self._loop_thread = threading.get_ident()
+            except RuntimeError:
+                self._loop = None
+            self._stop.clear()
+            self._sampler = threading.Thread(target=self._sample_loop, name="profiler-sampler", daemon=True)
+            self._sampler.start()
+        return self
+
+    def stop(self):
+        global active
+        self.stopped = perf_counter_ns()
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+            self._sampler = None
+        active = self._previous
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    # --------------------------
+    # Stack sampling
+    # --------------------------
+
+    def _sample_loop(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.sample_interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own:
+                    self._sample(thread_id, frame)
+
+    def _sample(self, thread_id, frame):
+        owner = thread_id
+        if thread_id == self._loop_thread and self._loop is not None:
+            current_tasks = getattr(asyncio.tasks, "_current_tasks", {})  # read-only peek from this thread
+            owner = current_tasks.get(self._loop) or thread_id
+        stack = []
+        while frame is not None and len(stack) < self.max_depth:
+            stack.append(_frame_name(frame))
+            frame = frame.f_back
+        stack.reverse()
+        key = ";".join(("[" + "/".join(self.owners.get(owner, ("idle",))) + "]", *stack))
+        self.samples[key] = self.samples.get(key, 0) + 1
+
+    # --------------------------
+    # Output
+    # --------------------------
+
+    def folded_spans(self) -> list:
+        """`stage;stage;... <self microseconds>` lines, one per stage path."""
+        return [f"{';'.join(path)} {self_ns // 1000}" for path, (_, _, self_ns) in sorted(self.stats.items())
+                if self_ns >= 1000]
+
+    def folded_samples(self) -> list:
+        return [f"{stack} {count}" for stack, count in sorted(self.samples.items())]
+
+    def summary(self) -> dict:
+        """
+        Per-stage count/total/self time (ms), plus the split between target latency and framework time.
+        """
+        stages = {}
+        for path, (count, total_ns, self_ns) in self.stats.items():
+            stage = stages.setdefault(path[-1], {"count": 0, "total_ms": 0.0, "self_ms": 0.0})
+            stage["count"] += count
+            if path[-1] not in path[:-1]:  # recursive stages would count their time twice
+                stage["total_ms"] += total_ns / 1e6
+            stage["self_ms"] += self_ns / 1e6
+
+        busy_ms = sum(stage["self_ms"] for stage in stages.values())
+        target_ms = stages.get(NETWORK_STAGE, {}).get("self_ms", 0.0)
+        for stage in stages.values():
+            stage["total_ms"] = round(stage["total_ms"], 3)
+            stage["self_ms"] = round(stage["self_ms"], 3)
+            stage["self_share"] = round(stage["self_ms"] / busy_ms, 4) if busy_ms else 0.0
+        return {
+            "wall_ms": round(((self.stopped or perf_counter_ns()) - self.started) / 1e6, 3),
+            "busy_ms": round(busy_ms, 3),  # summed over concurrent tasks, so it can exceed wall time
+            "target_ms": round(target_ms, 3),
+            "framework_ms": round(busy_ms - target_ms, 3),
+            "stages": dict(sorted(stages.items(), key=lambda item: -item[1]["self_ms"])),
+            "samples": sum(self.samples.values()),
+        }
+
+    def write(self, prefix: str) -> list:
+        """
+        Writes the folded stacks and summary next to `prefix`; returns the written paths.
+        """
+        directory = os.path.dirname(prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        outputs = {f"{prefix}.spans.folded": self.folded_spans()}
+        if self.samples:
+            outputs[f"{prefix}.samples.folded"] = self.folded_samples()
+        for path, lines in outputs.items():
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("\n".join(lines) + "\n")
+        summary_path = f"{prefix}.summary.json"
+        summary = self.summary()
+        with open(summary_path, "w", encoding="utf-8") as file:
+            json.dump(summary, file, indent=2)
+        logging.info(f"🔥 Profile written to {prefix}.* (framework {summary['framework_ms']}ms, "
+                     f"target {summary['target_ms']}ms)")
+        return [*outputs, summary_path]
@@ -0,0 +1,307 @@
+import json
+import logging
+import math
+
+from schema_resolver import lookup_pointer
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+SCHEMA_KEYS = {"type", "properties", "items", "$ref", "allOf", "oneOf", "anyOf", "enum", "const",
+               "additionalProperties", "nullable", "format"}
+JSON_TYPES = {"string", "integer", "number", "boolean", "array", "object", "null"}
+TERSE_TYPES = {"string": "str", "integer": "int", "number": "num", "boolean": "bool", "null": "null"}
+MAX_ENUM_VALUES = 8
+
+
+_tokenizer = None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Token count with tiktoken when it is installed, otherwise the usual ~4 characters per token.
+    """
+    global _tokenizer
+    if _tokenizer is None:
+        try:
+            import tiktoken
+
+            _tokenizer = tiktoken.get_encoding("cl100k_base").encode
+        except Exception:  # not installed, or its encoding files cannot be fetched
+            _tokenizer = False
+    if not _tokenizer:
+        return math.ceil(len(text) / 4)
+    return len(_tokenizer(text))
+
+
+def is_schema(node) -> bool:
+    if not isinstance(node, dict) or not node.keys() & SCHEMA_KEYS:
+        return False
+    kind = node.get("type")
+    return kind is None or (kind in JSON_TYPES if isinstance(kind, str) else isinstance(kind, list))
+
+
+def _resource(name: str) -> str:
+    path = name.split(" ", 1)[-1]
+    return next((segment for segment in path.split("/") if segment and not segment.startswith("{")), "")
+
+
+class PromptEncoder:
+    """
+    Compact, token-budgeted text for LLM prompts.
+
+    Schemas (raw with `$ref`s, or resolved by `OpenAPIParser`) and example payloads become a
+    terse type notation, e.g. `{id:int,name:str,tags?:[Tag],status?:"available"|"sold"}`,
+    with descriptions, examples and other documentation keys dropped. Component schemas
+    used more than once (or recursively) are written once as `Name=...` and referenced by
+    alias. Anything over `token_budget` is re-encoded with shallower nesting, and long
+    endpoint lists are split into chunks that each fit.
+    """
+
+    def __init__(self, spec: dict = None, names: dict = None, token_budget: int = 1500, max_depth: int = 8):
+        self.spec = spec or {}
+        self.names = dict(names or {})  # id(resolved schema) -> component name
+        self.token_budget = token_budget
+        self.max_depth = max_depth
+
+    @classmethod
+    def from_parser(cls, parser, **options) -> "PromptEncoder":
+        """
+        Names the parser's resolved component schemas so they alias as `Pet`, `Order`, ...
+        """
+        names = {}
+        for name in parser.schema_definitions:
+            schema = parser.get_schema(name)
+            if isinstance(schema, dict) and schema:
+                names.setdefault(id(schema), name)
+        return cls(parser.spec, names, **options)
+
+    # --------------------------
+    # Schemas and examples
+    # --------------------------
+
+    def encode(self, value, max_depth: int = None) -> str:
+        """
+        Encodes one schema or example value, with alias definitions first.
+        """
+        max_depth = self.max_depth if max_depth is None else max_depth
+        counts, recursive = {}, set()
+        self._count(value, counts, recursive, [])
+        state = {
+            "aliases": {},  # id -> alias
+            "definitions": [],
+            "alias": {key for key, count in counts.items() if count > 1} | recursive,
+        }
+        body = self._encode(value, state, 0, max_depth)
+        return "\n".join(state["definitions"] + [body])
+
+    def fit(self, value, budget: int = None) -> str:
+        """
+        Encodes `value` within `budget` tokens, cutting nesting depth (then length) as needed.
+        """
+        budget = budget or self.token_budget
+        for depth in range(self.max_depth, -1, -1):
+            text = self.encode(value, depth)
+            if count_tokens(text) <= budget:
+                return text
+        logging.warning(f"⚠️ Prompt schema exceeds {budget} tokens even when flattened; truncating")
+        return text[:budget * 4 - 1] + "…"
+
+    def _target(self, node):
+        """Follows a local `$ref` to its raw target (None when it cannot be resolved here)."""
+        ref = node.get("$ref")
+        if not isinstance(ref, str) or not ref.startswith("#"):
+            return None
+        try:
+            return lookup_pointer(self.spec, ref[1:])
+        except (KeyError, IndexError, TypeError, ValueError):
+            return None
+
+    def _children(self, node):
+        if not isinstance(node, dict):
+            if isinstance(node, list):
+                return node[:1]
+            return ()
+        if not is_schema(node):
+            return node.values()
+        if "$ref" in node:
+            target = self._target(node)
+            return (target,) if target is not None else ()
+        children = list((node.get("properties") or {}).values())
+        for key in ("items", "additionalProperties"):
+            if isinstance(node.get(key), dict):
+                children.append(node[key])
+        for key in ("allOf", "oneOf", "anyOf"):
+            children.extend(node.get(key) or ())
+        return children
+
+    def _count(self, node, counts, recursive, stack):
+        if isinstance(node, dict) and "$ref" in node and self._target(node) is not None:
+            node = self._target(node)
+        if not isinstance(node, (dict, list)):
+            return
+        key = id(node)
+        if key in stack:
+            recursive.add(key)
+            return
+        counts[key] = counts.get(key, 0) + 1
+        if counts[key] > 1:
+            return
+        stack.append(key)
+        for child in self._children(node):
+            self._count(child, counts, recursive, stack)
+        stack.pop()
+
+    def _alias_name(self, node, state, ref=None):
+        name = self.names.get(id(node)) or (ref.rsplit("/", 1)[-1] if ref else None)
+        if not name or name in state["aliases"].values():
+            name = f"T{len(state['aliases']) + 1}"
+        return name
+
+    def _encode(self, node, state, depth, max_depth, ref=None):
+        if isinstance(node, dict) and "$ref" in node:
+            target = self._target(node)
+            if target is None:
+                return node["$ref"].rsplit("/", 1)[-1]  # external or unknown: the name is all we can give
+            return self._encode(target, state, depth, max_depth, node["$ref"])
+
+        key = id(node)
+        if key in state["aliases"]:
+            return state["aliases"][key]
+        if key in state["alias"] and isinstance(node, dict) and is_schema(node) and self._is_complex(node):
+            alias = state["aliases"][key] = self._alias_name(node, state, ref)
+            state["definitions"].append(f"{alias}={self._terse(node, state, 0, max_depth)}")
+            return alias
+        if depth > max_depth and self._is_container(node):
+            is_array = isinstance(node, list) or (is_schema(node) and (node.get("type") == "array" or "items" in node))
+            return self.names.get(key) or ("[…]" if is_array else "{…}")
+        return self._terse(node, state, depth, max_depth)
+
+    @staticmethod
+    def _is_container(node):
+        """Objects and arrays are cut at `max_depth`; scalar leaves are always spelled out."""
+        if isinstance(node, list):
+            return True
+        if not isinstance(node, dict):
+            return False
+        if not is_schema(node):
+            return True
+        return bool(node.get("type") in ("object", "array") or node.get("properties") or node.get("items")
+                    or node.get("allOf") or node.get("oneOf") or node.get("anyOf")
+                    or isinstance(node.get("additionalProperties"), dict))
+
+    @staticmethod
+    def _is_complex(node):
+        return bool(node.get("properties") or node.get("allOf") or node.get("oneOf") or node.get("anyOf")
+                    or node.get("items"))
+
+    def _terse(self, node, state, depth, max_depth):
+        if not is_schema(node):
+            return self._infer(node, state, depth, max_depth)
+
+        def child(value):
+            return self._encode(value, state, depth + 1, max_depth)
+
+        if "enum" in node and isinstance(node["enum"], list):
+            values = [json.dumps(value, separators=(",", ":")) for value in node["enum"][:MAX_ENUM_VALUES]]
+            text = "|".join(values) + ("|…" if len(node["enum"]) > MAX_ENUM_VALUES else "")
+        elif "const" in node:
+            text = json.dumps(node["const"], separators=(",", ":"))
+        elif node.get("allOf"):
+            text = self._all_of(node, state, depth, max_depth)
+        elif node.get("oneOf") or node.get("anyOf"):
+            text = "|".join(child(option) for option in node.get("oneOf") or node.get("anyOf"))
+        else:
+            kind = node.get("type")
+            if isinstance(kind, list):
+                text = "|".join(self._typed(dict(node, type=option), state, depth, max_depth) for option in kind)
+            else:
+                text = self._typed(node, state, depth, max_depth)
+        if node.get("nullable") and not text.endswith("|null"):
+            text += "|null"
+        return text
+
+    def _typed(self, node, state, depth, max_depth):
+        kind = node.get("type")
+        if kind == "array" or "items" in node:
+            return f"[{self._encode(node.get('items') or {}, state, depth + 1, max_depth)}]"
+        if kind == "object" or "properties" in node or "additionalProperties" in node:
+            return self._object(node, state, depth, max_depth)
+        if kind == "string" and node.get("format"):
+            return node["format"]
+        return TERSE_TYPES.get(kind, "any")
+
+    def _object(self, node, state, depth, max_depth, properties=None, required=None):
+        properties = node.get("properties") or {} if properties is None else properties
+        required = set(node.get("required") or ()) if required is None else required
+        fields = [f"{name}{'' if name in required else '?'}:{self._encode(schema, state, depth + 1, max_depth)}"
+                  for name, schema in properties.items()]
+        extra = node.get("additionalProperties")
+        if isinstance(extra, dict):
+            fields.append(f"*:{self._encode(extra, state, depth + 1, max_depth)}")
+        if not fields:
+            return "obj"
+        return "{" + ",".join(fields) + "}"
+
+    def _all_of(self, node, state, depth, max_depth):
+        properties, required, others = {}, set(node.get("required") or ()), []
+        parts = [node] + list(node["allOf"])
+        for part in parts:
+            if isinstance(part, dict) and "$ref" in part and self._target(part) is not None:
+                target = self._target(part)
+                if id(target) in state["alias"] and self._is_complex(target):
+                    others.append(self._encode(part, state, depth + 1, max_depth))
+                    continue
+                part = target
+            if isinstance(part, dict):
+                properties.update(part.get("properties") or {})
+                required.update(part.get("required") or ())
+                for nested in (part.get("allOf") or ()) if part is not node else ():
+                    others.append(self._encode(nested, state, depth + 1, max_depth))
+        if properties:
+            others.append(self._object({}, state, depth, max_depth, properties, required))
+        return "&".join(others) or "obj"
+
+    def _infer(self, value, state, depth, max_depth):
+        """Type notation for an example value (every field of an example is treated as present)."""
+        if isinstance(value, dict):
+            return "{" + ",".join(f"{key}:{self._encode(item, state, depth + 1, max_depth)}"
+                                  for key, item in value.items()) + "}"
+        if isinstance(value, list):
+            return f"[{self._encode(value[0], state, depth + 1, max_depth)}]" if value else "[]"
+        if isinstance(value, bool):
+            return "bool"
+        if isinstance(value, int):
+            return "int"
+        if isinstance(value, float):
+            return "num"
+        if value is None:
+            return "null"
+        return "str"
+
+    # --------------------------
+    # Endpoint lists
+    # --------------------------
+
+    def chunk(self, lines, budget: int = None, reserve: int = 0) -> list:
+        """
+        Splits lines into chunks of at most `budget - reserve` tokens, keeping operations on
+        the same resource together whenever that resource fits in one chunk.
+        """
+        budget = (budget or self.token_budget) - reserve
+        groups = {}
+        for line in lines:
+            groups.setdefault(_resource(line), []).append(line)
+
+        chunks, current, used = [], [], 0
+        for group in groups.values():
+            for line in group if count_tokens("\n".join(group)) > budget else ["\n".join(group)]:
+                tokens = count_tokens(line) + 1
+                if current and used + tokens > budget:
+                    chunks.append("\n".join(current))
+                    current, used = [], 0
+                current.append(line)
+                used += tokens
+        if current:
+            chunks.append("\n".join(current))
+        return chunks
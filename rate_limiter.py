@@ -0,0 +1,194 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+THROTTLE_STATUSES = (429, 503)
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float = None, clock=time.monotonic):
+        """
+        Token bucket refilled at `rate` tokens per second, holding at most `burst` tokens.
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(rate, 1.0))
+        self.clock = clock
+        self.tokens = self.burst
+        self.updated = clock()
+        self.paused_until = 0.0
+
+    def _refill(self, now):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        Takes `tokens` from the bucket and returns how long the caller must wait before using them.
+
+        The balance may go negative: later callers queue behind earlier reservations,
+        so concurrent waiters are released exactly at the configured rate.
+        """
+        now = self.clock()
+        self._refill(now)
+        self.tokens -= tokens
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return max(wait, self.paused_until - now)
+
+    async def acquire(self, tokens: float = 1.0):
+        """
+        Waits until `tokens` are available.
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def set_rate(self, rate: float):
+        """
+        Changes the refill rate, keeping the tokens accrued so far.
+        """
+        self._refill(self.clock())
+        self.rate = float(rate)
+
+    def pause(self, seconds: float):
+        """
+        Blocks all acquisitions for `seconds` (used for `Retry-After`).
+        """
+        self.paused_until = max(self.paused_until, self.clock() + seconds)
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter keyed globally, per host or per operation.
+
+    :param rate: Requests per second allowed for each key.
+    :param burst: Bucket size; defaults to one second worth of requests.
+    :param scope: "global", "host" or "operation".
+    :param max_concurrency: Optional cap on in-flight requests per key.
+    :param adaptive: Back off on 429/503 and recover additively on success (AIMD).
+    :param overrides: Per-key `{"rate": ..., "burst": ..., "max_concurrency": ...}` settings.
+    """
+
+    SCOPES = ("global", "host", "operation")
+
+    def __init__(self, rate: float, burst: float = None, scope: str = "global", max_concurrency: int = None,
+                 adaptive: bool = False, min_rate: float = None, backoff_factor: float = 0.5,
+                 recovery_step: float = None, cooldown: float = 1.0, overrides: dict = None,
+                 clock=time.monotonic):
+        if scope not in self.SCOPES:
+            raise ValueError(f"Unknown rate limit scope: {scope}")
+        self.rate = rate
+        self.burst = burst
+        self.scope = scope
+        self.max_concurrency = max_concurrency
+        self.adaptive = adaptive
+        self.min_rate = min_rate if min_rate is not None else rate / 100
+        self.backoff_factor = backoff_factor
+        self.recovery_step = recovery_step if recovery_step is not None else rate / 20
+        self.cooldown = cooldown
+        self.overrides = overrides or {}
+        self.clock = clock
+        self.buckets = {}  # key -> TokenBucket
+        self.semaphores = {}  # key -> asyncio.Semaphore
+        self.last_backoff = {}  # key -> clock time of last rate decrease
+        self.throttled = {}  # key -> number of 429/503 responses seen
+
+    def key_for(self, url: str = None, api_name: str = None) -> str:
+        """
+        Maps a request onto the limiter key for the configured scope.
+        """
+        if self.scope == "host" and url:
+            return urlsplit(url).netloc
+        if self.scope == "operation" and api_name:
+            return api_name
+        return "*"
+
+    def _settings(self, key):
+        return self.overrides.get(key, {})
+
+    def bucket(self, key: str) -> TokenBucket:
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            settings = self._settings(key)
+            bucket = TokenBucket(settings.get("rate", self.rate), settings.get("burst", self.burst), self.clock)
+            self.buckets[key] = bucket
+        return bucket
+
+    def _semaphore(self, key):
+        limit = self._settings(key).get("max_concurrency", self.max_concurrency)
+        if not limit:
+            return None
+        semaphore = self.semaphores.get(key)
+        if semaphore is None:
+            semaphore = self.semaphores[key] = asyncio.Semaphore(limit)
+        return semaphore
+
+    async def acquire(self, url: str = None, api_name: str = None):
+        """
+        Waits for a token for the given request.
+        """
+        await self.bucket(self.key_for(url, api_name)).acquire()
+
+    @asynccontextmanager
+    async def limit(self, url: str = None, api_name: str = None):
+        """
+        Holds a concurrency slot (if configured) and a token for the duration of one request.
+        """
+        key = self.key_for(url, api_name)
+        semaphore = self._semaphore(key)
+        if semaphore is None:
+            await self.bucket(key).acquire()
+            yield key
+            return
+        async with semaphore:
+            await self.bucket(key).acquire()
+            yield key
+
+    def observe(self, url: str = None, api_name: str = None, status: int = None, retry_after=None):
+        """
+        Feeds a response status back into the adaptive controller.
+        """
+        if not self.adaptive or status is None:
+            return
+        key = self.key_for(url, api_name)
+        bucket = self.bucket(key)
+        ceiling = self._settings(key).get("rate", self.rate)
+
+        if status in THROTTLE_STATUSES:
+            self.throttled[key] = self.throttled.get(key, 0) + 1
+            delay = _parse_retry_after(retry_after)
+            if delay:
+                bucket.pause(delay)
+            now = self.clock()
+            # Responses already in flight when the first 429 arrived should not compound the backoff.
+            if now - self.last_backoff.get(key, float("-inf")) >= self.cooldown:
+                self.last_backoff[key] = now
+                bucket.set_rate(max(self.min_rate, bucket.rate * self.backoff_factor))
+                logging.warning(f"⚠️ Throttled ({status}) on {key}; backing off to {bucket.rate:.2f} req/s")
+        elif status < 400 and bucket.rate < ceiling:
+            # Each success adds step/rate, so the rate climbs by roughly `recovery_step` per second.
+            bucket.set_rate(min(ceiling, bucket.rate + self.recovery_step * (1.0 / max(bucket.rate, 1.0))))
+
+    def current_rate(self, url: str = None, api_name: str = None) -> float:
+        """
+        Returns the rate currently applied to the given request's key.
+        """
+        return self.bucket(self.key_for(url, api_name)).rate
+
+
+def _parse_retry_after(value):
+    """Parse a `Retry-After` header given in seconds; HTTP dates are ignored."""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,131 @@
+import logging
+import re
+from typing import NamedTuple
+from urllib.parse import quote, quote_plus
+
+import json_codec
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+PATH_PARAMETER = re.compile(r"\{([^{}]+)\}")
+
+
+class PreparedRequest(NamedTuple):
+    method: str
+    url: str
+    headers: dict
+    body: bytes  # already-encoded JSON, or None
+
+
+def _path_value(value) -> str:
+    # ints are by far the most common path value and never need escaping
+    return str(value) if type(value) is int else quote(str(value), safe="")
+
+
+def _query_pairs(encoded_name, value):
+    if isinstance(value, (list, tuple)):
+        return "&".join(f"{encoded_name}={_query_value(item)}" for item in value)
+    return f"{encoded_name}={_query_value(value)}"
+
+
+def _query_value(value) -> str:
+    if type(value) is int:
+        return str(value)
+    if type(value) is bool:
+        return "true" if value else "false"
+    return quote_plus(str(value))
+
+
+class RequestTemplate:
+    """
+    One operation compiled for repeated sending.
+
+    The path is split once into a `str.format` pattern with one slot per path parameter,
+    query and header parameters are reduced to name tuples, and the static headers are
+    merged up front. A static payload is JSON-encoded once and the same bytes are sent by
+    every render. `render()` then only fills slots from a parameter dict.
+    """
+
+    __slots__ = ("api_name", "method", "url_format", "path_slots", "query_slots", "header_slots", "defaults",
+                 "headers", "json_headers", "payload", "body")
+
+    def __init__(self, api_name: str, method: str, path: str, parameters=(), base_url: str = "",
+                 headers: dict = None, payload=None):
+        self.api_name = api_name
+        self.method = method.upper()
+        self.payload = payload
+        self.body = None if payload is None else json_codec.dumps(payload)
+        self.json_headers = {"Content-Type": json_codec.JSON_CONTENT_TYPE, **(headers or {})}
+        self.headers = self.json_headers if self.body is not None else dict(headers or {})
+
+        parts = PATH_PARAMETER.split(path)
+        literals = [(base_url if i == 0 else "") + part for i, part in enumerate(parts[::2])]
+        self.path_slots = tuple(parts[1::2])
+        self.url_format = "".join(
+            literal.replace("{", "{{").replace("}", "}}") + (f"{{{i}}}" if i < len(self.path_slots) else "")
+            for i, literal in enumerate(literals)
+        )
+
+        self.query_slots = tuple((p["name"], quote_plus(p["name"])) for p in parameters if p.get("in") == "query")
+        self.header_slots = tuple(p["name"] for p in parameters if p.get("in") == "header")
+        # Values used when the caller does not pass one: only for parameters that must be sent
+        self.defaults = {}
+        for parameter in parameters:
+            if parameter.get("in") == "path" or parameter.get("required"):
+                schema = parameter.get("schema", parameter)
+                for source in (parameter, schema):
+                    for key in ("example", "default"):
+                        if key in source and parameter["name"] not in self.defaults:
+                            self.defaults[parameter["name"]] = source[key]
+
+    @classmethod
+    def from_endpoint(cls, api_name: str, details: dict, base_url: str = "", headers: dict = None):
+        """
+        Compiles an `api_map` entry (`OpenAPIParser` endpoint or `{"payload": ...}` details).
+        """
+        method, _, path = api_name.partition(" ")
+        return cls(
+            api_name,
+            details.get("method", method),
+            details.get("path", path),
+            details.get("parameters", ()),
+            base_url,
+            headers,
+            details.get("payload", details.get("request_body")),  # explicit payload, else the spec example
+        )
+
+    def render(self, params: dict = None, payload=None) -> PreparedRequest:
+        """
+        Fills the template; `params` maps parameter names to values, `payload` overrides the static payload.
+        """
+        values = {**self.defaults, **params} if params else self.defaults
+        url = self.url_format
+        if self.path_slots:
+            try:
+                url = url.format(*[_path_value(values[name]) for name in self.path_slots])
+            except KeyError as e:
+                raise KeyError(f"Missing path parameter {e} for {self.api_name}") from None
+        if self.query_slots:
+            query = "&".join([_query_pairs(encoded, values[name]) for name, encoded in self.query_slots
+                              if name in values])
+            if query:
+                url = f"{url}?{query}"
+        headers, body = self.headers, self.body
+        if payload is not None:
+            headers, body = self.json_headers, json_codec.dumps(payload)
+        if self.header_slots:
+            extra = {name: str(values[name]) for name in self.header_slots if name in values}
+            if extra:
+                headers = {**headers, **extra}
+        return PreparedRequest(self.method, url, headers, body)
+
+
+def compile_templates(api_map: dict, base_url: str = "", headers: dict = None) -> dict:
+    """
+    Compiles every operation of an `api_map` into a `RequestTemplate`.
+    """
+    templates = {name: RequestTemplate.from_endpoint(name, details, base_url, headers)
+                 for name, details in api_map.items()}
+    logging.info(f"🧩 Compiled {len(templates)} request templates")
+    return templates
@@ -0,0 +1,137 @@
+import logging
+from time import perf_counter_ns
+
+from histogram import LatencyHistogram
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+PHASES = ("queued", "dns", "connect", "ttfb", "transfer", "total")
+
+
+class RequestTimings:
+    """
+    `perf_counter_ns` timestamps of one request, filled in by aiohttp trace hooks.
+
+    aiohttp reports no separate TLS event, so for `https` requests `connect` covers the
+    TCP connect plus the TLS handshake (`tls` is set). Phases that did not happen (a DNS
+    cache hit, a reused keep-alive connection) are 0.
+    """
+
+    __slots__ = ("start", "queued_start", "queued_end", "dns_start", "dns_end", "connect_start", "connect_end",
+                 "sent", "response_start", "end", "reused", "tls")
+
+    def __init__(self):
+        self.start = perf_counter_ns()  # replaced by the request-start hook when tracing is installed
+        self.queued_start = self.queued_end = 0
+        self.dns_start = self.dns_end = 0
+        self.connect_start = self.connect_end = 0
+        self.sent = self.response_start = self.end = 0
+        self.reused = False
+        self.tls = False
+
+    def phases(self) -> dict:
+        """
+        Phase durations in nanoseconds.
+        """
+        end = self.end or perf_counter_ns()
+        response_start = self.response_start or end
+        sent = self.sent or self.connect_end or self.queued_end or self.start
+        return {
+            "queued": self.queued_end - self.queued_start,
+            "dns": self.dns_end - self.dns_start,
+            "connect": self.connect_end - self.connect_start,
+            "ttfb": max(response_start - sent, 0),
+            "transfer": max(end - response_start, 0),
+            "total": end - self.start,
+        }
+
+    def to_dict(self) -> dict:
+        timings = {f"{phase}_ms": round(ns / 1e6, 3) for phase, ns in self.phases().items()}
+        timings["reused_connection"] = self.reused
+        timings["tls"] = self.tls
+        return timings
+
+
+def _stamp(*attributes):
+    async def hook(session, trace_config_ctx, params):
+        timings = trace_config_ctx.trace_request_ctx
+        if type(timings) is RequestTimings:
+            now = perf_counter_ns()
+            for attribute in attributes:
+                setattr(timings, attribute, now)
+    return hook
+
+
+async def _on_request_start(session, trace_config_ctx, params):
+    timings = trace_config_ctx.trace_request_ctx
+    if type(timings) is RequestTimings:
+        timings.start = perf_counter_ns()
+        timings.tls = params.url.scheme in ("https", "wss")
+
+
+async def _on_connection_reused(session, trace_config_ctx, params):
+    timings = trace_config_ctx.trace_request_ctx
+    if type(timings) is RequestTimings:
+        timings.reused = True
+
+
+class RequestTracer:
+    """
+    Per-request phase timings (queued, DNS, connect/TLS, time-to-first-byte, body transfer).
+
+    Install `trace_config()` on the shared `aiohttp.ClientSession`, pass the object from
+    `start()` as `trace_request_ctx`, and call `finish()` once the body is read. Each phase
+    is also recorded into a per-operation histogram (and an all-operations one under `"*"`).
+    """
+
+    def __init__(self, precision_bits: int = 6):
+        self.precision_bits = precision_bits
+        self.histograms = {}  # (api name, phase) -> LatencyHistogram
+        self._trace_config = None
+
+    def trace_config(self):
+        if self._trace_config is None:
+            import aiohttp
+
+            config = aiohttp.TraceConfig()
+            config.on_request_start.append(_on_request_start)
+            config.on_connection_queued_start.append(_stamp("queued_start"))
+            config.on_connection_queued_end.append(_stamp("queued_end"))
+            config.on_dns_resolvehost_start.append(_stamp("dns_start"))
+            config.on_dns_resolvehost_end.append(_stamp("dns_end"))
+            config.on_connection_create_start.append(_stamp("connect_start"))
+            config.on_connection_create_end.append(_stamp("connect_end"))
+            config.on_connection_reuseconn.append(_on_connection_reused)
+            if hasattr(config, "on_request_headers_sent"):  # aiohttp >= 3.8
+                config.on_request_headers_sent.append(_stamp("sent"))
+            config.on_request_chunk_sent.append(_stamp("sent"))  # the last body chunk wins
+            config.on_request_end.append(_stamp("response_start"))  # fires once response headers are in
+            self._trace_config = config
+        return self._trace_config
+
+    @staticmethod
+    def start() -> RequestTimings:
+        return RequestTimings()
+
+    def finish(self, api_name: str, timings: RequestTimings) -> dict:
+        """
+        Marks the body as fully read, records every phase and returns the breakdown in milliseconds.
+        """
+        timings.end = perf_counter_ns()
+        for phase, ns in timings.phases().items():
+            for name in (api_name, "*"):
+                histogram = self.histograms.get((name, phase))
+                if histogram is None:
+                    histogram = self.histograms[(name, phase)] = LatencyHistogram(self.precision_bits)
+                histogram.record(ns)
+        return timings.to_dict()
+
+    def summary(self) -> dict:
+        """
+        `{api name: {phase: histogram summary in ms}}`, the all-operations entry under `"*"`.
+        """
+        summary = {}
+        for (api_name, phase), histogram in sorted(self.histograms.items()):
+            summary.setdefault(api_name, {})[phase] = histogram.summary()
+        return summary
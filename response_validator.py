@@ -0,0 +1,358 @@
+import logging
+import random
+import re
+
+import json_codec
+from openapi_parser import HTTP_METHODS
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+TYPE_CHECKS = {
+    "object": "type({0}) is dict",
+    "array": "type({0}) is list",
+    "string": "type({0}) is str",
+    "integer": "type({0}) is int or (type({0}) is float and {0}.is_integer())",
+    "number": "type({0}) is int or type({0}) is float",
+    "boolean": "type({0}) is bool",
+    "null": "{0} is None",
+}
+# Keywords that make a schema do anything at all; schemas without them are never called
+VALIDATION_KEYWORDS = {
+    "type", "enum", "const", "nullable", "properties", "required", "additionalProperties", "minProperties",
+    "maxProperties", "items", "minItems", "maxItems", "minLength", "maxLength", "pattern", "minimum", "maximum",
+    "exclusiveMinimum", "exclusiveMaximum", "multipleOf", "allOf", "anyOf", "oneOf", "not",
+}
+
+
+class ValidationError(ValueError):
+    """
+    A response body that does not match its schema; `path` points at the offending value.
+    """
+
+    def __init__(self, message: str, value=None):
+        super().__init__(message)
+        self.message = message
+        self.value = value
+        self.path = []
+
+    def at(self, key):
+        self.path.insert(0, key)
+        return self
+
+    def __str__(self):
+        return f"{'/'.join(map(str, self.path)) or '<root>'}: {self.message}"
+
+
+class SchemaCompiler:
+    """
+    Generates Python source for resolved schemas and `exec`s it once.
+
+    Every schema node becomes one function named after its position in the cache, so a
+    component shared by many operations is compiled once, and recursive schemas simply
+    call themselves. Checks run on the happy path without allocating; error paths are
+    assembled only when a check fails. `oneOf` is checked like `anyOf`, since overlapping
+    alternatives are common in real specs.
+    """
+
+    def __init__(self):
+        self.names = {}  # id(schema) -> generated function name (None for schemas that check nothing)
+        self.schemas = []  # keeps compiled schemas alive so their ids stay unique
+        self.namespace = {"ValidationError": ValidationError}
+
+    def compile(self, schema: dict):
+        """
+        Returns a function that raises `ValidationError` for data not matching `schema`.
+        """
+        pending = []
+        name = self._name(schema, pending)
+        source = []
+        while pending:
+            source.append(self._function(*pending.pop(), pending))
+        if source:
+            exec(compile("\n\n".join(source), "<response_validator>", "exec"), self.namespace)
+        return self.namespace[name] if name else _accept_anything
+
+    def _name(self, schema, pending):
+        if not isinstance(schema, dict) or not VALIDATION_KEYWORDS.intersection(schema):
+            return None
+        if id(schema) not in self.names:
+            name = self.names[id(schema)] = f"v{len(self.schemas)}"
+            self.schemas.append(schema)
+            pending.append((name, schema))
+        return self.names[id(schema)]
+
+    def _constant(self, value):
+        name = f"c{len(self.namespace)}"
+        self.namespace[name] = value
+        return name
+
+    def _function(self, name, schema, pending):
+        lines = []
+
+        def emit(line, indent=1):
+            lines.append("    " * indent + line)
+
+        def fail(message, indent):
+            emit(f"raise ValidationError({message!r}, data)", indent)
+
+        types = schema.get("type")
+        types = [types] if isinstance(types, str) else list(types or [])
+        if schema.get("nullable") is True or "null" in types:
+            emit("if data is None:")
+            emit("return", 2)
+        types = [t for t in types if t in TYPE_CHECKS and t != "null"]
+        if types:
+            emit(f"if not ({' or '.join(TYPE_CHECKS[t].format('data') for t in types)}):")
+            fail(f"expected {' or '.join(types)}", 2)
+
+        if "enum" in schema:
+            emit(f"if data not in {self._constant(list(schema['enum']))}:")
+            fail(f"not one of {schema['enum']!r}", 2)
+        if "const" in schema:
+            emit(f"if data != {self._constant(schema['const'])}:")
+            fail(f"expected {schema['const']!r}", 2)
+
+        self._object(schema, emit, fail, pending)
+        self._array(schema, emit, fail, pending)
+        self._string(schema, emit, fail)
+        self._number(schema, emit, fail)
+        self._composition(schema, emit, fail, pending)
+
+        return "\n".join([f"def {name}(data):"] + (lines or ["    return"]))
+
+    def _call(self, function, argument, key, emit, indent):
+        emit("try:", indent)
+        emit(f"{function}({argument})", indent + 1)
+        emit("except ValidationError as e:", indent)
+        emit(f"raise e.at({key})", indent + 1)
+
+    def _object(self, schema, emit, fail, pending):
+        properties = schema.get("properties") or {}
+        additional = schema.get("additionalProperties", True)
+        keywords = {"required", "minProperties", "maxProperties"}.intersection(schema)
+        # Properties that only declare a scalar type are checked inline instead of through a call
+        inline = {key: value["type"] for key, value in properties.items()
+                  if isinstance(value, dict) and VALIDATION_KEYWORDS.intersection(value) == {"type"}
+                  and isinstance(value["type"], str) and value["type"] in TYPE_CHECKS}
+        checked = {key: self._name(value, pending) for key, value in properties.items() if key not in inline}
+        checked = {key: function for key, function in checked.items() if function}
+        if not (keywords or checked or inline or additional is not True):
+            return
+
+        emit("if type(data) is dict:")
+        if schema.get("required"):
+            required = self._constant(frozenset(schema["required"]))
+            emit(f"if not data.keys() >= {required}:", 2)
+            emit(f"raise ValidationError(f'missing required properties {{sorted({required} - data.keys())}}', data)", 3)
+        if "minProperties" in schema:
+            emit(f"if len(data) < {int(schema['minProperties'])}:", 2)
+            fail(f"fewer than {schema['minProperties']} properties", 3)
+        if "maxProperties" in schema:
+            emit(f"if len(data) > {int(schema['maxProperties'])}:", 2)
+            fail(f"more than {schema['maxProperties']} properties", 3)
+        for key, expected in inline.items():
+            emit(f"value = data.get({key!r}, ValidationError)", 2)  # the class doubles as a "missing" marker
+            emit(f"if value is not ValidationError and not ({TYPE_CHECKS[expected].format('value')}):", 2)
+            emit(f"raise ValidationError({f'expected {expected}'!r}, value).at({key!r})", 3)
+        for key, function in checked.items():
+            emit(f"if {key!r} in data:", 2)
+            self._call(function, f"data[{key!r}]", repr(key), emit, 3)
+        if additional is False:
+            emit(f"extra = data.keys() - {self._constant(frozenset(properties))}", 2)
+            emit("if extra:", 2)
+            emit("raise ValidationError(f'unexpected properties {sorted(extra)}', data)", 3)
+        elif isinstance(additional, dict) and self._name(additional, pending):
+            emit(f"for key in data.keys() - {self._constant(frozenset(properties))}:", 2)
+            self._call(self._name(additional, pending), "data[key]", "key", emit, 3)
+
+    def _array(self, schema, emit, fail, pending):
+        items = self._name(schema.get("items"), pending)
+        keywords = {"minItems", "maxItems"}.intersection(schema)
+        if not (items or keywords):
+            return
+        emit("if type(data) is list:")
+        if "minItems" in schema:
+            emit(f"if len(data) < {int(schema['minItems'])}:", 2)
+            fail(f"fewer than {schema['minItems']} items", 3)
+        if "maxItems" in schema:
+            emit(f"if len(data) > {int(schema['maxItems'])}:", 2)
+            fail(f"more than {schema['maxItems']} items", 3)
+        if items:
+            emit("for index, item in enumerate(data):", 2)
+            self._call(items, "item", "index", emit, 3)
+
+    def _string(self, schema, emit, fail):
+        if not {"minLength", "maxLength", "pattern"}.intersection(schema):
+            return
+        emit("if type(data) is str:")
+        if "minLength" in schema:
+            emit(f"if len(data) < {int(schema['minLength'])}:", 2)
+            fail(f"shorter than {schema['minLength']}", 3)
+        if "maxLength" in schema:
+            emit(f"if len(data) > {int(schema['maxLength'])}:", 2)
+            fail(f"longer than {schema['maxLength']}", 3)
+        if "pattern" in schema:
+            emit(f"if not {self._constant(re.compile(schema['pattern']))}.search(data):", 2)
+            fail(f"does not match {schema['pattern']!r}", 3)
+
+    def _number(self, schema, emit, fail):
+        bounds = []
+        for keyword, operator, exclusive in (("minimum", "<", "exclusiveMinimum"), ("maximum", ">", "exclusiveMaximum")):
+            if exclusive in schema and not isinstance(schema[exclusive], bool):  # OpenAPI 3.1 / JSON Schema style
+                bounds.append((schema[exclusive], operator + "="))
+            if keyword in schema:
+                bounds.append((schema[keyword], operator + ("=" if schema.get(exclusive) is True else "")))
+        if not bounds and "multipleOf" not in schema:
+            return
+        emit("if type(data) is int or type(data) is float:")
+        for limit, operator in bounds:
+            emit(f"if data {operator} {limit!r}:", 2)
+            fail(f"must not be {operator} {limit}", 3)
+        if "multipleOf" in schema:
+            emit(f"if (data / {schema['multipleOf']!r}) % 1:", 2)
+            fail(f"not a multiple of {schema['multipleOf']}", 3)
+
+    def _composition(self, schema, emit, fail, pending):
+        for part in schema.get("allOf") or ():
+            function = self._name(part, pending)
+            if function:
+                emit(f"{function}(data)")
+        for keyword in ("anyOf", "oneOf"):
+            functions = [self._name(part, pending) for part in schema.get(keyword) or ()]
+            if functions and all(functions):  # an alternative without checks accepts everything
+                emit(f"for alternative in ({', '.join(functions)},):")
+                emit("try:", 2)
+                emit("alternative(data)", 3)
+                emit("break", 3)
+                emit("except ValidationError:", 2)
+                emit("pass", 3)
+                emit("else:")
+                fail(f"matches none of the {keyword} alternatives", 2)
+        if isinstance(schema.get("not"), dict):
+            function = self._name(schema["not"], pending)
+            emit("try:")
+            emit(f"{function}(data)" if function else "pass", 2)
+            emit("except ValidationError:")
+            emit("pass", 2)
+            emit("else:")
+            fail("matches a schema it must not match", 2)
+
+
+def _accept_anything(data):
+    return None
+
+
+class ResponseValidator:
+    """
+    Opt-in validation of response bodies against the spec's declared `responses` schemas.
+
+    Validators are compiled lazily, once per (operation, status code), and shared by all
+    operations that return the same component. `sample_rate` validates only a share of
+    responses (use e.g. 0.01 in load runs); counts and the first few violations are kept
+    per endpoint in `stats`. After the spec reloads, `reload(diff)` drops the validators of
+    the operations that changed.
+    """
+
+    def __init__(self, parser, sample_rate: float = 1.0, seed: int = None, max_examples: int = 5):
+        self.parser = parser
+        self.sample_rate = sample_rate
+        self.max_examples = max_examples
+        self.random = random.Random(seed).random
+        self.compiler = SchemaCompiler()
+        self.validators = {}  # (api name, status) -> compiled validator, or None without a JSON schema
+        self.stats = {}  # api name -> counters and example violations
+        self.operations = {}  # operation id and "METHOD /path" -> raw operation
+        self.routes = {}  # operation id -> "METHOD /path"
+        self._collect_operations()
+
+    def _collect_operations(self):
+        operations, routes = {}, {}
+        for path, path_item in self.parser.api_map.items():
+            for method, details in path_item.items():
+                if method in HTTP_METHODS:
+                    route = f"{method.upper()} {path}"
+                    operations[route] = details
+                    operations[details.get("operationId", route)] = details
+                    routes[details.get("operationId", route)] = route
+        self.operations, self.routes = operations, routes
+
+    def reload(self, diff=None):
+        """
+        Picks up the reloaded spec: re-reads the operations and drops the validators of those
+        `diff` (a `SpecDiff`) added, removed or changed, or all of them without a diff.
+        They are compiled again on their next response.
+        """
+        old_routes = self.routes
+        self._collect_operations()
+        if diff is None:
+            self.validators.clear()
+            return
+        affected = set(diff.operations)
+        affected |= {routes[name] for routes in (old_routes, self.routes) for name in diff.operations if name in routes}
+        for key in [key for key in self.validators if key[0] in affected]:
+            del self.validators[key]
+
+    def schema_for(self, api_name: str, status) -> dict:
+        """
+        Returns the resolved JSON schema declared for `status` (exact, `2XX`-style or `default`).
+        """
+        responses = self.operations.get(api_name, {}).get("responses", {})
+        status = str(status)
+        for key in (status, f"{status[0]}XX", f"{status[0]}xx", "default"):
+            if key in responses:
+                response = self.parser.resolver.resolve(responses[key])
+                content = response.get("content")
+                if content is None:
+                    return self.parser.resolver.resolve(response["schema"]) if "schema" in response else None
+                for media_type, media in content.items():
+                    if "json" in media_type and "schema" in media:
+                        return self.parser.resolver.resolve(media["schema"])
+                return None
+        return None
+
+    def validator_for(self, api_name: str, status):
+        key = (api_name, int(status))
+        if key not in self.validators:
+            schema = self.schema_for(api_name, status)
+            self.validators[key] = self.compiler.compile(schema) if schema is not None else None
+        return self.validators[key]
+
+    def validate(self, api_name: str, status, body):
+        """
+        Checks one response; `body` may be bytes, text or already-decoded JSON.
+
+        Returns a list of violations (empty when valid), or `None` when the response was
+        not sampled or the spec declares no JSON schema for it.
+        """
+        stats = self.stats.get(api_name)
+        if stats is None:
+            stats = self.stats[api_name] = {"checked": 0, "skipped": 0, "violations": 0, "examples": []}
+        if self.sample_rate < 1.0 and self.random() >= self.sample_rate:
+            stats["skipped"] += 1
+            return None
+        validator = self.validator_for(api_name, status)
+        if validator is None:
+            stats["skipped"] += 1
+            return None
+
+        stats["checked"] += 1
+        try:
+            data = json_codec.loads(body) if isinstance(body, (bytes, bytearray, str)) else body
+            validator(data)
+            return []
+        except ValidationError as e:
+            error = str(e)
+        except ValueError as e:
+            error = f"<root>: invalid JSON ({e})"
+        stats["violations"] += 1
+        if len(stats["examples"]) < self.max_examples:
+            stats["examples"].append({"status": int(status), "error": error})
+        logging.debug(f"❌ {api_name} {status}: {error}")
+        return [error]
+
+    def report(self) -> dict:
+        """
+        Per-endpoint tally, worst endpoints first.
+        """
+        return dict(sorted(self.stats.items(), key=lambda item: -item[1]["violations"]))
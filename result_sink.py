@@ -0,0 +1,145 @@
+import csv
+import logging
+import os
+import time
+
+from request_tracing import PHASES
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# (column, arrow type name); one row per request
+COLUMNS = (
+    ("timestamp", "float64"),  # request start, seconds since the epoch
+    ("operation", "string"),
+    ("status", "int32"),  # 0 when the request raised
+    ("virtual_user", "int32"),  # -1 outside load tests
+    ("bytes_sent", "int64"),
+    ("bytes_received", "int64"),
+    *((f"{phase}_ms", "float64") for phase in PHASES),
+    ("error", "string"),
+)
+COLUMN_NAMES = tuple(name for name, _ in COLUMNS)
+FORMATS = {".parquet": "parquet", ".arrow": "arrow", ".ipc": "arrow", ".feather": "arrow", ".csv": "csv"}
+
+
+class CSVBatchWriter:
+    def __init__(self, path):
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(COLUMN_NAMES)
+
+    def write_batch(self, columns: dict):
+        self.writer.writerows(zip(*(columns[name] for name in COLUMN_NAMES)))
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class ArrowBatchWriter:
+    """
+    Arrow IPC (file format) or Parquet via pyarrow; each flushed batch becomes one record
+    batch / row group, so memory stays bounded by the sink's `batch_size`.
+    """
+
+    def __init__(self, path, format="parquet", compression="zstd"):
+        try:
+            import pyarrow as pa
+        except ImportError as error:
+            raise ImportError(f"Writing {format} results needs pyarrow; use a .csv path instead") from error
+
+        self.pa = pa
+        self.schema = pa.schema([(name, getattr(pa, type_name)()) for name, type_name in COLUMNS])
+        if format == "parquet":
+            import pyarrow.parquet as pq
+
+            self.writer = pq.ParquetWriter(path, self.schema, compression=compression)
+        else:
+            self.writer = pa.ipc.new_file(path, self.schema)
+
+    def write_batch(self, columns: dict):
+        arrays = [self.pa.array(columns[name], type=field.type) for name, field in zip(COLUMN_NAMES, self.schema)]
+        self.writer.write_batch(self.pa.record_batch(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+class ResultSink:
+    """
+    Streams one row per request into columnar batches and writes each batch out as soon
+    as it fills, as Parquet, Arrow IPC or CSV (picked from the file extension).
+
+    Rows are buffered as one list per column, so a run of any length holds at most
+    `batch_size` rows in memory. Use it as a context manager, or call `close()` to
+    flush the last partial batch.
+    """
+
+    def __init__(self, path: str, format: str = None, batch_size: int = 65536, compression: str = "zstd"):
+        self.path = path
+        self.format = format or FORMATS.get(os.path.splitext(path)[1].lower())
+        if self.format not in ("parquet", "arrow", "csv"):
+            raise ValueError(f"Unknown result format for '{path}'; expected one of {sorted(FORMATS)}")
+        self.batch_size = batch_size
+        self.compression = compression
+        self.rows = 0
+        self.batches = 0
+        self._columns = {name: [] for name in COLUMN_NAMES}
+        self._append = [self._columns[name].append for name in COLUMN_NAMES]
+        self._writer = None
+
+    def record(self, operation: str, status: int = 0, timestamp: float = None, virtual_user: int = -1,
+               bytes_sent: int = 0, bytes_received: int = 0, phases: dict = None, error: str = ""):
+        """
+        Appends one row; `phases` maps `<phase>_ms` to milliseconds, as in a result's `timings`.
+        """
+        phases = phases or {}
+        values = (
+            time.time() if timestamp is None else timestamp, operation, status, virtual_user,
+            bytes_sent, bytes_received, *(phases.get(f"{phase}_ms", 0.0) for phase in PHASES), error,
+        )
+        for append, value in zip(self._append, values):
+            append(value)
+        self.rows += 1
+        if len(self._columns["operation"]) >= self.batch_size:
+            self.flush()
+
+    def write(self, result: dict, virtual_user: int = -1, error: str = ""):
+        """
+        Appends an executor result (`api`, `status`, `timings`, byte counts); the timestamp
+        is the request start, derived from the total time when timings are present.
+        """
+        timings = result.get("timings") or {}
+        self.record(
+            result.get("api", ""), result.get("status") or 0,
+            time.time() - timings.get("total_ms", 0.0) / 1000, virtual_user,
+            result.get("bytes_sent", 0), result.get("bytes_received", 0), timings, error,
+        )
+
+    def flush(self):
+        if not self._columns["operation"]:
+            return
+        if self._writer is None:
+            if self.format == "csv":
+                self._writer = CSVBatchWriter(self.path)
+            else:
+                self._writer = ArrowBatchWriter(self.path, self.format, self.compression)
+            logging.info(f"📝 Writing run results to {self.path} ({self.format})")
+        self._writer.write_batch(self._columns)
+        self.batches += 1
+        for column in self._columns.values():
+            column.clear()
+
+    def close(self):
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            logging.info(f"✅ Wrote {self.rows} results in {self.batches} batches to {self.path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,278 @@
+import argparse
+import csv
+import json
+import logging
+import math
+import os
+import sys
+import time
+
+from histogram import LatencyHistogram
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+RESULT_COLUMNS = ["timestamp", "operation", "status", "total_ms"]
+
+
+def is_error(status) -> bool:
+    """Requests that raised (status 0) or got a 5xx count as errors; 4xx may be intended."""
+    return not status or status >= 500
+
+
+class RunSummary:
+    """
+    Per-endpoint request/error counts and latency histograms of one run, small enough to
+    keep every run: latencies are `LatencyHistogram`s, not samples.
+    """
+
+    def __init__(self, run_id: str, duration_s: float = 0.0, metadata: dict = None):
+        self.run_id = run_id
+        self.duration_s = duration_s
+        self.created = time.time()
+        self.metadata = metadata or {}
+        self.endpoints = {}  # operation -> {"requests": int, "errors": int, "latency": LatencyHistogram}
+
+    def add(self, operation: str, status: int, latency_ns: int):
+        endpoint = self.endpoints.get(operation)
+        if endpoint is None:
+            endpoint = self.endpoints[operation] = {"requests": 0, "errors": 0, "latency": LatencyHistogram()}
+        endpoint["requests"] += 1
+        endpoint["errors"] += is_error(status)
+        endpoint["latency"].record(latency_ns)
+
+    def throughput(self, operation: str) -> float:
+        return self.endpoints[operation]["requests"] / self.duration_s if self.duration_s else 0.0
+
+    @classmethod
+    def from_results(cls, path: str, run_id: str = None, metadata: dict = None) -> "RunSummary":
+        """
+        Summarizes a `ResultSink` file (.csv, .parquet or .arrow) one row at a time.
+        """
+        summary = cls(run_id or os.path.splitext(os.path.basename(path))[0], metadata=metadata)
+        first = last = None
+        for timestamp, operation, status, total_ms in _iter_results(path):
+            summary.add(operation, status, int(total_ms * 1e6))
+            end = timestamp + total_ms / 1000
+            first = timestamp if first is None else min(first, timestamp)
+            last = end if last is None else max(last, end)
+        summary.duration_s = (last - first) if first is not None else 0.0
+        return summary
+
+    @classmethod
+    def from_tracer(cls, tracer, run_id: str, duration_s: float, errors: dict = None) -> "RunSummary":
+        """
+        Builds a summary from a `RequestTracer`'s `total` histograms (`errors`: operation -> count).
+        """
+        summary = cls(run_id, duration_s)
+        for (operation, phase), histogram in tracer.histograms.items():
+            if phase == "total" and operation != "*":
+                summary.endpoints[operation] = {"requests": histogram.count, "errors": (errors or {}).get(operation, 0),
+                                                "latency": LatencyHistogram(histogram.precision_bits).merge(histogram)}
+        return summary
+
+    def to_dict(self) -> dict:
+        return {
+            "run_id": self.run_id, "created": self.created, "duration_s": self.duration_s, "metadata": self.metadata,
+            "endpoints": {name: {"requests": endpoint["requests"], "errors": endpoint["errors"],
+                                 "latency": endpoint["latency"].to_dict()}
+                          for name, endpoint in self.endpoints.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RunSummary":
+        summary = cls(data["run_id"], data.get("duration_s", 0.0), data.get("metadata"))
+        summary.created = data.get("created", summary.created)
+        summary.endpoints = {name: {"requests": endpoint["requests"], "errors": endpoint["errors"],
+                                    "latency": LatencyHistogram.from_dict(endpoint["latency"])}
+                             for name, endpoint in data.get("endpoints", {}).items()}
+        return summary
+
+
+def _iter_results(path):
+    """Yields (timestamp, operation, status, total_ms) from a result file without loading it whole."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        with open(path, newline="", encoding="utf-8") as file:
+            for row in csv.DictReader(file):
+                yield float(row["timestamp"]), row["operation"], int(row["status"] or 0), float(row["total_ms"] or 0)
+        return
+
+    import pyarrow as pa
+
+    if extension == ".parquet":
+        import pyarrow.parquet as pq
+
+        batches = pq.ParquetFile(path).iter_batches(columns=RESULT_COLUMNS)
+    else:
+        reader = pa.ipc.open_file(path)
+        batches = (reader.get_batch(i).select(RESULT_COLUMNS) for i in range(reader.num_record_batches))
+    for batch in batches:
+        yield from zip(*(batch.column(name).to_pylist() for name in RESULT_COLUMNS))
+
+
+class RunStore:
+    """
+    Run summaries persisted as `<directory>/<run_id>.json`.
+    """
+
+    def __init__(self, directory: str = "runs"):
+        self.directory = directory
+
+    def path(self, run_id: str) -> str:
+        return os.path.join(self.directory, f"{run_id}.json")
+
+    def save(self, summary: RunSummary) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(summary.run_id)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(summary.to_dict(), file)
+        logging.info(f"💾 Saved run '{summary.run_id}' ({len(summary.endpoints)} endpoints) to {path}")
+        return path
+
+    def load(self, run_id: str) -> RunSummary:
+        """
+        Loads a stored run by id, or any summary/result file by path.
+        """
+        path = run_id if os.path.exists(run_id) else self.path(run_id)
+        if not path.endswith(".json"):
+            return RunSummary.from_results(path)
+        with open(path, "r", encoding="utf-8") as file:
+            return RunSummary.from_dict(json.load(file))
+
+    def runs(self) -> list:
+        """Stored run ids, oldest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        names = [name for name in os.listdir(self.directory) if name.endswith(".json")]
+        names.sort(key=lambda name: (os.stat(os.path.join(self.directory, name)).st_mtime_ns, name))
+        return [name[:-len(".json")] for name in names]
+
+
+def mann_whitney(baseline: LatencyHistogram, candidate: LatencyHistogram) -> dict:
+    """
+    Mann-Whitney U test on two histograms with the same precision, treating values in the
+    same bucket as ties (normal approximation with tie and continuity correction).
+
+    Returns `u` (for the candidate), `z`, `p_greater` (one-sided: the candidate is slower),
+    `p_value` (two-sided) and `effect`, the probability that a candidate request is slower.
+    """
+    n1, n2 = baseline.count, candidate.count
+    if not n1 or not n2:
+        return {"u": 0.0, "z": 0.0, "p_greater": 1.0, "p_value": 1.0, "effect": 0.5}
+    if baseline.precision_bits != candidate.precision_bits:
+        raise ValueError("can only compare histograms with the same precision")
+
+    rank, rank_sum, ties = 0, 0.0, 0
+    for index in sorted(set(baseline.counts) | set(candidate.counts)):
+        a, b = baseline.counts.get(index, 0), candidate.counts.get(index, 0)
+        tied = a + b
+        rank_sum += b * (rank + (tied + 1) / 2)
+        ties += tied ** 3 - tied
+        rank += tied
+
+    n = n1 + n2
+    u = rank_sum - n2 * (n2 + 1) / 2
+    mean = n1 * n2 / 2
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1))) if n > 1 else 0.0
+    if variance <= 0:  # every value in one bucket
+        z = 0.0
+    else:
+        z = (u - mean - math.copysign(0.5, u - mean)) / math.sqrt(variance) if u != mean else 0.0
+    return {
+        "u": u, "z": z,
+        "p_greater": 0.5 * math.erfc(z / math.sqrt(2)),
+        "p_value": min(1.0, math.erfc(abs(z) / math.sqrt(2))),
+        "effect": u / (n1 * n2),
+    }
+
+
+def compare(baseline: RunSummary, candidate: RunSummary, threshold: float = 0.10, alpha: float = 0.05,
+            error_threshold: float = 0.01, percentiles=(50, 90, 99), min_requests: int = 20):
+    """
+    Compares every endpoint present in both runs and returns (rows, regressions).
+
+    A latency regression needs both a percentile slower by more than `threshold` and a
+    significant Mann-Whitney shift (`p_greater < alpha`), so noise on small runs does not
+    fail the gate. Error rates regress when they grow by more than `error_threshold`
+    (absolute), and throughput when it drops by more than `threshold`.
+    """
+    rows, regressions = [], []
+    for name in sorted(set(baseline.endpoints) & set(candidate.endpoints)):
+        before, after = baseline.endpoints[name], candidate.endpoints[name]
+        test = mann_whitney(before["latency"], after["latency"])
+        row = {"endpoint": name, "requests": (before["requests"], after["requests"]),
+               "p_value": test["p_greater"], "effect": test["effect"], "regressions": []}
+
+        for q in percentiles:
+            old, new = before["latency"].percentile(q), after["latency"].percentile(q)
+            change = new / old - 1 if old else 0.0
+            row[f"p{q}_ms"] = (old / 1e6, new / 1e6)
+            row[f"p{q}_change"] = change
+            if change > threshold and test["p_greater"] < alpha:
+                row["regressions"].append(f"p{q} +{change:.1%}")
+
+        old_errors = before["errors"] / before["requests"] if before["requests"] else 0.0
+        new_errors = after["errors"] / after["requests"] if after["requests"] else 0.0
+        row["error_rate"] = (old_errors, new_errors)
+        if new_errors - old_errors > error_threshold:
+            row["regressions"].append(f"errors {old_errors:.2%} -> {new_errors:.2%}")
+
+        old_rate, new_rate = baseline.throughput(name), candidate.throughput(name)
+        row["throughput"] = (old_rate, new_rate)
+        if old_rate and new_rate / old_rate - 1 < -threshold:
+            row["regressions"].append(f"throughput {new_rate / old_rate - 1:+.1%}")
+
+        if min(before["requests"], after["requests"]) < min_requests:
+            row["regressions"] = []  # too few requests to judge
+            row["skipped"] = True
+        rows.append(row)
+        if row["regressions"]:
+            regressions.append(name)
+    return rows, regressions
+
+
+def main(argv=None):
+    cli = argparse.ArgumentParser(description="Store run summaries and gate on latency/error regressions.")
+    cli.add_argument("--store", default="runs", help="Directory of stored run summaries")
+    commands = cli.add_subparsers(dest="command", required=True)
+
+    save = commands.add_parser("save", help="Summarize a result file (.csv/.parquet/.arrow) into the store")
+    save.add_argument("results")
+    save.add_argument("--run-id", help="Defaults to the result file name")
+
+    commands.add_parser("list", help="List stored runs")
+
+    diff = commands.add_parser("compare", help="Compare a candidate run against a baseline; exits 1 on regression")
+    diff.add_argument("baseline", help="Run id or summary/result file")
+    diff.add_argument("candidate", help="Run id or summary/result file")
+    diff.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown (0.10 = 10%%)")
+    diff.add_argument("--alpha", type=float, default=0.05, help="Significance level of the Mann-Whitney test")
+    diff.add_argument("--error-threshold", type=float, default=0.01, help="Allowed absolute error-rate increase")
+    diff.add_argument("--min-requests", type=int, default=20, help="Skip endpoints with fewer requests")
+    diff.add_argument("--json", action="store_true", help="Print the comparison as JSON")
+    args = cli.parse_args(argv)
+
+    store = RunStore(args.store)
+    if args.command == "save":
+        store.save(RunSummary.from_results(args.results, args.run_id))
+        return 0
+    if args.command == "list":
+        for run_id in store.runs():
+            print(run_id)
+        return 0
+
+    rows, regressions = compare(store.load(args.baseline), store.load(args.candidate), args.threshold,
+                                args.alpha, args.error_threshold, min_requests=args.min_requests)
+    if args.json:
+        print(json.dumps({"rows": rows, "regressions": regressions}, indent=2))
+    for row in rows:
+        flag = "⏭️" if row.get("skipped") else "❌" if row["regressions"] else "✅"
+        before, after = row["p99_ms"]
+        print(f"{flag} {row['endpoint']:40} p50 {row['p50_change']:+8.1%}  p99 {before:9.2f} -> {after:9.2f} ms  "
+              f"p={row['p_value']:.3g}  {', '.join(row['regressions'])}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
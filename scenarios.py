@@ -0,0 +1,238 @@
+import logging
+import random
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+END = "END"  # Markov transition target that ends a session
+
+
+# --------------------------
+# Alias table
+# --------------------------
+
+class AliasTable:
+    """
+    Samples keys of `weights` in proportion to their weight in O(1), whatever the number
+    of keys (Vose's alias method). Building the table is O(n); each `sample` costs one
+    random number, one index and one comparison.
+    """
+
+    def __init__(self, weights: dict):
+        if any(weight < 0 for weight in weights.values()):
+            raise ValueError(f"Weights must not be negative: {weights}")
+        self.items = [item for item, weight in weights.items() if weight > 0]
+        if not self.items:
+            raise ValueError("At least one weight must be positive")
+        total = sum(weights[item] for item in self.items)
+        self.probabilities = {item: weights[item] / total for item in self.items}
+
+        count = len(self.items)
+        scaled = [weights[item] * count / total for item in self.items]
+        threshold, alias = [1.0] * count, list(range(count))
+        small = [index for index, value in enumerate(scaled) if value < 1.0]
+        large = [index for index, value in enumerate(scaled) if value >= 1.0]
+        while small and large:
+            under, over = small.pop(), large.pop()
+            threshold[under], alias[under] = scaled[under], over
+            scaled[over] += scaled[under] - 1.0
+            (small if scaled[over] < 1.0 else large).append(over)
+        # Whatever is left over is 1.0 up to rounding and keeps its own column.
+        self._count = count
+        self._threshold = threshold
+        self._alias = [self.items[index] for index in alias]
+
+    def __len__(self):
+        return self._count
+
+    def sample(self, rng=random):
+        column = rng.random() * self._count
+        index = int(column)
+        return self.items[index] if column - index < self._threshold[index] else self._alias[index]
+
+
+# --------------------------
+# Session flows
+# --------------------------
+
+class MarkovSession:
+    """
+    A user session as a Markov chain over operations: `transitions` maps each operation
+    to the weights of the next one (`END` stops the session), `start` is the first
+    operation or the weights of the first one. An operation without transitions ends the
+    session too, and no session is longer than `max_steps`.
+    """
+
+    def __init__(self, transitions: dict, start, max_steps: int = 100):
+        self.transitions = {state: dict(following) for state, following in transitions.items()}
+        self.start = dict(start) if isinstance(start, dict) else {start: 1}
+        self.max_steps = max_steps
+        self._start = AliasTable(self.start)
+        self._tables = {state: AliasTable(following) for state, following in self.transitions.items()
+                        if any(weight > 0 for weight in following.values())}
+
+    def walk(self, rng=random) -> list:
+        """One session: the operations in the order a user would call them."""
+        path, state = [], self._start.sample(rng)
+        while state != END and len(path) < self.max_steps:
+            path.append(state)
+            table = self._tables.get(state)
+            if table is None:
+                break
+            state = table.sample(rng)
+        return path
+
+    next_flow = walk
+
+    def expected_visits(self) -> dict:
+        """Expected calls per operation in one session, exact up to the `max_steps` cut-off."""
+        visits, current = {}, {state: p for state, p in self._start.probabilities.items() if state != END}
+        for _ in range(self.max_steps):
+            if not current:
+                break
+            following = {}
+            for state, p in current.items():
+                visits[state] = visits.get(state, 0.0) + p
+                table = self._tables.get(state)
+                if table is not None:
+                    for target, q in table.probabilities.items():
+                        if target != END:
+                            following[target] = following.get(target, 0.0) + p * q
+            current = following
+        return visits
+
+    def operations(self) -> set:
+        names = set(self.start) | set(self.transitions)
+        for following in self.transitions.values():
+            names.update(following)
+        return names - {END}
+
+    def target(self) -> dict:
+        return _normalize(self.expected_visits())
+
+    def to_dict(self) -> dict:
+        return {"transitions": self.transitions, "start": self.start, "max_steps": self.max_steps}
+
+
+class TrafficMix:
+    """
+    Picks what a virtual user does next in proportion to `weights`. A weighted name is an
+    operation, or a sub-workflow from `flows`: a fixed list of operations, or a
+    `MarkovSession` (or its `to_dict()`). `next_flow()` returns the operations to run.
+    """
+
+    def __init__(self, weights: dict, flows: dict = None):
+        self.weights = dict(weights)
+        self.flows = {name: _flow(flow) for name, flow in (flows or {}).items()}
+        self._table = AliasTable(self.weights)
+
+    def next_flow(self, rng=random) -> list:
+        name = self._table.sample(rng)
+        flow = self.flows.get(name)
+        if flow is None:
+            return [name]
+        return flow.walk(rng) if isinstance(flow, MarkovSession) else flow
+
+    def operations(self) -> set:
+        names = set()
+        for name in self._table.items:
+            flow = self.flows.get(name)
+            if flow is None:
+                names.add(name)
+            else:
+                names.update(flow.operations() if isinstance(flow, MarkovSession) else flow)
+        return names
+
+    def target(self) -> dict:
+        """The share of requests each operation should get, sub-workflows expanded."""
+        expected = {}
+        for name, share in self._table.probabilities.items():
+            flow = self.flows.get(name)
+            if flow is None:
+                visits = {name: 1.0}
+            elif isinstance(flow, MarkovSession):
+                visits = flow.expected_visits()
+            else:
+                visits = {}
+                for operation in flow:
+                    visits[operation] = visits.get(operation, 0.0) + 1.0
+            for operation, count in visits.items():
+                expected[operation] = expected.get(operation, 0.0) + share * count
+        return _normalize(expected)
+
+    def to_dict(self) -> dict:
+        return {"weights": self.weights,
+                "flows": {name: flow.to_dict() if isinstance(flow, MarkovSession) else flow
+                          for name, flow in self.flows.items()}}
+
+
+def _flow(flow):
+    if isinstance(flow, MarkovSession):
+        return flow
+    if isinstance(flow, dict):
+        return MarkovSession(**flow)
+    return list(flow)
+
+
+def _normalize(counts: dict) -> dict:
+    total = sum(counts.values())
+    return {name: count / total for name, count in counts.items()} if total else {}
+
+
+def build_mix(config: dict, endpoints: dict = None):
+    """
+    A `TrafficMix` (`weights`, `flows`) or a `MarkovSession` (`transitions`, `start`) from plain
+    data. With `endpoints`, every operation the mix can call must be one of them.
+    """
+    mix = MarkovSession(**config) if "transitions" in config else TrafficMix(config["weights"], config.get("flows"))
+    if endpoints is not None:
+        unknown = sorted(mix.operations() - set(endpoints))
+        if unknown:
+            raise ValueError(f"Traffic mix names unknown operations: {unknown}")
+    return mix
+
+
+# --------------------------
+# Mix report
+# --------------------------
+
+class MixReport:
+    """
+    Compares the requests a run actually sent per operation with the `target` shares,
+    with the exact counts next to the percentages.
+    """
+
+    def __init__(self, target: dict):
+        self.target = dict(target)
+        self.counts = {}
+
+    def record(self, api_name: str, count: int = 1):
+        self.counts[api_name] = self.counts.get(api_name, 0) + count
+
+    def update(self, counts: dict):
+        for api_name, count in counts.items():
+            self.record(api_name, count)
+        return self
+
+    def summary(self) -> dict:
+        total = sum(self.counts.values())
+        operations, distance = {}, 0.0
+        for name in sorted(set(self.target) | set(self.counts)):
+            target = self.target.get(name, 0.0)
+            achieved = self.counts.get(name, 0) / total if total else 0.0
+            distance += abs(achieved - target)
+            operations[name] = {"count": self.counts.get(name, 0), "expected": round(target * total, 1),
+                                "target_pct": round(target * 100, 3), "achieved_pct": round(achieved * 100, 3),
+                                "delta_pct": round((achieved - target) * 100, 3)}
+        return {"requests": total, "operations": operations,
+                "max_delta_pct": max((abs(row["delta_pct"]) for row in operations.values()), default=0.0),
+                "total_variation": round(distance / 2, 6)}
+
+    def log(self):
+        summary = self.summary()
+        logging.info(f"🎯 Traffic mix over {summary['requests']} requests "
+                     f"(total variation {summary['total_variation']:.4f}):")
+        for name, row in summary["operations"].items():
+            logging.info(f"   {name}: {row['count']} sent, {row['achieved_pct']:.2f}% "
+                         f"vs {row['target_pct']:.2f}% target ({row['delta_pct']:+.2f})")
+        return summary
@@ -0,0 +1,192 @@
+import logging
+import os
+from urllib.parse import unquote
+
+import yaml
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Values under these schema keys are data, not schemas, and are never walked or merged.
+# (`default` is still walked: in a `responses` map it names a response, not a value.)
+LITERAL_KEYS = {"example", "examples", "enum", "const"}
+# Maps whose keys are user-chosen names, so a property called "example" is still a schema
+NAMED_MAPS = {"properties", "patternProperties"}
+
+_IN_PROGRESS = object()
+_MISSING = object()
+
+
+class SchemaResolver:
+    """
+    Resolves `$ref`s in an OpenAPI document without copying shared subtrees.
+
+    Every reference target is resolved once and memoised by (file, JSON pointer), so all
+    places that reference the same component receive the *same* object. Nodes that contain
+    no references are returned unchanged. Recursive references produce a cyclic structure
+    instead of an infinite expansion.
+
+    Supports local pointers into any section (`#/components/parameters/...`,
+    `#/definitions/...`), relative-file refs (`common.yaml#/components/schemas/Error`,
+    `pet.json`), deep `allOf` merging and keeps every `oneOf`/`anyOf` alternative.
+    """
+
+    def __init__(self, spec: dict, spec_file: str = None):
+        self.root_file = os.path.abspath(spec_file) if spec_file else os.path.abspath("<memory>")
+        self.documents = {self.root_file: spec}  # absolute path -> parsed document
+        self.resolved = {}  # (file, pointer) -> resolved node or _IN_PROGRESS
+        self.pending = {}  # (file, pointer) -> placeholder handed out while resolving a cycle
+        self.inline = {}  # (id(node), file) -> (node, resolved node)
+        self.targets = set()  # ids of resolved reference targets (shared components)
+
+    # --------------------------
+    # References
+    # --------------------------
+
+    def resolve_ref(self, ref: str, base_file: str = None):
+        """
+        Returns the resolved target of a `$ref` string.
+        """
+        file, pointer = self._split_ref(ref, base_file or self.root_file)
+        key = (file, pointer)
+        cached = self.resolved.get(key, _MISSING)
+        if cached is _IN_PROGRESS:
+            # Recursive reference: hand out a placeholder that is filled in once resolved
+            placeholder = self.pending.setdefault(key, {})
+            self.targets.add(id(placeholder))
+            return placeholder
+        if cached is not _MISSING:
+            return cached
+
+        self.resolved[key] = _IN_PROGRESS
+        try:
+            result = self.resolve(self._lookup(file, pointer), file)
+        except Exception:
+            del self.resolved[key]
+            self.pending.pop(key, None)
+            raise
+
+        placeholder = self.pending.pop(key, None)
+        if placeholder is not None and isinstance(result, dict):
+            placeholder.update(result)
+            result = placeholder
+        self.resolved[key] = result
+        self.targets.add(id(result))
+        return result
+
+    def _split_ref(self, ref, base_file):
+        location, _, fragment = ref.partition("#")
+        if location:
+            file = os.path.normpath(os.path.join(os.path.dirname(base_file), unquote(location)))
+        else:
+            file = base_file
+        return file, fragment
+
+    def _document(self, file):
+        document = self.documents.get(file)
+        if document is None:
+            if not os.path.exists(file):
+                raise FileNotFoundError(f"Referenced document not found: {file}")
+            with open(file, "r", encoding="utf-8") as handle:
+                document = yaml.safe_load(handle)  # JSON is valid YAML
+            self.documents[file] = document
+            logging.info(f"Loaded referenced document {file}")
+        return document
+
+    def _lookup(self, file, pointer):
+        try:
+            return lookup_pointer(self._document(file), pointer)
+        except KeyError:
+            raise KeyError(f"Unresolvable $ref: {os.path.basename(file)}#{pointer}")
+
+    # --------------------------
+    # Schemas
+    # --------------------------
+
+    def resolve(self, node, base_file: str = None, named_map: bool = False):
+        """
+        Resolves every `$ref` inside `node`, sharing unchanged and already-resolved subtrees.
+        """
+        base_file = base_file or self.root_file
+        if isinstance(node, list):
+            items = [self.resolve(item, base_file) for item in node]
+            return node if all(a is b for a, b in zip(items, node)) else items
+        if not isinstance(node, dict):
+            return node
+        if isinstance(node.get("$ref"), str):
+            return self.resolve_ref(node["$ref"], base_file)
+
+        key = (id(node), base_file)
+        cached = self.inline.get(key)
+        if cached is not None:
+            return cached[1]
+        # Already-resolved structures may be cyclic; re-entering a node mid-walk returns it as-is
+        self.inline[key] = (node, node)
+
+        resolved, changed = {}, False
+        for name, value in node.items():
+            if name in LITERAL_KEYS and not named_map:
+                child = value
+            else:
+                child = self.resolve(value, base_file, name in NAMED_MAPS and not named_map)
+            resolved[name] = child
+            changed = changed or child is not value
+        if not named_map and isinstance(resolved.get("allOf"), list):
+            resolved, changed = self.merge_all_of(resolved), True
+
+        result = resolved if changed else node
+        self.inline[key] = (node, result)  # keep `node` alive so its id stays unique
+        return result
+
+    def merge_all_of(self, schema: dict) -> dict:
+        """
+        Deep-merges the (already resolved) `allOf` members of `schema` into one schema.
+        """
+        merged = {}
+        for part in schema["allOf"]:
+            if isinstance(part, dict):
+                merged = deep_merge(merged, part, self.targets)
+        return deep_merge(merged, {k: v for k, v in schema.items() if k != "allOf"}, self.targets)
+
+    @staticmethod
+    def variants(schema: dict) -> list:
+        """
+        Returns the selectable alternatives of a `oneOf`/`anyOf` schema (or the schema itself).
+        """
+        return schema.get("oneOf") or schema.get("anyOf") or [schema]
+
+
+def lookup_pointer(document, pointer: str):
+    """
+    Returns the node at a JSON pointer (`/components/schemas/Pet`); raises `KeyError` if absent.
+    """
+    node = document
+    for token in filter(None, pointer.split("/")):
+        token = unquote(token).replace("~1", "/").replace("~0", "~")
+        try:
+            node = node[int(token)] if isinstance(node, list) else node[token]
+        except (KeyError, IndexError, ValueError, TypeError):
+            raise KeyError(pointer)
+    return node
+
+
+def deep_merge(base: dict, overlay: dict, shared: set = frozenset()) -> dict:
+    """
+    Merges `overlay` into `base` without mutating either; untouched subtrees stay shared.
+
+    Nested values whose id is in `shared` (referenced components) are taken as-is rather
+    than merged into, which keeps the merge linear and safe on cyclic schemas.
+    """
+    if not base or base is overlay:
+        return overlay
+    merged = dict(base)
+    for key, value in overlay.items():
+        current = merged.get(key)
+        if key == "required" and isinstance(current, list) and isinstance(value, list):
+            merged[key] = current + [item for item in value if item not in current]
+        elif (isinstance(current, dict) and isinstance(value, dict) and key not in LITERAL_KEYS | {"default"}
+              and id(value) not in shared):
+            merged[key] = deep_merge(current, value, shared)
+        else:
+            merged[key] = value
+    return merged
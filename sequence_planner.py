@@ -0,0 +1,222 @@
+import heapq
+import logging
+import re
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Create first, then read, update and finally delete
+METHOD_RANK = {"POST": 0, "PUT": 2, "PATCH": 2, "GET": 1, "HEAD": 1, "OPTIONS": 1, "TRACE": 1, "DELETE": 3}
+_ID_SUFFIX = re.compile(r"[_-]?id$", re.IGNORECASE)
+
+
+def _stem(name: str) -> str:
+    """`petId` / `pet_id` / `pets` -> `pet`."""
+    name = _ID_SUFFIX.sub("", name).lower()
+    return name[:-1] if name.endswith("s") and len(name) > 1 else name
+
+
+def _response_fields(responses: dict) -> set:
+    """Top-level fields of the 2xx response examples (of the first item for arrays)."""
+    fields = set()
+    for status, body in (responses or {}).items():
+        if not str(status).startswith("2"):
+            continue
+        if isinstance(body, list) and body:
+            body = body[0]
+        if isinstance(body, dict):
+            fields.update(body)
+    return fields
+
+
+class Operation:
+    __slots__ = ("name", "method", "path", "segments", "key", "parameters", "required", "fields", "index")
+
+    def __init__(self, name, details, index):
+        self.name = name
+        self.index = index
+        self.method = (details.get("method") or name.split(" ", 1)[0]).upper()
+        self.path = details.get("path") or (name.split(" ", 1)[1] if " " in name else "/")
+        self.segments = [segment for segment in self.path.split("/") if segment]
+        self.parameters = [segment[1:-1] for segment in self.segments if segment[:1] == "{" and segment[-1:] == "}"]
+        # `/pet/{petId}` and `/pet/{id}` name the same resource
+        self.key = tuple("{}" if segment[:1] == "{" and segment[-1:] == "}" else segment for segment in self.segments)
+        self.required = [parameter.get("name") for parameter in details.get("parameters") or []
+                         if isinstance(parameter, dict) and parameter.get("required")
+                         and parameter.get("in") in ("query", "header") and parameter.get("name")]
+        self.fields = _response_fields(details.get("responses"))
+
+
+class SequencePlan:
+    """
+    Result of `SequencePlanner.plan`: the full `order`, the inferred dependency `edges`
+    (producer, consumer) and the operations whose producers could not be decided.
+    """
+
+    def __init__(self, order, edges, ambiguous):
+        self.order = order
+        self.edges = edges
+        self.ambiguous = ambiguous
+
+    def __iter__(self):
+        return iter(self.order)
+
+    def __len__(self):
+        return len(self.order)
+
+
+class SequencePlanner:
+    """
+    Orders operations locally, without an LLM round trip.
+
+    Dependencies come from the `OpenAPIParser.extract_api_endpoints()` output:
+    - a path parameter is produced by the create (POST, else PUT) on the path that
+      precedes it (`POST /pet` -> `GET /pet/{petId}`), or, failing that, by any
+      operation whose 2xx response has a matching field (`petId`, or `id` of a `pet`);
+    - required query/header parameters depend on operations that return that field;
+    - deletes run after everything else on the same item or below it.
+
+    The graph is sorted topologically with create/read/update/delete as the tie-breaker,
+    so every operation is kept even when the rules cannot decide.
+    """
+
+    def plan(self, endpoints: dict, hints: dict = None) -> SequencePlan:
+        """
+        :param endpoints: Operation name -> endpoint details (`method`, `path`, `parameters`, `responses`).
+        :param hints: Optional operation name -> position, used to order operations the graph leaves free.
+        """
+        operations = [Operation(name, details or {}, index) for index, (name, details) in enumerate(endpoints.items())]
+        edges, ambiguous = self._dependencies(operations)
+        order = self._sort(operations, edges, hints or {})
+        return SequencePlan(order, [(operations[a].name, operations[b].name) for a, b in sorted(edges)], ambiguous)
+
+    def _dependencies(self, operations):
+        creators = {}  # collection key -> creating operations (POST first)
+        under = {}  # key prefix -> operations on that path or below it
+        by_field = {}  # response field -> producing operations
+        for op in operations:
+            if op.method in ("POST", "PUT"):
+                creators.setdefault(op.key, []).append(op)
+                for field in op.fields:
+                    by_field.setdefault(field, []).append(op)
+            for depth in range(1, len(op.key) + 1):
+                under.setdefault(op.key[:depth], []).append(op)
+        for candidates in creators.values():
+            candidates.sort(key=lambda op: (op.method != "POST", op.index))
+
+        edges, ambiguous = set(), []
+        for op in operations:
+            position, unresolved = 0, False
+            for depth, segment in enumerate(op.key):
+                if segment != "{}":
+                    continue
+                name = op.parameters[position]
+                position += 1
+                producer = self._producer(op, name, op.key[:depth], creators, by_field)
+                if producer is None:
+                    unresolved = True
+                elif producer is not op:
+                    edges.add((producer.index, op.index))
+            for name in op.required:
+                for producer in by_field.get(name, ())[:1]:
+                    if producer is not op:
+                        edges.add((producer.index, op.index))
+            if unresolved:
+                ambiguous.append(op.name)
+
+            if op.method == "DELETE":
+                for other in under.get(op.key, ()):
+                    if other is not op and (other.method != "DELETE" or len(other.key) > len(op.key)):
+                        edges.add((other.index, op.index))
+        return edges, ambiguous
+
+    @staticmethod
+    def _producer(op, name, collection, creators, by_field):
+        candidates = [creator for creator in creators.get(collection, ()) if creator is not op]
+        if candidates:
+            return candidates[0]
+        stem = _stem(name)
+        for field in (name, "id"):
+            for candidate in by_field.get(field, ()):
+                literal = [segment for segment in candidate.key if segment != "{}"]
+                if candidate is not op and (field == name or (literal and _stem(literal[-1]) == stem)):
+                    return candidate
+        return None
+
+    @staticmethod
+    def _sort(operations, edges, hints):
+        successors = [[] for _ in operations]
+        indegree = [0] * len(operations)
+        for a, b in edges:
+            successors[a].append(b)
+            indegree[b] += 1
+
+        def priority(op):
+            return (METHOD_RANK.get(op.method, 1), hints.get(op.name, len(hints)), len(op.key), op.index)
+
+        keys = [priority(op) for op in operations]
+        ready = [keys[op.index] for op in operations if not indegree[op.index]]
+        heapq.heapify(ready)
+        done, order = [False] * len(operations), []
+        while len(order) < len(operations):
+            if not ready:  # a cycle: release its highest-priority member
+                forced = min((keys[i] for i in range(len(operations)) if not done[i]))
+                logging.warning(f"⚠️ Dependency cycle at {operations[forced[-1]].name}; ordering it by method")
+                ready.append(forced)
+            index = heapq.heappop(ready)[-1]
+            if done[index]:
+                continue
+            done[index] = True
+            order.append(operations[index].name)
+            for successor in successors[index]:
+                indegree[successor] -= 1
+                if indegree[successor] == 0 and not done[successor]:
+                    heapq.heappush(ready, keys[successor])
+        return order
+
+
+def plan_sequence(endpoints: dict, refine=None) -> list:
+    """
+    Plans an execution order for `endpoints`. When some operations stay ambiguous and
+    `refine` is given (e.g. `LLMSequenceGenerator.generate_sequence`), only those
+    operations are sent to it and its order is used as a tie-breaker.
+    """
+    planner = SequencePlanner()
+    plan = planner.plan(endpoints)
+    if refine is not None and plan.ambiguous:
+        try:
+            suggested = refine({name: endpoints[name] for name in plan.ambiguous})
+            hints = {name: position for position, name in enumerate(suggested) if name in endpoints}
+            plan = planner.plan(endpoints, hints)
+        except Exception as e:
+            logging.warning(f"⚠️ LLM refinement failed, keeping the rule-based order: {e}")
+    logging.info(f"🧭 Planned {len(plan)} operations ({len(plan.edges)} dependencies, "
+                 f"{len(plan.ambiguous)} ambiguous)")
+    return plan.order
+
+
+def operation_route(endpoints: dict, api_name: str) -> tuple:
+    """
+    Returns `(method, path)` for a planned operation. Planned names are `endpoints` keys,
+    which are operationIds for most specs; bare `"METHOD /path"` strings also work.
+    """
+    details = endpoints.get(api_name) or {}
+    if "method" in details and "path" in details:
+        return details["method"].upper(), details["path"]
+    method, _, path = api_name.partition(" ")
+    if not path:
+        raise KeyError(f"Unknown operation {api_name!r}")
+    return method.upper(), path
+
+
+def operation_runner(endpoints: dict, execute_api, **options):
+    """
+    Returns `execute(api_name)` for planned operations: each name is routed with
+    `operation_route` and sent as `execute_api(method, path, **options)`, e.g. through
+    `APIWorkflow.execute_api` with a session's `executor=`.
+    """
+    async def execute(api_name):
+        method, path = operation_route(endpoints, api_name)
+        return await execute_api(method, path, **options)
+
+    return execute
@@ -0,0 +1,159 @@
+import asyncio
+import json
+import logging
+from time import perf_counter_ns
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+_WHITESPACE = " \t\r\n"
+
+
+class IncrementalArrayParser:
+    """
+    Pulls the items of one JSON array out of a text stream as soon as each is complete.
+
+    With `key`, the array is the value of that key (`{"execution_order": [...]}`); otherwise it
+    is the first array in the stream. Text before it (markdown fences, prose) is skipped. An
+    item is only emitted once the following `,` or `]` has arrived, so a number or string
+    split across chunks is never emitted half-way.
+    """
+
+    def __init__(self, key: str = None):
+        self.key = key
+        self.buffer = ""
+        self.position = 0  # next unread character inside the array
+        self.started = False
+        self.finished = False
+        self._decoder = json.JSONDecoder()
+
+    def feed(self, text: str) -> list:
+        """Adds a chunk of text and returns the items it completed."""
+        if self.finished or not text:
+            return []
+        self.buffer += text
+        if not self.started and not self._find_start():
+            return []
+
+        items = []
+        while True:
+            position = self._skip(self.position, _WHITESPACE + ",")
+            if position >= len(self.buffer):
+                break
+            if self.buffer[position] == "]":
+                self.finished = True
+                break
+            try:
+                item, end = self._decoder.raw_decode(self.buffer, position)
+            except json.JSONDecodeError:
+                break  # incomplete: wait for more text
+            after = self._skip(end, _WHITESPACE)
+            if after >= len(self.buffer):
+                break  # `12` may still become `123`
+            items.append(item)
+            self.position = end
+        self._compact()
+        return items
+
+    def _find_start(self) -> bool:
+        search_from = 0
+        if self.key is not None:
+            marker = json.dumps(self.key)
+            index = self.buffer.find(marker)
+            if index < 0:
+                return False
+            search_from = index + len(marker)
+        start = self.buffer.find("[", search_from)
+        if start < 0:
+            return False
+        self.started = True
+        self.position = start + 1
+        return True
+
+    def _skip(self, position, characters):
+        while position < len(self.buffer) and self.buffer[position] in characters:
+            position += 1
+        return position
+
+    def _compact(self):
+        if self.position > 4096:  # keep the buffer from growing with the whole reply
+            self.buffer = self.buffer[self.position:]
+            self.position = 0
+
+
+async def run_pipelined(operations, execute, depends_on: dict = None, max_concurrency: int = 1, on_result=None):
+    """
+    Executes operations from an async iterator while it is still producing them.
+
+    Each operation starts as soon as it has arrived and every operation it depends on
+    (`depends_on`: name -> names, e.g. from `SequencePlan.edges`) has finished; a dependency
+    that never arrives does not block once the stream is over. `execute(name)` is awaited
+    with at most `max_concurrency` running at once, and `on_result(name, result)` is awaited
+    after each one. Returns the results in completion order.
+    """
+    depends_on = depends_on or {}
+    finished = {}  # name -> Event
+    arrived = set()
+    stream_done = asyncio.Event()
+    limit = asyncio.Semaphore(max_concurrency)
+    results, tasks, first = [], [], []
+    started = perf_counter_ns()
+
+    def event(name):
+        if name not in finished:
+            finished[name] = asyncio.Event()
+        return finished[name]
+
+    async def wait_for(dependency):
+        done = event(dependency)
+        while not done.is_set():
+            if stream_done.is_set() and dependency not in arrived:
+                return
+            waiter = asyncio.ensure_future(done.wait())
+            closed = asyncio.ensure_future(stream_done.wait())
+            await asyncio.wait({waiter, closed}, return_when=asyncio.FIRST_COMPLETED)
+            waiter.cancel()
+            closed.cancel()
+
+    async def run(name):
+        try:
+            for dependency in depends_on.get(name, ()):
+                if dependency != name:
+                    await wait_for(dependency)
+            async with limit:
+                if not first:
+                    first.append(name)
+                    logging.info(f"⚡ First request {name} after {(perf_counter_ns() - started) / 1e6:.1f}ms")
+                result = await execute(name)
+            results.append((name, result))
+            if on_result is not None:
+                await on_result(name, result)
+        finally:
+            event(name).set()
+
+    try:
+        async for name in operations:
+            if name in arrived:
+                continue
+            arrived.add(name)
+            tasks.append(asyncio.create_task(run(name)))
+    finally:
+        stream_done.set()
+        outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+    for outcome in outcomes:
+        if isinstance(outcome, BaseException):
+            raise outcome
+    return results
+
+
+def dependency_map(edges, order=None) -> dict:
+    """
+    `{consumer: {producers}}` from `(producer, consumer)` edges. With the planned `order`,
+    edges that point backwards (cycles the planner broke) are dropped so nothing deadlocks.
+    """
+    position = {name: index for index, name in enumerate(order)} if order else None
+    depends_on = {}
+    for producer, consumer in edges:
+        if position is None or position.get(producer, -1) < position.get(consumer, -1):
+            depends_on.setdefault(consumer, set()).add(producer)
+    return depends_on
@@ -0,0 +1,252 @@
+import argparse
+import json
+import logging
+import random
+
+import yaml
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+HTTP_METHODS = {"get", "put", "post", "delete", "options", "head", "patch", "trace"}
+ITEM_METHODS = ("get", "put", "patch", "delete")
+COLLECTION_METHODS = ("get", "post")
+PRIMITIVES = (
+    {"type": "string"},
+    {"type": "integer", "format": "int64"},
+    {"type": "number"},
+    {"type": "boolean"},
+    {"type": "string", "format": "date-time"},
+    {"type": "string", "enum": ["available", "pending", "sold"]},
+)
+
+
+class SyntheticSpecGenerator:
+    """
+    Generates OpenAPI 3 documents of arbitrary size for scaling tests.
+
+    Component schemas are laid out in `ref_depth + 1` levels: level 0 holds primitive-only
+    schemas and every higher level references `fan_out` schemas of the level below, so the
+    longest `$ref` chain is exactly `ref_depth`. A share of schemas is expressed through
+    `allOf`/`oneOf` (every `oneOf` variant defines the discriminator's required `kind`),
+    and `cycle_ratio` adds back-references from leaves to the top level.
+    Output is deterministic for a given `seed`.
+    """
+
+    def __init__(self, paths: int = 100, methods_per_path: int = 2, components: int = 50, ref_depth: int = 3,
+                 fan_out: int = 2, properties: int = 6, all_of_ratio: float = 0.2, one_of_ratio: float = 0.1,
+                 cycle_ratio: float = 0.0, shared_components: bool = True, seed: int = 0):
+        if ref_depth < 0 or fan_out < 1 or components < ref_depth + 1:
+            raise ValueError("need ref_depth >= 0, fan_out >= 1 and at least one component per level")
+        self.paths = paths
+        self.methods_per_path = max(1, methods_per_path)
+        self.components = components
+        self.ref_depth = ref_depth
+        self.fan_out = fan_out
+        self.properties = properties
+        self.all_of_ratio = all_of_ratio
+        self.one_of_ratio = one_of_ratio
+        self.cycle_ratio = cycle_ratio
+        self.shared_components = shared_components
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+    @property
+    def operation_count(self) -> int:
+        """
+        Number of operations `generate()` will emit.
+        """
+        collection_paths = (self.paths + 1) // 2
+        item_paths = self.paths // 2
+        return (collection_paths * min(self.methods_per_path, len(COLLECTION_METHODS))
+                + item_paths * min(self.methods_per_path, len(ITEM_METHODS)))
+
+    def generate(self) -> dict:
+        """
+        Builds the OpenAPI document as a plain dict.
+        """
+        self.rng = random.Random(self.seed)
+        levels = self._levels()
+        self._variants = set()
+        schemas = {}
+        for depth, names in enumerate(levels):
+            for name in names:
+                schemas[name] = self._schema(depth, levels)
+        for name in sorted(self._variants):
+            self._add_discriminator(schemas[name])
+
+        components = {"schemas": schemas}
+        if self.shared_components:
+            components.update(self._shared_components())
+
+        top_level = levels[-1]
+        paths = {}
+        for i in range(self.paths):
+            resource = f"resource{i // 2}"
+            schema_name = top_level[(i // 2) % len(top_level)]
+            if i % 2 == 0:
+                paths[f"/{resource}"] = self._collection_path(resource, schema_name)
+            else:
+                paths[f"/{resource}/{{{resource}Id}}"] = self._item_path(resource, schema_name)
+
+        return {
+            "openapi": "3.0.3",
+            "info": {"title": "Synthetic API", "version": "1.0.0",
+                     "description": f"{self.operation_count} operations, {self.components} schemas"},
+            "servers": [{"url": "http://127.0.0.1:8080"}],
+            "paths": paths,
+            "components": components,
+        }
+
+    def write(self, output_file: str, spec: dict = None):
+        """
+        Writes the spec as JSON (`.json`) or YAML (anything else).
+        """
+        spec = spec or self.generate()
+        with open(output_file, "w", encoding="utf-8") as file:
+            if output_file.endswith(".json"):
+                json.dump(spec, file, indent=1)
+            else:
+                dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+                yaml.dump(spec, file, Dumper=dumper, sort_keys=False)
+        operations = sum(1 for item in spec.get("paths", {}).values() for method in item if method in HTTP_METHODS)
+        logging.info(f"📝 Wrote {operations} operations to {output_file}")
+        return output_file
+
+    # --------------------------
+    # Schemas
+    # --------------------------
+
+    def _levels(self):
+        levels = [[] for _ in range(self.ref_depth + 1)]
+        for i in range(self.components):
+            levels[i % len(levels)].append(f"Schema{i}")
+        return levels
+
+    @staticmethod
+    def _ref(name, kind="schemas"):
+        return {"$ref": f"#/components/{kind}/{name}"}
+
+    def _own_properties(self, count):
+        return {f"field{j}": dict(PRIMITIVES[j % len(PRIMITIVES)]) for j in range(count)}
+
+    def _schema(self, depth, levels):
+        properties = {"id": {"type": "integer", "format": "int64"}}
+        properties.update(self._own_properties(self.properties))
+
+        if depth == 0:
+            if self.cycle_ratio and self.rng.random() < self.cycle_ratio:
+                # Back-reference to the top level closes a cycle of length `ref_depth + 1`
+                properties["owner"] = self._ref(self.rng.choice(levels[-1]))
+            return {"type": "object", "required": ["id"], "properties": properties}
+
+        children = [self.rng.choice(levels[depth - 1]) for _ in range(self.fan_out)]
+        roll = self.rng.random()
+        if roll < self.all_of_ratio:
+            return {"allOf": [self._ref(children[0]),
+                              {"type": "object", "properties": {**properties, **self._links(children[1:])}}]}
+        variants = list(dict.fromkeys(children))
+        if roll < self.all_of_ratio + self.one_of_ratio and len(variants) > 1:
+            self._variants.update(variants)
+            properties["variant"] = {"oneOf": [self._ref(child) for child in variants],
+                                     "discriminator": {"propertyName": "kind", "mapping": {
+                                         child: self._ref(child)["$ref"] for child in variants}}}
+            return {"type": "object", "properties": properties}
+        properties.update(self._links(children))
+        return {"type": "object", "required": ["id"], "properties": properties}
+
+    @staticmethod
+    def _add_discriminator(schema):
+        """Gives a `oneOf` variant the required `kind` property its discriminator names."""
+        target = schema["allOf"][-1] if "allOf" in schema else schema
+        target["properties"]["kind"] = {"type": "string"}
+        required = target.setdefault("required", [])
+        if "kind" not in required:
+            required.append("kind")
+
+    def _links(self, children):
+        links = {}
+        for k, child in enumerate(children):
+            # Alternate between direct references and arrays of references
+            links[f"link{k}"] = self._ref(child) if k % 2 == 0 else {"type": "array", "items": self._ref(child)}
+        return links
+
+    @staticmethod
+    def _shared_components():
+        error = {"type": "object", "properties": {"code": {"type": "integer"}, "message": {"type": "string"}}}
+        return {
+            "parameters": {
+                "Limit": {"name": "limit", "in": "query", "schema": {"type": "integer", "maximum": 100}},
+                "Offset": {"name": "offset", "in": "query", "schema": {"type": "integer"}},
+                "TraceId": {"name": "X-Trace-Id", "in": "header", "schema": {"type": "string"}},
+            },
+            "responses": {
+                "NotFound": {"description": "Not found", "content": {"application/json": {"schema": error}}},
+                "ServerError": {"description": "Server error", "content": {"application/json": {"schema": error}}},
+            },
+        }
+
+    # --------------------------
+    # Paths
+    # --------------------------
+
+    def _operation(self, operation_id, schema_name, request_body=False, status="200", many=False):
+        schema = self._ref(schema_name)
+        operation = {
+            "operationId": operation_id,
+            "responses": {status: {"description": "OK",
+                                   "content": {"application/json": {
+                                       "schema": {"type": "array", "items": schema} if many else schema}}}},
+        }
+        if request_body:
+            operation["requestBody"] = {"required": True, "content": {"application/json": {"schema": schema}}}
+        if self.shared_components:
+            operation["responses"]["404"] = self._ref("NotFound", "responses")
+            operation["responses"]["default"] = self._ref("ServerError", "responses")
+            operation["parameters"] = [self._ref("TraceId", "parameters")]
+        return operation
+
+    def _collection_path(self, resource, schema_name):
+        item = {}
+        for method in COLLECTION_METHODS[:self.methods_per_path]:
+            if method == "get":
+                operation = self._operation(f"list_{resource}", schema_name, many=True)
+                if self.shared_components:
+                    operation["parameters"] += [self._ref("Limit", "parameters"), self._ref("Offset", "parameters")]
+            else:
+                operation = self._operation(f"create_{resource}", schema_name, request_body=True, status="201")
+            item[method] = operation
+        return item
+
+    def _item_path(self, resource, schema_name):
+        item = {"parameters": [{"name": f"{resource}Id", "in": "path", "required": True,
+                                "schema": {"type": "integer", "format": "int64"}}]}
+        for method in ITEM_METHODS[:self.methods_per_path]:
+            item[method] = self._operation(f"{method}_{resource}", schema_name,
+                                           request_body=method in ("put", "patch"))
+        return item
+
+
+# Example Usage
+if __name__ == "__main__":
+    cli = argparse.ArgumentParser(description="Generate a synthetic OpenAPI spec for scaling tests.")
+    cli.add_argument("output", help="Output file (.json or .yaml)")
+    cli.add_argument("--paths", type=int, default=100)
+    cli.add_argument("--methods-per-path", type=int, default=2)
+    cli.add_argument("--components", type=int, default=50)
+    cli.add_argument("--ref-depth", type=int, default=3)
+    cli.add_argument("--fan-out", type=int, default=2)
+    cli.add_argument("--properties", type=int, default=6)
+    cli.add_argument("--all-of-ratio", type=float, default=0.2)
+    cli.add_argument("--one-of-ratio", type=float, default=0.1)
+    cli.add_argument("--cycle-ratio", type=float, default=0.0)
+    cli.add_argument("--no-shared-components", action="store_true")
+    cli.add_argument("--seed", type=int, default=0)
+    args = cli.parse_args()
+
+    SyntheticSpecGenerator(
+        paths=args.paths, methods_per_path=args.methods_per_path, components=args.components,
+        ref_depth=args.ref_depth, fan_out=args.fan_out, properties=args.properties,
+        all_of_ratio=args.all_of_ratio, one_of_ratio=args.one_of_ratio, cycle_ratio=args.cycle_ratio,
+        shared_components=not args.no_shared_components, seed=args.seed,
+    ).write(args.output)
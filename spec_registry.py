@@ -0,0 +1,236 @@
+import asyncio
+import glob
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import unquote
+
+from auth_provider import AuthProvider
+from openapi_parser import OpenAPIParser, load_document
+from spec_reload import SpecReloader
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+
+class SpecRegistry:
+    """
+    Holds many OpenAPI specs at once and shares identical component schemas between them.
+
+    Specs are parsed concurrently (threads by default, processes with `use_processes=True`
+    for very large YAML files). After loading, every resolved component schema is interned
+    by content hash, so e.g. an error envelope declared in forty specs exists once in memory
+    and its example payload is built once. Endpoint maps are extracted per spec on demand
+    and updated incrementally when a spec file changes (see `SpecReloader`).
+
+    Each spec also has its own target: the base URL from its `servers` (or `host`) and an
+    `AuthProvider` for its security schemes, so sessions on different specs never send
+    requests to another spec's host or with its credentials.
+    """
+
+    def __init__(self, max_workers: int = None, use_processes: bool = False):
+        self.max_workers = max_workers
+        self.use_processes = use_processes
+        self.files = {}  # spec name -> file path
+        self.parsers = {}  # spec name -> OpenAPIParser
+        self.reloaders = {}  # spec name -> SpecReloader (owns the endpoint map, built on demand)
+        self.interned = {}  # content digest -> canonical schema object
+        self.shared_examples = {}  # example cache shared by every parser (keys are ids of shared schemas)
+        self.auth_providers = {}  # spec name -> AuthProvider, built on first use (one token cache per spec)
+        self.lock = threading.RLock()
+
+    @staticmethod
+    def spec_name(openapi_file: str) -> str:
+        return os.path.splitext(os.path.basename(openapi_file))[0]
+
+    def load_directory(self, directory: str = "openapi_specs", patterns=("*.yaml", "*.yml", "*.json")):
+        """
+        Loads every spec file in `directory`.
+        """
+        files = sorted(f for pattern in patterns for f in glob.glob(os.path.join(directory, pattern)))
+        return self.load_all({self.spec_name(f): f for f in files})
+
+    def load_all(self, specs: dict):
+        """
+        Parses `{name: file}` specs concurrently and registers them.
+        """
+        pool_class = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+        with pool_class(max_workers=self.max_workers) as pool:
+            futures = {name: pool.submit(load_document, path) for name, path in specs.items()}
+            for name, future in futures.items():
+                try:
+                    self.register(name, specs[name], future.result())
+                except Exception as e:
+                    logging.error(f"Failed to load spec {name}: {e}")
+        logging.info(f"📚 Registry holds {len(self.parsers)} specs, {len(self.interned)} interned schemas")
+        return list(specs)
+
+    def register(self, name: str, openapi_file: str, spec: dict = None):
+        """
+        Registers a spec (parsing it now unless `spec` is given) and interns its components.
+        """
+        parser = OpenAPIParser(openapi_file)
+        parser.load_openapi_dict(spec if spec is not None else load_document(openapi_file))
+        with self.lock:
+            self._intern_components(parser)
+            parser._examples = self.shared_examples
+            self.files[name] = openapi_file
+            self.parsers[name] = parser
+            self.reloaders[name] = SpecReloader(
+                parser, before_rebuild=lambda diff, parser=parser: self._intern_changes(parser, diff))
+        return parser
+
+    def names(self):
+        return sorted(self.parsers)
+
+    def get_parser(self, name: str) -> OpenAPIParser:
+        if name not in self.parsers:
+            raise KeyError(f"Unknown spec: {name}. Available: {', '.join(self.names())}")
+        return self.parsers[name]
+
+    def get_endpoints(self, name: str) -> dict:
+        """
+        Returns the endpoint map for one spec, extracting it on first use.
+        """
+        self.get_parser(name)
+        with self.lock:
+            return self.reloaders[name].endpoints
+
+    def get_base_url(self, name: str, override: str = None) -> str:
+        """
+        Returns where one spec's requests go: `override`, else the spec's own server URL.
+        """
+        url = override or server_url(self.get_parser(name).spec)
+        if not url:
+            raise ValueError(f"Spec {name} declares no absolute server URL; configure a base URL for it")
+        return url
+
+    def get_auth_provider(self, name: str, credentials: dict = None) -> AuthProvider:
+        """
+        Returns the spec's `AuthProvider` (`credentials` maps its scheme names to secrets), built once.
+        """
+        parser = self.get_parser(name)
+        with self.lock:
+            provider = self.auth_providers.get(name)
+            if provider is None:
+                provider = self.auth_providers[name] = AuthProvider.from_parser(parser, credentials or {})
+            return provider
+
+    # --------------------------
+    # Reloading
+    # --------------------------
+
+    def reload(self, name: str, spec: dict = None):
+        """
+        Applies changes of one spec file incrementally and returns the `SpecDiff`.
+        """
+        self.get_parser(name)
+        with self.lock:
+            diff = self.reloaders[name].reload(spec)
+            if diff:
+                self.auth_providers.pop(name, None)  # its security schemes may have changed
+            return diff
+
+    async def watch(self, interval: float = 1.0, on_reload=None):
+        """
+        Polls every registered spec (and the files it references) and reloads changed ones.
+
+        `on_reload(name, diff)` is called after each reload that changed something.
+        """
+        while True:
+            for name in self.names():
+                if not self.reloaders[name].changed_files():
+                    continue
+                try:
+                    diff = await asyncio.to_thread(self.reload, name)
+                    if diff and on_reload:
+                        on_reload(name, diff)
+                except Exception as e:
+                    logging.error(f"❌ Reload of spec {name} failed: {e}")
+            await asyncio.sleep(interval)
+
+    # --------------------------
+    # Interning
+    # --------------------------
+
+    def _intern_components(self, parser, components=None):
+        memo = {}
+        for component in parser.schema_definitions if components is None else components:
+            self.intern(parser.get_schema(component), memo)
+
+        # Point the resolver at the shared copies so every later lookup uses them
+        resolver = parser.resolver
+        for key, value in resolver.resolved.items():
+            canonical = memo.get(id(value), (value, value, None))[1]
+            if canonical is not value:
+                resolver.resolved[key] = canonical
+                resolver.targets.add(id(canonical))
+
+    def _intern_changes(self, parser, diff):
+        components = []
+        for file, pointer in diff.dirty_refs:
+            section, _, name = pointer.rpartition("/")
+            name = unquote(name).replace("~1", "/").replace("~0", "~")
+            if file == parser.resolver.root_file and section in ("/components/schemas", "/definitions") \
+                    and name in parser.schema_definitions:
+                components.append("#" + pointer)
+        self._intern_components(parser, components)
+
+    def intern(self, node, memo: dict = None, _active: set = None):
+        """
+        Returns `(canonical node, digest)` for a resolved schema, interning it bottom-up.
+
+        Children are swapped for their canonical (content-identical) copies in place. Nodes
+        that are part of a reference cycle get digest `None` and are never shared.
+        """
+        memo = memo if memo is not None else {}
+        _active = _active if _active is not None else set()
+        if not isinstance(node, (dict, list)):
+            return node, json.dumps(node, sort_keys=True, default=str)
+        if id(node) in memo:
+            return memo[id(node)][1:]
+        if id(node) in _active:
+            return node, None
+
+        _active.add(id(node))
+        digest_parts, cyclic = [], False
+        items = node.items() if isinstance(node, dict) else enumerate(node)
+        for key, value in list(items):
+            canonical, digest = self.intern(value, memo, _active)
+            if canonical is not value:
+                node[key] = canonical
+            cyclic = cyclic or digest is None
+            digest_parts.append(f"{key!r}:{digest}")
+        _active.discard(id(node))
+
+        if cyclic:
+            result = (node, None)
+        else:
+            if isinstance(node, dict):
+                body = "{" + ",".join(sorted(digest_parts))
+            else:
+                body = "[" + ",".join(digest_parts)
+            digest = hashlib.blake2b(body.encode("utf-8"), digest_size=16).hexdigest()
+            result = (self.interned.setdefault(digest, node), digest)
+        memo[id(node)] = (node, *result)  # keep `node` alive: replaced children must not free their ids
+        return result
+
+
+def server_url(spec: dict) -> str:
+    """
+    The first absolute server URL of a spec (OpenAPI 3 `servers` with variable defaults,
+    Swagger 2 `schemes`/`host`/`basePath`), without a trailing slash; `None` if it has none.
+    """
+    for server in spec.get("servers") or ():
+        url = server.get("url", "")
+        for variable, details in (server.get("variables") or {}).items():
+            url = url.replace(f"{{{variable}}}", str(details.get("default", "")))
+        if "://" in url:
+            return url.rstrip("/")
+    if spec.get("host"):
+        scheme = (spec.get("schemes") or ["https"])[0]
+        return f"{scheme}://{spec['host']}{spec.get('basePath', '')}".rstrip("/")
+    return None
@@ -0,0 +1,300 @@
+import asyncio
+import logging
+import os
+
+from openapi_parser import HTTP_METHODS, load_document
+from schema_resolver import lookup_pointer
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+_MISSING = object()
+
+
+class SpecDiff:
+    """
+    What changed between two versions of a spec.
+
+    `changed_refs` holds the `(file, pointer)` definitions whose own content changed;
+    `dirty_refs` adds everything that references them, directly or transitively.
+    """
+
+    def __init__(self):
+        self.added = []  # operation ids
+        self.removed = []
+        self.changed = []
+        self.changed_refs = set()
+        self.dirty_refs = set()
+        self.locations = []  # (path, method) of operations that must be re-extracted
+        self.ref_targets = {}  # (file, pointer) -> `$ref` targets it uses, in the new version
+        self.operation_targets = {}  # (path, method) -> `$ref` targets it uses, in the new version
+
+    @property
+    def operations(self):
+        return self.added + self.removed + self.changed
+
+    def __bool__(self):
+        return bool(self.operations or self.dirty_refs)
+
+    def summary(self) -> dict:
+        return {
+            "added": self.added,
+            "removed": self.removed,
+            "changed": self.changed,
+            "components": sorted(pointer for _, pointer in self.dirty_refs),
+        }
+
+
+def collect_refs(node) -> set:
+    """
+    Returns every `$ref` string inside a raw (unresolved) document node.
+    """
+    refs, seen, stack = set(), set(), [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if id(node) in seen:
+                continue
+            seen.add(id(node))
+            if isinstance(node.get("$ref"), str):
+                refs.add(node["$ref"])
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return refs
+
+
+def _operations(paths: dict) -> dict:
+    """(path, method) -> (operation id, operation, path-level parameters)"""
+    operations = {}
+    for path, path_item in paths.items():
+        for method, details in path_item.items():
+            if method in HTTP_METHODS:
+                operation_id = details.get("operationId", f"{method.upper()} {path}")
+                operations[(path, method)] = (operation_id, details, path_item.get("parameters", []))
+    return operations
+
+
+class SpecReloader:
+    """
+    Applies edits of a spec file to a live `OpenAPIParser` without starting over.
+
+    A reload diffs every cached `$ref` target and every operation against the new
+    document. Only changed definitions and their dependents are dropped from the resolver,
+    only example payloads built from dropped schemas are evicted, and only operations that
+    changed (or use a changed definition) are re-extracted; the rest of the endpoint map is
+    reused as-is. Files are watched by polling their size and mtime, which includes
+    documents pulled in through relative-file `$ref`s.
+    """
+
+    def __init__(self, parser, endpoints: dict = None, before_rebuild=None):
+        self.parser = parser
+        self._endpoints = endpoints  # extracted on first use when not given
+        self.before_rebuild = before_rebuild  # called with the diff once stale state is dropped
+        self.stamps = {}
+        self._ref_targets = {}  # reused for definitions that did not change
+        self._operation_targets = {}
+        self._record_stamps()
+
+    @property
+    def endpoints(self) -> dict:
+        if self._endpoints is None:
+            self._endpoints = self.parser.extract_api_endpoints()
+        return self._endpoints
+
+    # --------------------------
+    # Watching
+    # --------------------------
+
+    def watched_files(self):
+        return [file for file in self.parser.resolver.documents if os.path.exists(file)]
+
+    @staticmethod
+    def _stamp(file):
+        try:
+            stat = os.stat(file)
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def _record_stamps(self):
+        self.stamps = {file: self._stamp(file) for file in self.watched_files()}
+
+    def changed_files(self):
+        """
+        Returns the watched files whose size or mtime moved since the last reload.
+        """
+        changed = []
+        for file in self.watched_files():
+            stamp = self._stamp(file)
+            if file not in self.stamps:
+                self.stamps[file] = stamp  # referenced after the last reload; start watching now
+            elif stamp != self.stamps[file]:
+                changed.append(file)
+        return changed
+
+    async def watch(self, interval: float = 1.0, on_reload=None):
+        """
+        Polls the spec files forever, reloading on change; `on_reload(diff)` is called after each reload.
+        """
+        while True:
+            if self.changed_files():
+                try:
+                    diff = self.reload()
+                    if diff and on_reload:
+                        on_reload(diff)
+                except Exception as e:
+                    logging.error(f"❌ Reload of {self.parser.openapi_file} failed: {e}")
+            await asyncio.sleep(interval)
+
+    # --------------------------
+    # Reloading
+    # --------------------------
+
+    def reload(self, spec: dict = None) -> SpecDiff:
+        """
+        Re-reads the spec (or uses `spec`) and applies only what changed.
+        """
+        resolver = self.parser.resolver
+        documents = {resolver.root_file: spec if spec is not None else load_document(self.parser.openapi_file)}
+        for file in self.changed_files():
+            if file != resolver.root_file:
+                documents[file] = load_document(file)
+
+        diff = self.diff(documents)
+        if diff:
+            self.invalidate(diff, documents)
+            if self.before_rebuild:
+                self.before_rebuild(diff)
+            self.rebuild(diff)
+            logging.info(f"🔄 Reloaded {self.parser.openapi_file}: {len(diff.added)} added, {len(diff.removed)} "
+                         f"removed, {len(diff.changed)} changed operations, {len(diff.dirty_refs)} schemas")
+        else:
+            self._accept(documents)  # unreferenced parts of the documents may still have changed
+        self._ref_targets, self._operation_targets = diff.ref_targets, diff.operation_targets
+        self._record_stamps()
+        return diff
+
+    def diff(self, documents: dict) -> SpecDiff:
+        """
+        Compares the parser's current documents with `documents` (file -> new content).
+        """
+        resolver = self.parser.resolver
+        diff = SpecDiff()
+
+        def document(file, new):
+            return documents.get(file, resolver.documents.get(file)) if new else resolver.documents.get(file)
+
+        def raw(file, pointer, new):
+            try:
+                return lookup_pointer(document(file, new), pointer)
+            except KeyError:
+                return _MISSING
+
+        def targets(node, file):
+            return {resolver._split_ref(ref, file) for ref in collect_refs(node)} if node is not _MISSING else set()
+
+        # Definitions whose own content changed; `$ref` targets are re-collected only for those
+        for key in list(resolver.resolved):
+            file, pointer = key
+            if file in documents:
+                node = raw(file, pointer, True)
+                if raw(file, pointer, False) != node:
+                    diff.changed_refs.add(key)
+                    diff.ref_targets[key] = targets(node, file)
+                    continue
+            diff.ref_targets[key] = self._ref_targets[key] if key in self._ref_targets \
+                else targets(raw(file, pointer, True), file)
+
+        diff.dirty_refs = set(diff.changed_refs)
+        if diff.changed_refs:
+            dependents = {}
+            for key, key_targets in diff.ref_targets.items():
+                for target in key_targets:
+                    dependents.setdefault(target, []).append(key)
+            pending = list(diff.changed_refs)
+            while pending:
+                for dependent in dependents.get(pending.pop(), ()):
+                    if dependent not in diff.dirty_refs:
+                        diff.dirty_refs.add(dependent)
+                        pending.append(dependent)
+
+        # Operations
+        old_operations = _operations(self.parser.api_map)
+        new_operations = _operations(document(resolver.root_file, True).get("paths", {}))
+        for location, (operation_id, details, path_parameters) in old_operations.items():
+            if location not in new_operations or new_operations[location][0] != operation_id:
+                diff.removed.append(operation_id)
+        for location, (operation_id, details, path_parameters) in new_operations.items():
+            old = old_operations.get(location)
+            edited = old is None or old[1] != details or old[2] != path_parameters
+            if edited or location not in self._operation_targets:
+                diff.operation_targets[location] = targets([details, path_parameters], resolver.root_file)
+            else:
+                diff.operation_targets[location] = self._operation_targets[location]
+
+            if old is None or old[0] != operation_id:
+                diff.added.append(operation_id)
+            elif edited or not diff.dirty_refs.isdisjoint(diff.operation_targets[location]):
+                diff.changed.append(operation_id)
+            else:
+                continue
+            diff.locations.append(location)
+        return diff
+
+    def invalidate(self, diff: SpecDiff, documents: dict):
+        """
+        Drops resolved schemas and example payloads that `diff` made stale and installs the new documents.
+        """
+        resolver = self.parser.resolver
+        dropped = [resolver.resolved.pop(key) for key in diff.dirty_refs if key in resolver.resolved]
+        dropped += [result for _, result in resolver.inline.values()]
+        resolver.inline.clear()
+        resolver.pending.clear()
+        resolver.targets = {id(node) for node in resolver.resolved.values()}
+        self._accept(documents)
+
+        # Examples are memoised by schema id: evict everything reachable from dropped schemas
+        # (stopping at schemas that stay cached) before those ids can be reused
+        stale, stack = set(), dropped
+        while stack:
+            node = stack.pop()
+            if isinstance(node, dict):
+                if id(node) in stale or id(node) in resolver.targets:
+                    continue
+                stale.add(id(node))
+                stack.extend(node.values())
+            elif isinstance(node, list):
+                stack.extend(node)
+        examples = self.parser._examples
+        for key in [key for key in examples if key[0] in stale]:
+            del examples[key]
+
+    def rebuild(self, diff: SpecDiff):
+        """
+        Re-extracts the operations listed in `diff`, reusing every other endpoint.
+        """
+        if self._endpoints is None:
+            return  # never extracted, nothing to reuse
+        previous = {(endpoint["path"], endpoint["method"].lower()): (operation_id, endpoint)
+                    for operation_id, endpoint in self._endpoints.items()}
+        relocated = set(diff.locations)
+        endpoints = {}
+        for path, path_item in self.parser.api_map.items():
+            for method in path_item:
+                if method not in HTTP_METHODS:
+                    continue
+                if (path, method) in relocated or (path, method) not in previous:
+                    operation_id, endpoint = self.parser.extract_operation(path, method)
+                else:
+                    operation_id, endpoint = previous[(path, method)]
+                endpoints[operation_id] = endpoint
+        self._endpoints = endpoints  # a new map, so readers of the old one are unaffected
+
+    def _accept(self, documents: dict):
+        resolver = self.parser.resolver
+        resolver.documents.update(documents)
+        spec = documents[resolver.root_file]
+        self.parser.spec = spec
+        self.parser.schema_definitions = spec.get("components", {}).get("schemas", spec.get("definitions", {}))
+        self.parser.api_map = spec.get("paths", {})
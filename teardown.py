@@ -0,0 +1,314 @@
+import argparse
+import asyncio
+import glob
+import logging
+import os
+import random
+import sys
+import threading
+
+import json_codec
+from auth_provider import add_auth_arguments, auth_from_args
+from rate_limiter import RateLimiter
+from request_template import RequestTemplate
+from sequence_planner import Operation, SequencePlanner
+from sequence_stream import dependency_map
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+GONE_STATUSES = (404, 410)  # already deleted: nothing left to clean up
+RETRY_STATUSES = (408, 409, 425, 429, 500, 502, 503, 504)
+
+
+class DeleteRoute:
+    """How to delete what one create operation made: `POST /pet` -> `DELETE /pet/{petId}`."""
+
+    __slots__ = ("create", "delete", "path", "parameters", "parent_parameters", "level")
+
+    def __init__(self, create: Operation, delete: Operation, level: int = 0):
+        self.create = create.name
+        self.delete = f"DELETE {delete.path}"
+        self.path = delete.path
+        self.parameters = delete.parameters  # the last one is the created resource's ID
+        self.parent_parameters = list(zip(create.parameters, delete.parameters))  # positional: names may differ
+        self.level = level
+
+
+def infer_delete_routes(endpoints: dict) -> dict:
+    """
+    Maps every create operation (a POST on a collection) to the DELETE on its item path,
+    keyed by both operation name and `METHOD /path`.
+
+    `level` counts the creates a resource depends on (`SequencePlanner` edges), so deleting
+    in descending level removes children before their parents.
+    """
+    plan = SequencePlanner().plan(endpoints)
+    operations = {name: Operation(name, details or {}, index) for index, (name, details) in enumerate(endpoints.items())}
+    deletes = {op.key: op for op in operations.values() if op.method == "DELETE" and op.key[-1:] == ("{}",)}
+    creates = {name: op for name, op in operations.items()
+               if op.method == "POST" and op.key + ("{}",) in deletes}
+
+    depends_on = dependency_map(plan.edges, plan.order)
+    levels = {}
+    for name in plan.order:  # producers come first, so their levels are known
+        if name in creates:
+            levels[name] = 1 + max((levels[producer] for producer in depends_on.get(name, ()) if producer in levels),
+                                   default=-1)
+
+    routes = {}
+    for name, op in creates.items():
+        route = DeleteRoute(op, deletes[op.key + ("{}",)], levels.get(name, 0))
+        routes[name] = routes[f"POST {op.path}"] = route
+    return routes
+
+
+class TeardownJournal:
+    """
+    Append-only JSON-lines journal of created resources and their deletions.
+
+    Every create is written (and flushed) as it happens, so an interrupted run leaves a file
+    from which `pending()` replays what still needs deleting:
+    `{"event": "created", "key": 7, "delete": "DELETE /pet/{petId}", "params": {"petId": 123}, "level": 0}`
+    and later `{"event": "deleted", "key": 7}`.
+    """
+
+    def __init__(self, path: str = "teardown.jsonl"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._pending, last_key = self._replay()
+        self._next_key = last_key + 1  # keys of deleted entries are never reused
+        self._file = None
+
+    def _replay(self):
+        pending, last = {}, -1
+        if not os.path.exists(self.path):
+            return pending, last
+        with open(self.path, "rb") as journal:
+            for line in journal:
+                try:
+                    entry = json_codec.loads(line)
+                except ValueError:
+                    logging.warning(f"⚠️ Skipping a torn line in {self.path}")  # the run died mid-write
+                    continue
+                last = max(last, entry["key"])
+                if entry["event"] == "created":
+                    pending[entry["key"]] = entry
+                else:
+                    pending.pop(entry["key"], None)
+        return pending, last
+
+    def _append(self, entry: dict):
+        if self._file is None:
+            self._file = open(self.path, "ab")
+            if self._file.tell() and not _ends_with_newline(self.path):
+                self._file.write(b"\n")  # never glue a new entry onto a torn one
+        self._file.write(json_codec.dumps(entry) + b"\n")
+        self._file.flush()
+
+    def created(self, delete: str, params: dict, level: int = 0) -> int:
+        with self._lock:
+            key = self._next_key
+            self._next_key += 1
+            entry = {"event": "created", "key": key, "delete": delete, "params": params, "level": level}
+            self._pending[key] = entry
+            self._append(entry)
+            return key
+
+    def deleted(self, key: int):
+        with self._lock:
+            if self._pending.pop(key, None) is not None:
+                self._append({"event": "deleted", "key": key})
+
+    def pending(self) -> list:
+        """Resources not yet deleted, oldest first."""
+        with self._lock:
+            return list(self._pending.values())
+
+    def compact(self):
+        """Rewrites the journal with only the pending entries (removes it when none are left)."""
+        with self._lock:
+            self.close()
+            if not self._pending:
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+                return
+            temporary = f"{self.path}.tmp"
+            with open(temporary, "wb") as journal:
+                journal.writelines(json_codec.dumps(entry) + b"\n" for entry in self._pending.values())
+            os.replace(temporary, self.path)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __len__(self):
+        return len(self._pending)
+
+
+def _ends_with_newline(path) -> bool:
+    with open(path, "rb") as journal:
+        journal.seek(-1, os.SEEK_END)
+        return journal.read(1) == b"\n"
+
+
+class ResourceTracker:
+    """
+    Records every successful create in a `TeardownJournal`, with the delete it needs.
+
+    The created ID is taken from the response body (the delete's ID parameter, e.g. `petId`,
+    else `id`), falling back to the request payload (`POST /user` -> `username`); parent path
+    parameters come from the create's own parameters.
+    """
+
+    def __init__(self, endpoints: dict, journal: TeardownJournal):
+        self.routes = infer_delete_routes(endpoints)
+        self.journal = journal
+        self.untracked = 0  # creates whose ID could not be found
+        logging.info(f"🧹 Tracking {len(set(map(id, self.routes.values())))} creatable resources for teardown")
+
+    def record(self, api_name: str, result: dict, payload=None, params: dict = None):
+        route = self.routes.get(api_name)
+        status = result.get("status_code", result.get("status"))
+        if route is None or status is None or not 200 <= status < 300:
+            return None
+        id_parameter = route.parameters[-1]
+        resource_id = _find_id(result.get("response"), id_parameter)
+        if resource_id is None:
+            resource_id = _find_id(payload, id_parameter)
+        if resource_id is None:
+            self.untracked += 1
+            logging.warning(f"⚠️ {api_name} succeeded but returned no '{id_parameter}'; it will not be cleaned up")
+            return None
+        delete_params = {id_parameter: resource_id}
+        for create_name, delete_name in route.parent_parameters:
+            if params and create_name in params:
+                delete_params[delete_name] = params[create_name]
+        return self.journal.created(route.delete, delete_params, route.level)
+
+
+def _find_id(body, id_parameter):
+    if isinstance(body, (str, bytes)):
+        if not body:
+            return None
+        try:
+            body = json_codec.loads(body)
+        except ValueError:
+            return None
+    if not isinstance(body, dict):
+        return None
+    for field in (id_parameter, "id"):
+        if body.get(field) is not None:
+            return body[field]
+    return None
+
+
+class Teardown:
+    """
+    Deletes everything pending in a journal: deepest dependency level first, each level
+    concurrently (`concurrency` workers) under an optional `RateLimiter`.
+
+    404/410 count as deleted. Throttling, conflicts, 5xx and connection errors are retried
+    `retries` times with exponential backoff; anything else stays in the journal for a later run.
+    With an `AuthProvider`, deletes are signed like the run's requests, and a 401 is retried
+    once the rejected token has been dropped.
+    """
+
+    def __init__(self, base_url: str, headers: dict = None, journal: TeardownJournal = None,
+                 rate_limiter: RateLimiter = None, concurrency: int = 32, retries: int = 3, backoff: float = 0.5,
+                 auth=None):
+        self.base_url = base_url
+        self.headers = headers or {}
+        self.journal = journal or TeardownJournal()
+        self.rate_limiter = rate_limiter
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.auth = auth
+        self.templates = {}  # "DELETE /path" -> RequestTemplate
+
+    async def run(self) -> dict:
+        """Returns `{"deleted": n, "gone": n, "failed": n, "pending": n}`."""
+        import aiohttp  # only the deletes need it; journals and trackers work without
+
+        summary = {"deleted": 0, "gone": 0, "failed": 0}
+        pending = self.journal.pending()
+        levels = {}
+        for entry in pending:
+            levels.setdefault(entry.get("level", 0), []).append(entry)
+        logging.info(f"🧹 Tearing down {len(pending)} resources in {len(levels)} levels")
+
+        async with aiohttp.ClientSession() as session:
+            for level in sorted(levels, reverse=True):
+                entries = reversed(levels[level])  # newest first within a level
+                workers = min(self.concurrency, len(levels[level]))
+                await asyncio.gather(*[self._worker(session, entries, summary) for _ in range(workers)])
+
+        self.journal.compact()
+        summary["pending"] = len(self.journal)
+        logging.info(f"✅ Teardown finished: {summary}")
+        return summary
+
+    async def _worker(self, session, entries, summary):
+        for entry in entries:  # a shared iterator: each entry goes to exactly one worker
+            outcome = await self._delete(session, entry)
+            summary[outcome] += 1
+            if outcome != "failed":
+                self.journal.deleted(entry["key"])
+
+    async def _delete(self, session, entry) -> str:
+        import aiohttp
+        from executor import execute_api
+
+        template = self.templates.get(entry["delete"])
+        if template is None:
+            method, _, path = entry["delete"].partition(" ")
+            template = self.templates[entry["delete"]] = RequestTemplate(entry["delete"], method, path,
+                                                                         base_url=self.base_url, headers=self.headers)
+        for attempt in range(self.retries + 1):
+            try:
+                result = await execute_api(self.base_url, entry["delete"], {}, self.headers, self.rate_limiter,
+                                           entry["params"], session, template, auth=self.auth)
+                status = result["status"]
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                status, error = None, e
+            if status is not None and 200 <= status < 300:
+                return "deleted"
+            if status in GONE_STATUSES:
+                return "gone"
+            if status is not None and status not in RETRY_STATUSES and not (status == 401 and self.auth):
+                break
+            if attempt < self.retries:
+                await asyncio.sleep(self.backoff * 2 ** attempt * (0.5 + random.random()))
+        reason = f"status {status}" if status is not None else type(error).__name__
+        logging.warning(f"⚠️ Could not delete {entry['delete']} {entry['params']} ({reason}); left in the journal")
+        return "failed"
+
+
+def main(argv=None):
+    cli = argparse.ArgumentParser(description="Delete the resources left behind by (interrupted) load runs.")
+    cli.add_argument("journals", nargs="*", help="Pending-cleanup journals (default: every teardown/*.jsonl)")
+    cli.add_argument("--base-url", required=True)
+    cli.add_argument("--header", action="append", default=[], help="'Name: value', e.g. an Authorization header")
+    cli.add_argument("--rate", type=float, default=50.0, help="Deletes per second")
+    cli.add_argument("--concurrency", type=int, default=32)
+    cli.add_argument("--retries", type=int, default=3)
+    add_auth_arguments(cli)
+    args = cli.parse_args(argv)
+
+    headers = dict(header.split(":", 1) for header in args.header)
+    headers = {name.strip(): value.strip() for name, value in headers.items()}
+    limiter, auth = RateLimiter(args.rate), auth_from_args(args)
+    summary = {"deleted": 0, "gone": 0, "failed": 0, "pending": 0}
+    for path in args.journals or sorted(glob.glob(os.path.join("teardown", "*.jsonl"))):
+        teardown = Teardown(args.base_url, headers, TeardownJournal(path), limiter, args.concurrency, args.retries,
+                            auth=auth)
+        for outcome, count in asyncio.run(teardown.run()).items():
+            summary[outcome] += count
+    print(json_codec.dumps(summary).decode("utf-8"))
+    return 1 if summary["pending"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+
+import json_codec
+from mock_server import MockAPIServer
+
+ENDPOINTS = {
+    "addPet": {"method": "POST", "path": "/pet", "parameters": [], "responses": {"200": {"id": 1, "name": "doggie"}}},
+    "getPetById": {"method": "GET", "path": "/pet/{petId}", "responses": {"200": {"id": 1, "name": "doggie"}},
+                   "parameters": [{"name": "petId", "in": "path", "required": True, "schema": {"type": "integer"}},
+                                  {"name": "fields", "in": "query", "required": True, "example": "name"}]},
+    "getOrderById": {"method": "GET", "path": "/store/order/{orderId}", "responses": {"200": {"id": 1}},
+                     "parameters": [{"name": "orderId", "in": "path", "schema": {"type": "integer"}}]},
+}
+
+
+def test_spec_parameters_and_created_ids_fill_the_request():
+    pytest.importorskip("aiohttp")
+    from api_executor import APIExecutor
+
+    server = MockAPIServer(ENDPOINTS)
+    targets, handle = [], server.handle
+
+    async def record_targets(method, target, body=b""):
+        targets.append(f"{method} {target}")
+        return await handle(method, target, body)
+
+    server.handle = record_targets
+
+    async def main():
+        async with server:
+            executor = APIExecutor(server.base_url, {}, api_map=ENDPOINTS)
+            try:
+                created = await executor.execute_api("POST", "/pet", {"name": "rex"})
+                fetched = await executor.execute_api("GET", "/pet/{petId}")
+                unfillable = await executor.execute_api("GET", "/store/order/{orderId}")  # used to raise KeyError
+                return created, fetched, unfillable
+            finally:
+                await executor.close()
+
+    created, fetched, unfillable = asyncio.run(main())
+    pet_id = json_codec.loads(created["response"])["id"]
+    assert created["status_code"] == fetched["status_code"] == 200
+    assert targets == ["POST /pet", f"GET /pet/{pet_id}?fields=name"]  # no request for the unfillable one
+    assert unfillable["status_code"] == 0 and "orderId" in unfillable["error"]
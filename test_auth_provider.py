@@ -0,0 +1,147 @@
+import asyncio
+
+import pytest
+
+from auth_provider import AuthProvider, ClientCredentials, TokenFetchError
+from openapi_parser import OpenAPIParser
+from request_template import PreparedRequest
+
+SPEC = {
+    "openapi": "3.0.3",
+    "security": [{"oauth": ["read"]}],
+    "components": {"securitySchemes": {
+        "oauth": {"type": "oauth2", "flows": {"clientCredentials": {
+            "tokenUrl": "https://idp.example/token", "scopes": {"read": "", "write": ""}}}},
+        "key": {"type": "apiKey", "in": "query", "name": "api_key"},
+        "session": {"type": "apiKey", "in": "cookie", "name": "sid"},
+    }},
+    "paths": {
+        "/pet": {"post": {"operationId": "addPet", "security": [{"missing": []}, {"key": [], "session": []}]}},
+        "/health": {"get": {"security": [{}]}},
+        "/pet/{petId}": {"get": {"operationId": "getPet"}},
+    },
+}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_requests_are_signed_per_operation_security():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return {"access_token": "t1", "expires_in": 300}
+
+    parser = OpenAPIParser("<memory>")
+    parser.load_openapi_dict(SPEC)
+    provider = AuthProvider.from_parser(parser, {"oauth": {"client_id": "c", "client_secret": "s", "fetch": fetch},
+                                                 "key": {"value": "k&1"}, "session": {"value": "abc"}})
+    request = PreparedRequest("GET", "https://api/pet/1?x=1", {"Accept": "*/*"}, None)
+
+    async def main():
+        return [await provider.authorize(request, name) for name in ("getPet", "addPet", "GET /health")]
+
+    read, create, health = asyncio.run(main())
+    assert read.headers == {"Accept": "*/*", "Authorization": "Bearer t1"} and read.url == request.url
+    assert create.url == "https://api/pet/1?x=1&api_key=k%261" and create.headers["Cookie"] == "sid=abc"
+    assert "Authorization" not in create.headers and health is request
+    assert provider.schemes["oauth"].credential.scopes == ["read", "write"] and calls == [1]
+
+
+def test_single_flight_fetch_and_refresh_ahead_of_expiry():
+    clock, fetched = FakeClock(), []
+
+    async def fetch():
+        fetched.append(clock.now)
+        await asyncio.sleep(0.01)
+        return {"access_token": f"t{len(fetched)}", "expires_in": 100}
+
+    token = ClientCredentials("https://idp/token", "c", "s", refresh_margin=0.2, fetch=fetch, clock=clock)
+
+    async def main():
+        first = await asyncio.gather(*[token.value() for _ in range(1000)])  # no stampede
+        clock.now = 85  # inside the refresh margin: served at once, refreshed in the background
+        ahead = await asyncio.gather(*[token.value() for _ in range(100)])
+        await asyncio.sleep(0.02)
+        return first, ahead, await token.value()
+
+    first, ahead, refreshed = asyncio.run(main())
+    assert set(first) == {"t1"} and set(ahead) == {"t1"} and refreshed == "t2"
+    assert fetched == [0, 85]
+
+
+def test_failed_refresh_keeps_token_and_401_invalidates_once():
+    clock, replies = FakeClock(), [{"access_token": "t1", "expires_in": 100}, ConnectionError("idp down"),
+                                   {"access_token": "t2", "expires_in": 100}]
+
+    async def fetch():
+        reply = replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    token = ClientCredentials("https://idp/token", "c", "s", retry_interval=5, fetch=fetch, clock=clock)
+
+    async def main():
+        assert await token.value() == "t1"
+        clock.now = 90
+        assert await token.value() == "t1"  # starts a refresh that fails
+        await asyncio.sleep(0)
+        assert await token.value() == "t1" and token._inflight is None  # retried only after 5s
+        token.invalidate("stale")  # a 401 for an older token changes nothing
+        assert await token.value() == "t1"
+        token.invalidate("t1")
+        return await token.value()
+
+    assert asyncio.run(main()) == "t2"
+
+    attempts = []
+
+    async def down():
+        attempts.append(clock.now)
+        raise TokenFetchError("401 from token endpoint")
+
+    dead = ClientCredentials("https://idp/token", "c", "s", fetch=down, clock=clock)
+
+    async def fail_twice():
+        for _ in range(2):
+            with pytest.raises(TokenFetchError):
+                await dead.value()
+
+    asyncio.run(fail_twice())
+    assert len(attempts) == 1  # the second caller fails fast instead of hitting the endpoint again
+
+
+def test_cancelled_waiters_and_ended_loops_do_not_break_the_shared_fetch():
+    fetched = []
+
+    async def slow():
+        fetched.append(1)
+        await asyncio.sleep(0.1)
+        return {"access_token": f"t{len(fetched)}", "expires_in": 100}
+
+    token = ClientCredentials("https://idp/token", "c", "s", fetch=slow)
+
+    async def impatient():
+        waiters = [asyncio.ensure_future(token.value()) for _ in range(3)]
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(token.value(), 0.01)  # used to cancel the fetch the others wait on
+        return await asyncio.gather(*waiters)
+
+    assert asyncio.run(impatient()) == ["t1"] * 3 and fetched == [1]
+
+    ended = ClientCredentials("https://idp/token", "c", "s", fetch=slow)
+
+    async def abandon():
+        asyncio.ensure_future(ended.value())
+        await asyncio.sleep(0)  # the loop ends with the fetch still running
+
+    asyncio.run(abandon())
+    assert ended._inflight is None  # used to stay a cancelled future, failing every later caller
+    assert asyncio.run(ended.value()) == "t3" and len(fetched) == 3  # the abandoned fetch was the second
@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+import benchmarks
+from benchmarks import compare, measure
+
+
+def test_measure_calibrates_loops_and_reports_medians():
+    calls = []
+    result = measure(lambda: calls.append(1), repeat=3, min_time=0.01)
+    assert result["loops"] >= 1 and result["repeat"] == 3
+    assert len(calls) > result["loops"] * 3  # warm-up and calibration run before the timed rounds
+    assert 0 < result["best_s"] <= result["seconds_per_op"]
+    assert result["ops_per_sec"] == pytest.approx(1 / result["seconds_per_op"])
+
+
+def test_compare_flags_only_slowdowns_beyond_the_threshold():
+    baseline = {"results": {"fast": {"seconds_per_op": 1.0}, "slow": {"seconds_per_op": 1.0},
+                            "gone": {"seconds_per_op": 1.0}, "skipped": {"skipped": "no aiohttp"}}}
+    candidate = {"results": {"fast": {"seconds_per_op": 0.5}, "slow": {"seconds_per_op": 1.2},
+                             "new": {"seconds_per_op": 9.0}, "skipped": {"seconds_per_op": 1.0}}}
+    rows, regressions = compare(baseline, candidate, threshold=0.10)
+    assert [row["benchmark"] for row in rows] == ["fast", "slow"]  # nothing to compare the others with
+    assert rows[0]["change"] == pytest.approx(-0.5) and regressions == ["slow"]
+    assert compare(baseline, candidate, threshold=0.25)[1] == []
+
+
+def test_main_exits_non_zero_on_a_baseline_regression(tmp_path, monkeypatch):
+    monkeypatch.setitem(benchmarks.BENCHMARKS, "test.fixed", lambda scale: {"seconds_per_op": 2.0, "ops_per_sec": 0.5})
+    baseline = tmp_path / "baseline.json"
+    output = str(tmp_path / "candidate.json")
+
+    baseline.write_text(json.dumps({"results": {"test.fixed": {"seconds_per_op": 1.0}}}))
+    assert benchmarks.main(["-k", "test.fixed", "--output", output, "--baseline", str(baseline)]) == 1
+    with open(output) as report:
+        assert json.load(report)["results"]["test.fixed"]["seconds_per_op"] == 2.0
+
+    baseline.write_text(json.dumps({"results": {"test.fixed": {"seconds_per_op": 1.9}}}))
+    assert benchmarks.main(["-k", "test.fixed", "--output", output, "--baseline", str(baseline)]) == 0
+    assert benchmarks.main(["-k", "test.fixed", "--output", output]) == 0  # no baseline, no gate
@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from data_feeders import DataFeeder, FeederExhausted, bind
+
+
+@pytest.fixture
+def customers(tmp_path):
+    path = tmp_path / "customers.csv"
+    path.write_text("id,name,city\n" + "".join(f'{i},"Customer, {i}",City{i % 3}\n' for i in range(100)))
+    return str(path)
+
+
+def test_partitions_cover_every_record_once(customers):
+    feeder = DataFeeder(customers, mode="unique", converters={"id": int})
+    seen = []
+    for user in range(7):
+        seen.extend(record["id"] for record in feeder.partition(user, 7))
+    assert sorted(seen) == list(range(100))
+    assert feeder.partition(0, 7).next_record() == {"id": 0, "name": "Customer, 0", "city": "City0"}
+
+
+def test_circular_and_unique_modes(tmp_path):
+    path = tmp_path / "orders.jsonl"
+    path.write_text("".join(json.dumps({"orderId": i, "qty": i * 2}) + "\n" for i in range(3)))
+
+    circular = DataFeeder(str(path), columns=["orderId"])
+    assert [circular.next_record()["orderId"] for _ in range(7)] == [0, 1, 2, 0, 1, 2, 0]
+
+    unique = DataFeeder(str(path), mode="unique")
+    assert [record["qty"] for record in unique] == [0, 2, 4]
+    with pytest.raises(FeederExhausted):
+        unique.next_record()
+    with pytest.raises(FeederExhausted):  # an empty partition never spins
+        DataFeeder(str(path), virtual_user=5, virtual_users=10).next_record()
+
+
+def test_bind_fills_placeholders_and_keeps_static_subtrees():
+    template = {"id": "{{id}}", "label": "user-{{id}} in {{city}}", "owner": "{{POST /pet}}",
+                "static": {"tags": ["a"]}}
+    bound = bind(template, {"id": 7, "city": "Oslo"})
+    assert bound == {"id": 7, "label": "user-7 in Oslo", "owner": "{{POST /pet}}", "static": {"tags": ["a"]}}
+    assert bound["static"] is template["static"]
+    assert bind(template["static"], {"id": 1}) is template["static"]
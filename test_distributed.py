@@ -0,0 +1,151 @@
+import asyncio
+import json
+
+import pytest
+
+import distributed
+from distributed import Coordinator, LoadStats, Scenario, read_message, send_message, spawn_local_workers
+from mock_server import MockAPIServer
+
+ENDPOINTS = {
+    "addPet": {"method": "POST", "path": "/pet", "request_body": {"name": "doggie"},
+               "responses": {"200": {"id": 1, "name": "doggie"}}},
+    "getInventory": {"method": "GET", "path": "/store/inventory", "responses": {"200": {"available": 1}}},
+}
+
+
+def test_scenario_split_covers_every_user_once():
+    plans = Scenario("http://target", ENDPOINTS, virtual_users=10, rate=100.0).split(3)
+    assert [(plan["first_user"], plan["virtual_users"]) for plan in plans] == [(0, 4), (4, 3), (7, 3)]
+    assert sum(plan["rate"] for plan in plans) == pytest.approx(100.0)
+    assert Scenario("http://target", ENDPOINTS, virtual_users=1).split(2)[1] == \
+        {"worker": 1, "workers": 2, "first_user": 1, "virtual_users": 0, "rate": None}
+    assert Scenario.from_dict(Scenario("http://t", ENDPOINTS, ["addPet"]).to_dict()).sequence == ["addPet"]
+
+
+def test_coordinator_synchronizes_start_and_merges_live_snapshots():
+    scenario = Scenario("http://target", ENDPOINTS, virtual_users=4)
+    coordinator = Coordinator(scenario, workers=2, host="127.0.0.1", port=0, start_delay=0.05)
+    seen = []
+    coordinator.on_snapshot = lambda run: seen.append(run.requests)
+
+    async def fake_worker(name, latencies_ms):
+        reader, writer = await asyncio.open_connection("127.0.0.1", coordinator.port)
+        await send_message(writer, {"type": "hello", "name": name, "version": 1})
+        plan = await read_message(reader)
+        await send_message(writer, {"type": "ready"})
+        start = await read_message(reader)
+        for latency in latencies_ms:  # one snapshot per request, then the (empty) final delta
+            stats = LoadStats()
+            stats.record("addPet", 200, latency * 1_000_000)
+            await send_message(writer, {"type": "snapshot", **stats.take()})
+        await send_message(writer, {"type": "done", **LoadStats().take()})
+        writer.close()
+        return plan["plan"], start["at"]
+
+    async def main():
+        await coordinator.start()
+        workers = asyncio.gather(fake_worker("a", [10, 20]), fake_worker("b", [30]))
+        summary = await coordinator.run()
+        return summary, await workers
+
+    summary, ((plan_a, start_a), (plan_b, start_b)) = asyncio.run(main())
+    assert start_a == start_b and plan_a["virtual_users"] + plan_b["virtual_users"] == 4
+    assert seen == sorted(seen) and len(seen) == 5 and seen[-1] == 3  # live totals, one update per delta
+    assert summary["requests"] == 3 and summary["per_worker"] == {"a": 2, "b": 1}
+    assert summary["operations"]["addPet"]["count"] == 3 and summary["operations"]["addPet"]["statuses"] == {"200": 3}
+    assert 29 <= summary["operations"]["addPet"]["max"] <= 31
+
+
+def test_local_worker_processes_run_the_scenario():
+    pytest.importorskip("aiohttp")
+    server = MockAPIServer(ENDPOINTS)
+    base_url = server.start_in_thread()
+    scenario = Scenario(base_url, ENDPOINTS, ["addPet", "getInventory"], virtual_users=6, duration=None,
+                        iterations=5)
+
+    async def main():
+        coordinator = await Coordinator(scenario, workers=3, host="127.0.0.1", port=0,
+                                        snapshot_interval=0.05, start_delay=0.2, connect_timeout=30,
+                                        token="local-run").start()
+        processes = spawn_local_workers(3, "127.0.0.1", coordinator.port, "local-run")
+        try:
+            return await coordinator.run()
+        finally:
+            for process in processes:
+                process.wait(timeout=30)
+
+    try:
+        summary = asyncio.run(main())
+    finally:
+        server.stop_thread()
+    assert summary["requests"] == 6 * 5 * 2 and summary["errors"] == 0 and not summary["lost_workers"]
+    assert sorted(summary["per_worker"].values()) == [20, 20, 20]
+    assert summary["operations"]["getInventory"]["statuses"] == {"200": 30}
+    assert len(server.resources["/pet"]) == 30
+
+
+PET_BY_ID = {"method": "GET", "path": "/pet/{petId}", "responses": {"200": {"id": 1, "name": "doggie"}},
+             "parameters": [{"name": "petId", "in": "path", "required": True, "schema": {"type": "integer"}}]}
+
+
+def test_coordinator_fails_fast_on_unfillable_path_parameters(tmp_path, monkeypatch):
+    endpoints = {**ENDPOINTS, "getPetById": PET_BY_ID}
+    scenario = Scenario("http://target", endpoints, ["addPet", "getPetById"])
+    assert scenario.unfillable() == {"getPetById": ["petId"]}
+    with pytest.raises(ValueError, match="petId"):
+        asyncio.run(Coordinator(scenario, workers=1, host="127.0.0.1", port=0).run())
+
+    assert Scenario("http://target", endpoints, params={"getPetById": {"petId": 7}}).unfillable() == {}
+    (tmp_path / "pets.csv").write_text("petId,name\n1,rex\n2,tom\n")
+    assert Scenario("http://target", endpoints, data={"path": str(tmp_path / "pets.csv")}).unfillable() == {}
+
+    spec = {"openapi": "3.0.3", "paths": {"/pet/{petId}": {"get": {
+        "operationId": "getPetById", "parameters": [{"name": "petId", "in": "path", "required": True}]}}}}
+    (tmp_path / "spec.json").write_text(json.dumps(spec))
+    spawned = []
+    monkeypatch.setattr(distributed, "spawn_local_workers", lambda *args: spawned.append(args) or [])
+    with pytest.raises(ValueError, match="petId"):  # used to hang with the local workers waiting for a plan
+        distributed.main(["coordinator", str(tmp_path / "spec.json"), "--base-url", "http://target", "--workers",
+                          "1", "--local", "--port", "0"])
+    assert spawned == []
+
+
+def test_workers_feed_records_and_share_pushed_credentials(tmp_path):
+    pytest.importorskip("aiohttp")
+    from distributed import Worker
+
+    endpoints = {"addPet": {**ENDPOINTS["addPet"], "payload": {"name": "{{name}}"}}, "getPetById": PET_BY_ID}
+    (tmp_path / "pets.jsonl").write_text("".join(f'{{"petId": {i}, "name": "pet{i}"}}\n' for i in range(1, 5)))
+    security = {"schemes": {"key": {"type": "apiKey", "in": "query", "name": "api_key"}}, "security": [{"key": []}]}
+    server = MockAPIServer(endpoints)
+    handle, targets = server.handle, []
+
+    async def protected(method, target, body=b""):
+        targets.append(target)
+        if "api_key=s3cret" not in target:
+            return 401, {"code": 401, "message": "Unauthorized"}
+        return await handle(method, target, body)
+
+    server.handle = protected
+
+    async def main():
+        async with server:
+            scenario = Scenario(server.base_url, endpoints, ["addPet", "getPetById"], virtual_users=2,
+                                duration=None, iterations=2, data={"path": str(tmp_path / "pets.jsonl"),
+                                                                   "mode": "unique"},
+                                security=security, credentials={"key": {"value": "s3cret"}})
+            coordinator = await Coordinator(scenario, workers=1, host="127.0.0.1", port=0, start_delay=0.05,
+                                            token="run-1").start()
+            await Worker("127.0.0.1", coordinator.port, "intruder", token="guess").run()  # refused: no secrets
+            assert coordinator._connections == []
+            worker = asyncio.create_task(Worker("127.0.0.1", coordinator.port, "w", token="run-1").run())
+            summary = await coordinator.run()
+            await worker
+            return summary
+
+    summary = asyncio.run(main())
+    assert summary["operations"]["addPet"]["statuses"] == {"200": 4} and summary["errors"] == 0
+    assert sorted(pet["name"] for pet in server.resources["/pet"].values()) == ["pet1", "pet2", "pet3", "pet4"]
+    assert sorted(target.split("?")[0] for target in targets if "/pet/" in target) == [
+        "/pet/1", "/pet/2", "/pet/3", "/pet/4"]  # each user's own partition, one record per loop
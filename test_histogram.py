@@ -0,0 +1,40 @@
+import random
+
+from histogram import LatencyHistogram
+
+
+def test_buckets_tile_the_value_range():
+    histogram = LatencyHistogram(precision_bits=4)
+    previous_high = -1
+    for index in range(500):
+        low, high = histogram.bucket_bounds(index)
+        assert low == previous_high + 1
+        assert histogram.bucket_index(low) == histogram.bucket_index(high) == index
+        previous_high = high
+
+
+def test_percentiles_are_within_bucket_precision():
+    rng = random.Random(3)
+    values = sorted(int(rng.lognormvariate(15, 1)) for _ in range(20000))
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+
+    for q in (50, 90, 99):
+        exact = values[int(len(values) * q / 100) - 1]
+        assert abs(histogram.percentile(q) - exact) / exact < 2 ** -5
+    assert (histogram.min, histogram.max, histogram.count) == (values[0], values[-1], len(values))
+
+
+def test_merge_and_round_trip():
+    first, second = LatencyHistogram(), LatencyHistogram()
+    for value in range(0, 1000, 3):
+        first.record(value)
+    for value in range(5000, 9000, 7):
+        second.record(value)
+
+    merged = LatencyHistogram.from_dict(first.to_dict()).merge(LatencyHistogram.from_dict(second.to_dict()))
+
+    assert merged.count == first.count + second.count
+    assert (merged.min, merged.max) == (0, max(range(5000, 9000, 7)))
+    assert merged.cumulative([1023, 10 ** 9]) == [first.count, merged.count]
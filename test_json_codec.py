@@ -0,0 +1,34 @@
+import pytest
+
+import json_codec
+
+
+@pytest.mark.parametrize("name", json_codec.available_codecs())
+def test_codecs_round_trip_to_compact_bytes(name):
+    codec = json_codec.get_codec(name)
+    payload = {"id": 1, "name": "rex", "tags": ["a", "ü"], "price": 1.5, "sold": False, "owner": None}
+
+    encoded = codec.dumps(payload)
+
+    assert isinstance(encoded, bytes)
+    assert codec.loads(encoded) == payload
+    assert codec.loads(encoded.decode("utf-8")) == payload
+    assert b", " not in encoded
+
+
+def test_values_the_fast_backend_rejects_fall_back_to_stdlib():
+    codec = json_codec.get_codec()
+
+    assert codec.loads(codec.dumps({"big": 2 ** 70})) == {"big": 2 ** 70}
+
+    def msgspec_like(obj):
+        raise OverflowError("Integer value out of range")
+
+    fast = json_codec.JSONCodec("fast", msgspec_like, json_codec.loads)
+    assert fast.dumps({"big": 2 ** 70}) == b'{"big":1180591620717411303424}'
+
+
+def test_unknown_codec_is_rejected():
+    assert json_codec.available_codecs()[-1] == "json"
+    with pytest.raises(ValueError, match="Unknown JSON codec"):
+        json_codec.get_codec("yaml")
@@ -0,0 +1,51 @@
+import threading
+
+from live_metrics import LiveMetrics
+from request_tracing import RequestTracer
+
+
+def test_request_counters_histograms_and_gauges():
+    metrics = LiveMetrics()
+    started = metrics.request_started("getPet")
+    assert metrics.in_flight.values() == {("getPet",): 1}
+    metrics.request_finished("getPet", 200, started - 2_000_000)  # ~2ms
+    metrics.request_failed("getPet", TimeoutError(), metrics.request_started("getPet"))
+
+    text = metrics.render()
+    assert 'openapi_requests_total{operation="getPet"} 2' in text
+    assert 'openapi_responses_total{operation="getPet",status="200"} 1' in text
+    assert 'openapi_request_errors_total{operation="getPet",error="TimeoutError"} 1' in text
+    assert 'openapi_requests_in_flight{operation="getPet"} 0' in text
+    assert 'openapi_request_duration_seconds_bucket{operation="getPet",le="0.001"} 1' in text
+    assert 'openapi_request_duration_seconds_bucket{operation="getPet",le="0.0025"} 2' in text
+    assert 'openapi_request_duration_seconds_count{operation="getPet"} 2' in text
+
+
+def test_shards_merge_across_threads_and_ratios():
+    metrics = LiveMetrics()
+
+    def work():
+        for i in range(1000):
+            metrics.cache_lookup("request_template", hit=i % 4 != 0)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert metrics.cache_lookups.values() == {("request_template", "hit"): 3000, ("request_template", "miss"): 1000}
+    assert 'openapi_cache_hit_ratio{cache="request_template"} 0.75' in metrics.render()
+
+
+def test_openmetrics_and_tracer_phases():
+    metrics, tracer = LiveMetrics(), RequestTracer()
+    metrics.register_tracer(tracer)
+    tracer.finish('find "pets"', tracer.start())
+    metrics.llm_call("sequence", metrics.llm_call_started())
+
+    text = metrics.render(openmetrics=True)
+    assert "# TYPE openapi_llm_calls counter" in text
+    assert 'openapi_llm_calls_total{kind="sequence",outcome="ok"} 1' in text
+    assert 'openapi_request_phase_seconds_count{operation="find \\"pets\\"",phase="ttfb"} 1' in text
+    assert "phase=\"total\"" not in text and text.endswith("# EOF\n")
@@ -0,0 +1,46 @@
+import asyncio
+
+from mock_server import LatencyModel, MockAPIServer
+
+ENDPOINTS = {
+    "addPet": {"method": "POST", "path": "/pet", "responses": {"200": {"id": 123, "name": "doggie"}}},
+    "getPetById": {"method": "GET", "path": "/pet/{petId}", "responses": {"200": {"id": 123, "name": "doggie"}}},
+    "deletePet": {"method": "DELETE", "path": "/pet/{petId}", "responses": {"200": None}},
+    "getInventory": {"method": "GET", "path": "/store/inventory", "responses": {"200": {"available": 1}}},
+}
+
+
+def test_stateful_crud_round_trip():
+    server = MockAPIServer(ENDPOINTS, seed=1)
+
+    status, created = server.respond("POST", "/pet", {"name": "rex"})
+    assert status == 200 and created == {"name": "rex", "id": 1}
+    assert server.respond("GET", "/pet/1") == (200, created)
+    assert server.respond("DELETE", "/pet/1")[0] == 200
+    assert server.respond("GET", "/pet/1")[0] == 404
+    assert server.respond("GET", "/store/inventory") == (200, {"available": 1})
+    assert server.request_counts["GET /pet/{petId}"] == 2
+
+
+def test_error_injection_is_deterministic_with_seed():
+    statuses = []
+    for _ in range(2):
+        server = MockAPIServer(ENDPOINTS, error_rate=0.5, seed=7)
+        statuses.append([server.respond("GET", "/store/inventory")[0] for _ in range(20)])
+    assert statuses[0] == statuses[1]
+    assert {500, 503} & set(statuses[0]) and 200 in statuses[0]
+
+
+def test_serves_http_with_latency():
+    server = MockAPIServer(ENDPOINTS, latency=LatencyModel("fixed", mean=0.01))
+
+    async def main():
+        async with server:
+            reader, writer = await asyncio.open_connection(server.host, server.port)
+            writer.write(b"GET /store/inventory HTTP/1.1\r\nHost: mock\r\n\r\n")
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            writer.close()
+            return head
+
+    assert asyncio.run(main()).startswith(b"HTTP/1.1 200 OK")
@@ -0,0 +1,50 @@
+import asyncio
+import json
+import time
+
+import profiler
+from profiler import Profiler, span
+
+
+def test_spans_follow_tasks_and_split_overhead(tmp_path):
+    async def virtual_user():
+        with span("request"):
+            time.sleep(0.002)  # framework work
+            with span("network"):
+                await asyncio.sleep(0.02)
+
+    async def run():
+        with span("workflow"):
+            await asyncio.gather(*(virtual_user() for _ in range(5)))
+
+    assert span("idle") is span("idle")  # no-op while profiling is off
+    with Profiler() as run_profiler:
+        asyncio.run(run())
+    assert profiler.active is None
+
+    stats = run_profiler.stats
+    assert stats[("workflow", "request", "network")][0] == 5  # each task kept its own stack
+    summary = run_profiler.summary()
+    assert summary["stages"]["network"]["self_ms"] >= 5 * 20
+    assert summary["stages"]["request"]["self_ms"] >= 5 * 2
+    assert abs(summary["framework_ms"] - (summary["busy_ms"] - summary["target_ms"])) < 0.01
+
+    paths = run_profiler.write(str(tmp_path / "profile"))
+    folded = open(tmp_path / "profile.spans.folded").read().splitlines()
+    assert any(line.startswith("workflow;request;network ") for line in folded)
+    assert json.load(open(paths[-1]))["stages"]["network"]["count"] == 5
+
+
+def test_stack_sampler_tags_stage():
+    def busy():
+        end = time.perf_counter() + 0.1
+        while time.perf_counter() < end:
+            pass
+
+    with Profiler(sample_interval=0.005) as run_profiler:
+        with span("parse"):
+            busy()
+
+    assert sum(run_profiler.samples.values()) > 3
+    assert any(stack.startswith("[parse];") and "busy (test_profiler.py" in stack
+               for stack in run_profiler.folded_samples())
@@ -0,0 +1,63 @@
+import json
+
+from openapi_parser import OpenAPIParser
+from prompt_encoder import PromptEncoder, count_tokens
+
+SPEC = {
+    "openapi": "3.0.3",
+    "paths": {},
+    "components": {"schemas": {
+        "Tag": {"type": "object", "description": "A tag for a pet",
+                "properties": {"id": {"type": "integer", "format": "int64"}, "name": {"type": "string"}}},
+        "Pet": {
+            "type": "object", "required": ["name"], "description": "A pet in the store",
+            "properties": {
+                "id": {"type": "integer", "example": 10},
+                "name": {"type": "string", "example": "doggie", "description": "Name of the pet"},
+                "born": {"type": "string", "format": "date"},
+                "tags": {"type": "array", "items": {"$ref": "#/components/schemas/Tag"}},
+                "favorite": {"$ref": "#/components/schemas/Tag"},
+                "status": {"type": "string", "enum": ["available", "sold"], "nullable": True},
+                "parent": {"$ref": "#/components/schemas/Pet"},
+                "extra": {"type": "object", "additionalProperties": {"type": "number"}},
+            },
+        },
+        "Dog": {"allOf": [{"$ref": "#/components/schemas/Pet"},
+                          {"type": "object", "required": ["bark"], "properties": {"bark": {"type": "boolean"}}}]},
+    }},
+}
+
+
+def test_terse_notation_with_aliases():
+    encoder = PromptEncoder(SPEC)
+    text = encoder.encode({"$ref": "#/components/schemas/Dog"})
+    assert text.splitlines() == [
+        "Tag={id?:int,name?:str}",
+        'Pet={id?:int,name:str,born?:date,tags?:[Tag],favorite?:Tag,status?:"available"|"sold"|null,'
+        "parent?:Pet,extra?:{*:num}}",
+        "Pet&{bark:bool}",
+    ]
+    assert count_tokens(text) * 3 < count_tokens(json.dumps(SPEC["components"]["schemas"], indent=2))
+    assert encoder.encode({"id": 1, "tags": [{"name": "a"}], "price": 2.5, "ok": None}) == \
+        "{id:int,tags:[{name:str}],price:num,ok:null}"
+
+
+def test_resolved_schemas_and_budget():
+    parser = OpenAPIParser("<memory>")
+    parser.load_openapi_dict(SPEC)
+    encoder = PromptEncoder.from_parser(parser)
+    text = encoder.encode(parser.get_schema("Pet"))
+    assert text.startswith("Tag=") and "parent?:Pet" in text
+
+    small = encoder.fit(parser.get_schema("Pet"), budget=36)
+    assert count_tokens(small) <= 36 and "name:str,born?:date,tags?:[…]" in small  # containers collapse, leaves stay
+    assert count_tokens(encoder.fit(parser.get_schema("Pet"), budget=10)) <= 10
+
+
+def test_chunks_fit_budget_and_keep_resources_together():
+    names = [f"{method} /resource{i}{suffix}" for i in range(60)
+             for method, suffix in (("POST", ""), ("GET", "/{id}"), ("DELETE", "/{id}"))]
+    chunks = PromptEncoder(token_budget=100).chunk(names)
+    assert len(chunks) > 1 and all(count_tokens(chunk) <= 100 for chunk in chunks)
+    assert [line for chunk in chunks for line in chunk.splitlines()] == names
+    assert all(chunk.splitlines()[0].startswith("POST") for chunk in chunks)
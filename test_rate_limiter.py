@@ -0,0 +1,67 @@
+import asyncio
+
+from rate_limiter import RateLimiter, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_allows_burst_then_spaces_requests():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, burst=2, clock=clock)
+
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert abs(bucket.reserve() - 0.1) < 1e-9
+    assert abs(bucket.reserve() - 0.2) < 1e-9
+
+    clock.now = 1.0
+    assert bucket.reserve() == 0
+
+
+def test_limiter_keys_by_scope():
+    by_host = RateLimiter(rate=5, scope="host")
+    by_operation = RateLimiter(rate=5, scope="operation")
+    url = "https://petstore.swagger.io/v2/pet/1"
+
+    assert by_host.key_for(url, "GET /pet/{petId}") == "petstore.swagger.io"
+    assert by_operation.key_for(url, "GET /pet/{petId}") == "GET /pet/{petId}"
+    assert RateLimiter(rate=5).key_for(url, "GET /pet/{petId}") == "*"
+
+
+def test_adaptive_backs_off_once_per_cooldown_and_recovers():
+    clock = FakeClock()
+    limiter = RateLimiter(rate=100, scope="operation", adaptive=True, cooldown=1.0, clock=clock)
+
+    limiter.observe(api_name="GET /pet", status=429)
+    limiter.observe(api_name="GET /pet", status=429)
+    assert limiter.current_rate(api_name="GET /pet") == 50
+    assert limiter.throttled["GET /pet"] == 2
+
+    for _ in range(10_000):
+        limiter.observe(api_name="GET /pet", status=200)
+    assert limiter.current_rate(api_name="GET /pet") == 100
+
+
+def test_concurrency_cap_is_respected():
+    limiter = RateLimiter(rate=1000, burst=1000, max_concurrency=2)
+    in_flight = []
+    peak = []
+
+    async def call():
+        async with limiter.limit():
+            in_flight.append(1)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.001)
+            in_flight.pop()
+
+    async def main():
+        await asyncio.gather(*[call() for _ in range(10)])
+
+    asyncio.run(main())
+    assert max(peak) == 2
@@ -0,0 +1,44 @@
+import pytest
+
+from request_template import RequestTemplate, compile_templates
+
+ENDPOINT = {
+    "method": "GET",
+    "path": "/store/{storeId}/pet/{petId}",
+    "parameters": [
+        {"name": "storeId", "in": "path", "required": True, "schema": {"type": "integer", "example": 7}},
+        {"name": "petId", "in": "path", "required": True, "schema": {"type": "string"}},
+        {"name": "status", "in": "query", "schema": {"type": "array"}},
+        {"name": "limit", "in": "query", "required": True, "schema": {"type": "integer", "default": 20}},
+        {"name": "X-Trace-Id", "in": "header", "schema": {"type": "string"}},
+    ],
+}
+
+
+def test_render_fills_path_query_and_header_slots():
+    template = RequestTemplate.from_endpoint("getPet", ENDPOINT, "http://api", {"Authorization": "Bearer t"})
+
+    request = template.render({"petId": "a b/c", "status": ["sold", "new"], "X-Trace-Id": 42})
+
+    assert request.method == "GET"
+    assert request.url == "http://api/store/7/pet/a%20b%2Fc?status=sold&status=new&limit=20"
+    assert request.headers == {"Authorization": "Bearer t", "X-Trace-Id": "42"}
+    assert request.body is None
+    assert template.render({"petId": 1}).headers is template.headers
+
+
+def test_missing_path_parameter_is_reported():
+    template = RequestTemplate.from_endpoint("getPet", ENDPOINT)
+
+    with pytest.raises(KeyError, match="petId"):
+        template.render()
+
+
+def test_api_names_without_endpoint_details():
+    templates = compile_templates({"POST /pet": {"request_body": {"name": "rex"}}, "GET /pet/{id}": {}}, "http://api")
+
+    request = templates["POST /pet"].render()
+    assert request == ("POST", "http://api/pet", {"Content-Type": "application/json"}, b'{"name":"rex"}')
+    assert templates["POST /pet"].render().body is request.body  # encoded once
+    assert templates["POST /pet"].render(payload={"name": "max"}).body == b'{"name":"max"}'
+    assert templates["GET /pet/{id}"].render({"id": 5}).url == "http://api/pet/5"
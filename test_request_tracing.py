@@ -0,0 +1,38 @@
+import asyncio
+from types import SimpleNamespace
+
+from request_tracing import PHASES, RequestTimings, RequestTracer, _on_request_start, _stamp
+
+
+def test_hooks_fill_phases_and_histograms():
+    tracer = RequestTracer()
+    timings = tracer.start()
+    context = SimpleNamespace(trace_request_ctx=timings)
+
+    async def run_hooks():
+        await _on_request_start(None, context, SimpleNamespace(url=SimpleNamespace(scheme="https")))
+        for attribute in ("dns_start", "dns_end", "connect_start", "connect_end", "sent"):
+            await _stamp(attribute)(None, context, None)
+            await asyncio.sleep(0.001)
+        await _stamp("response_start")(None, context, None)
+        await _stamp("sent")(None, SimpleNamespace(trace_request_ctx=None), None)  # untraced requests are ignored
+
+    asyncio.run(run_hooks())
+    breakdown = tracer.finish("getPet", timings)
+
+    assert timings.tls is True
+    assert breakdown["dns_ms"] >= 0.9 and breakdown["connect_ms"] >= 0.9 and breakdown["ttfb_ms"] >= 0.9
+    assert breakdown["total_ms"] >= breakdown["dns_ms"] + breakdown["connect_ms"] + breakdown["ttfb_ms"]
+    assert set(tracer.summary()) == {"getPet", "*"}
+    assert set(tracer.summary()["getPet"]) == set(PHASES)
+
+
+def test_reused_connection_has_no_setup_phases():
+    timings = RequestTimings()
+    timings.response_start = timings.start + 2_000_000
+    timings.end = timings.start + 3_000_000
+
+    phases = timings.phases()
+
+    assert phases["dns"] == phases["connect"] == phases["queued"] == 0
+    assert (phases["ttfb"], phases["transfer"], phases["total"]) == (2_000_000, 1_000_000, 3_000_000)
@@ -0,0 +1,97 @@
+import pytest
+
+from openapi_parser import OpenAPIParser
+from response_validator import ResponseValidator, SchemaCompiler, ValidationError
+
+NODE = {"type": "object", "required": ["id"], "additionalProperties": False, "properties": {
+    "id": {"type": "integer", "minimum": 1},
+    "name": {"type": "string", "pattern": "^[a-z]+$", "nullable": True},
+    "status": {"enum": ["available", "sold"]},
+}}
+NODE["properties"]["children"] = {"type": "array", "maxItems": 2, "items": NODE}
+
+SPEC = {
+    "paths": {"/pets/{id}": {"get": {"operationId": "getPet", "responses": {
+        "200": {"description": "ok", "content": {"application/json": {"schema": {"$ref": "#/components/schemas/Pet"}}}},
+        "4XX": {"description": "client error", "content": {"application/json": {
+            "schema": {"type": "object", "required": ["code"], "properties": {"code": {"type": "integer"}}}}}},
+        "204": {"description": "no content"},
+    }}}},
+    "components": {"schemas": {"Pet": {"type": "object", "required": ["id"], "properties": {
+        "id": {"type": "integer"}, "parent": {"$ref": "#/components/schemas/Pet"}}}}},
+}
+
+
+@pytest.mark.parametrize("data, error", [
+    ({"id": 1, "name": None, "children": [{"id": 2, "status": "sold"}]}, None),
+    ({"id": 1.0}, None),
+    ([], "<root>: expected object"),
+    ({"name": "rex"}, "<root>: missing required properties ['id']"),
+    ({"id": True}, "id: expected integer"),
+    ({"id": 0}, "id: must not be < 1"),
+    ({"id": 1, "name": "Rex"}, "name: does not match '^[a-z]+$'"),
+    ({"id": 1, "children": [{"id": 2}, {"id": 3, "status": "lost"}]}, "children/1/status: not one of"),
+    ({"id": 1, "children": [{"id": 2}] * 3}, "children: more than 2 items"),
+    ({"id": 1, "extra": 1}, "<root>: unexpected properties ['extra']"),
+])
+def test_compiled_validator(data, error):
+    validate = SchemaCompiler().compile(NODE)
+
+    if error is None:
+        validate(data)
+    else:
+        with pytest.raises(ValidationError) as e:
+            validate(data)
+        assert str(e.value).startswith(error)
+
+
+def test_responses_are_matched_by_status_and_tallied():
+    parser = OpenAPIParser("<memory>")
+    parser.load_openapi_dict(SPEC)
+    validator = ResponseValidator(parser)
+
+    assert validator.validate("getPet", 200, b'{"id": 1, "parent": {"id": 2, "parent": {"id": 3}}}') == []
+    assert validator.validate("GET /pets/{id}", 200, '{"parent": {"id": "x"}}') == [
+        "<root>: missing required properties ['id']"]
+    assert validator.validate("getPet", 404, {"code": "missing"}) == ["code: expected integer"]
+    assert validator.validate("getPet", 204, b"") is None
+    assert validator.validate("getPet", 200, b"<html>")[0].startswith("<root>: invalid JSON")
+    assert validator.validator_for("getPet", 200) is validator.validator_for("getPet", 200)
+    assert validator.report()["getPet"]["checked"] == 3
+    assert validator.report()["getPet"]["violations"] == 2
+
+
+def test_sampling_skips_most_responses():
+    parser = OpenAPIParser("<memory>")
+    parser.load_openapi_dict(SPEC)
+    validator = ResponseValidator(parser, sample_rate=0.1, seed=7)
+
+    for _ in range(1000):
+        validator.validate("getPet", 200, {"id": 1})
+
+    assert 50 < validator.stats["getPet"]["checked"] < 150
+    assert validator.stats["getPet"]["checked"] + validator.stats["getPet"]["skipped"] == 1000
+
+
+def test_reload_drops_stale_validators_and_sees_new_operations():
+    import copy
+
+    from spec_reload import SpecReloader
+
+    parser = OpenAPIParser("<memory>")
+    parser.load_openapi_dict(copy.deepcopy(SPEC))
+    reloader = SpecReloader(parser)
+    validator = ResponseValidator(parser)
+    assert validator.validate("getPet", 200, {"id": 1}) == []
+
+    edited = copy.deepcopy(SPEC)
+    edited["components"]["schemas"]["Pet"]["properties"]["id"] = {"type": "string"}
+    edited["paths"]["/owners/{id}"] = {"get": {"operationId": "getOwner", "responses": {"200": {
+        "description": "ok", "content": {"application/json": {"schema": {"type": "object", "required": ["name"]}}}}}}}
+    diff = reloader.reload(edited)
+    assert diff.changed == ["getPet"] and diff.added == ["getOwner"]
+    validator.reload(diff)
+
+    assert validator.validate("getPet", 200, {"id": 1}) == ["id: expected string"]  # used to pass: stale schema
+    assert validator.validate("GET /pets/{id}", 200, {"id": "a"}) == []
+    assert validator.validate("getOwner", 200, {}) == ["<root>: missing required properties ['name']"]
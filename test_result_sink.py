@@ -0,0 +1,38 @@
+import csv
+
+import pytest
+
+from result_sink import COLUMN_NAMES, ResultSink
+
+
+def test_csv_sink_streams_bounded_batches(tmp_path):
+    path = tmp_path / "run.csv"
+    with ResultSink(str(path), batch_size=4) as sink:
+        for i in range(10):
+            sink.write({"api": "GET /pet/{petId}", "status": 200, "bytes_received": 42,
+                        "timings": {"ttfb_ms": 1.5, "total_ms": 2.0}}, virtual_user=i % 3)
+            assert len(sink._columns["operation"]) < 4  # never more than one batch buffered
+        sink.record("POST /pet", error="TimeoutError")
+
+    with open(path, newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert sink.rows == 11 and sink.batches == 3
+    assert tuple(rows[0]) == COLUMN_NAMES
+    assert rows[0]["operation"] == "GET /pet/{petId}" and rows[0]["ttfb_ms"] == "1.5" and rows[2]["virtual_user"] == "2"
+    assert rows[-1]["status"] == "0" and rows[-1]["error"] == "TimeoutError"
+
+
+def test_format_from_extension(tmp_path):
+    assert ResultSink(str(tmp_path / "run.feather")).format == "arrow"
+    with pytest.raises(ValueError):
+        ResultSink(str(tmp_path / "run.json"))
+
+
+def test_parquet_sink(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "run.parquet"
+    with ResultSink(str(path), batch_size=3) as sink:
+        for i in range(7):
+            sink.record("GET /store", 200, virtual_user=i)
+    table = pq.read_table(path)
+    assert table.num_rows == 7 and table.column("virtual_user").to_pylist() == list(range(7))
@@ -0,0 +1,55 @@
+import random
+
+from histogram import LatencyHistogram
+from result_sink import ResultSink
+from run_compare import RunStore, RunSummary, compare, main, mann_whitney
+
+
+def _histogram(values):
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+    return histogram
+
+
+def test_mann_whitney_detects_shift_only():
+    rng = random.Random(7)
+    baseline = _histogram(rng.lognormvariate(16, 0.3) for _ in range(2000))
+    same = _histogram(rng.lognormvariate(16, 0.3) for _ in range(2000))
+    slower = _histogram(rng.lognormvariate(16.2, 0.3) for _ in range(2000))
+
+    assert mann_whitney(baseline, same)["p_value"] > 0.01
+    shifted = mann_whitney(baseline, slower)
+    assert shifted["p_greater"] < 1e-6 and shifted["effect"] > 0.6
+    assert mann_whitney(slower, baseline)["p_greater"] > 0.99
+
+
+def test_compare_flags_latency_and_error_regressions():
+    rng = random.Random(3)
+    baseline, candidate = RunSummary("base", 10.0), RunSummary("cand", 10.0)
+    for i in range(500):
+        baseline.add("GET /pet", 200, int(rng.gauss(20e6, 2e6)))
+        candidate.add("GET /pet", 200, int(rng.gauss(26e6, 2e6)))
+        baseline.add("POST /pet", 200, int(rng.gauss(20e6, 2e6)))
+        candidate.add("POST /pet", 500 if i % 10 == 0 else 201, int(rng.gauss(20e6, 2e6)))
+        candidate.add("GET /store", 200, 1_000_000)
+
+    rows, regressions = compare(baseline, candidate)
+    assert regressions == ["GET /pet", "POST /pet"]
+    by_name = {row["endpoint"]: row for row in rows}
+    assert any(reason.startswith("p50") for reason in by_name["GET /pet"]["regressions"])
+    assert by_name["POST /pet"]["regressions"] == ["errors 0.00% -> 10.00%"]
+
+
+def test_cli_saves_and_gates(tmp_path):
+    store = str(tmp_path / "runs")
+    for run_id, latency in (("base", 10.0), ("cand", 15.0)):
+        with ResultSink(str(tmp_path / f"{run_id}.csv")) as sink:
+            for i in range(100):
+                sink.record("GET /pet", 200, timestamp=1000 + i / 10, phases={"total_ms": latency + i % 3})
+        assert main(["--store", store, "save", str(tmp_path / f"{run_id}.csv")]) == 0
+
+    assert RunStore(store).runs() == ["base", "cand"]
+    assert RunStore(store).load("base").endpoints["GET /pet"]["requests"] == 100
+    assert main(["--store", store, "compare", "base", "cand"]) == 1
+    assert main(["--store", store, "compare", "base", "base"]) == 0
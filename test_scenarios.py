@@ -0,0 +1,110 @@
+import asyncio
+import random
+
+import pytest
+
+from distributed import Coordinator, Scenario, Worker
+from mock_server import MockAPIServer
+from scenarios import END, AliasTable, MarkovSession, MixReport, TrafficMix, build_mix
+
+ENDPOINTS = {
+    "addPet": {"method": "POST", "path": "/pet", "responses": {"200": {"id": 1, "name": "doggie"}}},
+    "getPetById": {"method": "GET", "path": "/pet/{petId}", "responses": {"200": {"id": 1, "name": "doggie"}}},
+    "placeOrder": {"method": "POST", "path": "/store/order", "responses": {"200": {"id": 1}}},
+}
+
+
+def test_alias_table_samples_in_proportion_to_weights():
+    weights = {"getPetById": 80, "addPet": 15, "placeOrder": 5, "deletePet": 0}
+    table = AliasTable(weights)
+    rng = random.Random(7)
+    draws = 200_000
+    counts = {}
+    for _ in range(draws):
+        name = table.sample(rng)
+        counts[name] = counts.get(name, 0) + 1
+    assert "deletePet" not in counts and len(table) == 3
+    for name in ("getPetById", "addPet", "placeOrder"):
+        assert counts[name] / draws == pytest.approx(weights[name] / 100, abs=0.005)
+    assert AliasTable({"only": 3}).sample(rng) == "only"
+    with pytest.raises(ValueError):
+        AliasTable({"a": 0})
+    with pytest.raises(ValueError):
+        AliasTable({"a": 1, "b": -1})
+
+
+def test_markov_sessions_and_sub_workflows_have_exact_targets():
+    # browse: getPetById, then 50% another read, 25% buy, 25% leave -> 2 reads and 0.5 orders per session
+    browse = MarkovSession({"getPetById": {"getPetById": 2, "placeOrder": 1, END: 1}, "placeOrder": {END: 1}},
+                           start="getPetById", max_steps=1000)
+    assert browse.expected_visits() == pytest.approx({"getPetById": 2.0, "placeOrder": 0.5})
+    rng = random.Random(1)
+    sessions = [browse.walk(rng) for _ in range(20_000)]
+    assert all(session[0] == "getPetById" and END not in session for session in sessions)
+    assert sum(len(session) for session in sessions) / len(sessions) == pytest.approx(2.5, rel=0.03)
+    assert len(MarkovSession({"a": {"a": 1}}, "a", max_steps=5).walk()) == 5
+
+    mix = TrafficMix({"getPetById": 6, "browse": 2, "adopt": 2},
+                     flows={"browse": browse.to_dict(), "adopt": ["addPet", "placeOrder"]})
+    # per 10 picks: 6 + 2*2 reads, 2*0.5 + 2 orders, 2 adds -> 15 requests
+    assert mix.target() == pytest.approx({"getPetById": 10 / 15, "placeOrder": 3 / 15, "addPet": 2 / 15})
+    assert mix.operations() == {"getPetById", "placeOrder", "addPet"}
+    assert build_mix(mix.to_dict()).target() == pytest.approx(mix.target())
+    assert isinstance(build_mix(browse.to_dict()), MarkovSession)
+
+    report = MixReport({"getPetById": 0.8, "addPet": 0.2}).update({"getPetById": 790, "addPet": 200})
+    report.record("deletePet", 10)
+    summary = report.summary()
+    assert summary["requests"] == 1000 and summary["operations"]["getPetById"]["count"] == 790
+    assert summary["operations"]["getPetById"]["delta_pct"] == -1.0
+    assert summary["operations"]["deletePet"]["target_pct"] == 0.0 and summary["max_delta_pct"] == 1.0
+    assert summary["total_variation"] == pytest.approx(0.01)
+
+
+def test_distributed_run_follows_the_traffic_mix():
+    pytest.importorskip("aiohttp")
+    mix = {"weights": {"getPetById": 8, "adopt": 2}, "flows": {"adopt": ["addPet", "placeOrder"]}}
+    server = MockAPIServer(ENDPOINTS)
+
+    async def main():
+        async with server:
+            scenario = Scenario(server.base_url, ENDPOINTS, virtual_users=4, duration=None, iterations=250,
+                                params={"getPetById": {"petId": 1}}, mix=mix)
+            assert Scenario.from_dict(scenario.to_dict()).operations() == set(ENDPOINTS)
+            coordinator = await Coordinator(scenario, workers=1, host="127.0.0.1", port=0, start_delay=0.05).start()
+            worker = asyncio.create_task(Worker("127.0.0.1", coordinator.port, "w").run())
+            summary = await coordinator.run()
+            await worker
+            return summary
+
+    summary = asyncio.run(main())
+    report = summary["mix"]
+    counts = {name: row["count"] for name, row in report["operations"].items()}
+    assert counts["addPet"] == counts["placeOrder"] and sum(counts.values()) == summary["requests"]
+    assert summary["requests"] == 1000 + counts["addPet"]  # 4 users x 250 sessions, adopt sends two
+    assert report["operations"]["getPetById"]["target_pct"] == 66.667
+    assert report["total_variation"] < 0.05
+
+
+def test_mix_rejects_unknown_operations_and_empty_flows_still_yield():
+    with pytest.raises(ValueError, match="getPet"):
+        build_mix({"weights": {"getPet": 1, "addPet": 1}}, ENDPOINTS)
+    with pytest.raises(ValueError, match="getPet"):
+        asyncio.run(Coordinator(Scenario("http://target", ENDPOINTS, mix={"weights": {"getPet": 1}}), workers=1,
+                                host="127.0.0.1", port=0).run())
+    idle = {"weights": {"leave": 1}, "flows": {"leave": {"transitions": {}, "start": {END: 1}}}}
+    assert build_mix(idle, ENDPOINTS).next_flow() == []
+
+    pytest.importorskip("aiohttp")
+
+    async def main():
+        scenario = Scenario("http://127.0.0.1:9", ENDPOINTS, virtual_users=2, duration=0.2, mix=idle)
+        coordinator = await Coordinator(scenario, workers=1, host="127.0.0.1", port=0, snapshot_interval=0.05,
+                                        start_delay=0.05).start()
+        worker = asyncio.create_task(Worker("127.0.0.1", coordinator.port, "w").run())
+        summary = await asyncio.wait_for(coordinator.run(), 10)  # used to spin forever on empty flows
+        await worker
+        return summary
+
+    summary = asyncio.run(main())
+    assert summary["requests"] == 0 and not summary["lost_workers"]
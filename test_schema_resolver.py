@@ -0,0 +1,111 @@
+import yaml
+
+from openapi_parser import OpenAPIParser
+from schema_resolver import SchemaResolver
+
+SPEC = {
+    "paths": {
+        "/pets/{id}": {
+            "parameters": [{"$ref": "#/components/parameters/Id"}],
+            "put": {
+                "requestBody": {"$ref": "#/components/requestBodies/PetBody"},
+                "responses": {
+                    "200": {"$ref": "#/components/responses/PetOk"},
+                    "default": {"description": "error", "content": {"application/json": {
+                        "schema": {"$ref": "common.yaml#/components/schemas/Error"}}}},
+                },
+            },
+        }
+    },
+    "components": {
+        "parameters": {"Id": {"name": "id", "in": "path", "schema": {"type": "integer"}}},
+        "requestBodies": {"PetBody": {"content": {"application/json": {"schema": {"$ref": "#/components/schemas/Dog"}}}}},
+        "responses": {"PetOk": {"description": "ok", "content": {"application/json": {
+            "schema": {"$ref": "#/components/schemas/Pet"}}}}},
+        "schemas": {
+            "Base": {"type": "object", "required": ["id"], "properties": {
+                "id": {"type": "integer"},
+                "meta": {"type": "object", "properties": {"created": {"type": "string"}}}}},
+            "Dog": {"allOf": [
+                {"$ref": "#/components/schemas/Base"},
+                {"type": "object", "required": ["bark"], "properties": {
+                    "bark": {"type": "boolean"},
+                    "meta": {"type": "object", "properties": {"vet": {"type": "string"}}},
+                    "parent": {"$ref": "#/components/schemas/Dog"}}},
+            ]},
+            "Cat": {"type": "object", "properties": {"meow": {"type": "string", "example": "purr"}}},
+            "Pet": {"oneOf": [{"$ref": "#/components/schemas/Dog"}, {"$ref": "#/components/schemas/Cat"}]},
+        },
+    },
+}
+
+COMMON = {"components": {"schemas": {"Error": {"type": "object", "properties": {"code": {"type": "integer"}}}}}}
+
+
+def make_parser(tmp_path):
+    (tmp_path / "common.yaml").write_text(yaml.safe_dump(COMMON))
+    spec_file = tmp_path / "api.yaml"
+    spec_file.write_text(yaml.safe_dump(SPEC))
+    return OpenAPIParser(str(spec_file))
+
+
+def test_all_of_is_deep_merged(tmp_path):
+    dog = make_parser(tmp_path).get_schema("Dog")
+
+    assert dog["required"] == ["id", "bark"]
+    assert set(dog["properties"]["meta"]["properties"]) == {"created", "vet"}
+
+
+def test_components_are_shared_and_cycles_close(tmp_path):
+    parser = make_parser(tmp_path)
+    dog = parser.get_schema("Dog")
+
+    assert dog["properties"]["parent"] is dog
+    assert parser.get_schema("Pet")["oneOf"][0] is dog
+    assert parser.resolve_schema("Dog") == {"id": 123, "meta": {"created": "sample_string", "vet": "sample_string"},
+                                            "bark": True}
+
+
+def test_one_of_variants_are_selectable(tmp_path):
+    parser = make_parser(tmp_path)
+
+    assert len(parser.get_schema_variants("Pet")) == 2
+    assert parser.resolve_schema("Pet", variant=1) == {"meow": "purr"}
+
+
+def test_parameter_request_body_response_and_file_refs(tmp_path):
+    endpoint = make_parser(tmp_path).get_all_endpoints()["PUT /pets/{id}"]
+
+    assert endpoint["parameters"] == [{"name": "id", "in": "path", "schema": {"type": "integer"}}]
+    assert endpoint["request_body"]["bark"] is True
+    assert endpoint["responses"]["default"] == {"code": 123}
+
+
+def test_unchanged_subtrees_are_not_copied():
+    node = {"type": "object", "properties": {"name": {"type": "string"}}}
+    assert SchemaResolver({"components": {"schemas": {"Plain": node}}}).resolve_ref("#/components/schemas/Plain") is node
+
+
+def _parser_for(schemas):
+    parser = OpenAPIParser("<memory>")
+    parser.load_openapi_dict({"components": {"schemas": schemas}})
+    return parser
+
+
+def test_examples_do_not_depend_on_build_order():
+    chain = {f"S{i}": {"type": "object", "properties": {"id": {"type": "integer"},
+                                                        "next": {"$ref": f"#/components/schemas/S{i + 1}"}}}
+             for i in range(12)}
+    chain["S12"] = {"type": "object", "properties": {"id": {"type": "integer"}}}
+    fresh = {name: _parser_for(chain).resolve_schema(name) for name in ("S0", "S10")}
+    parser = _parser_for(chain)
+    built = [parser.resolve_schema(name) for name in ("S0", "S10", "S0")]
+    assert built == [fresh["S0"], fresh["S10"], fresh["S0"]]
+    assert parser.resolve_schema("S10")["next"]["next"] == {"id": 123}  # not the cut-off copy from S0
+
+    cycle = {name: {"type": "object", "properties": {"id": {"type": "integer"},
+                                                     other.lower(): {"$ref": f"#/components/schemas/{other}"}}}
+             for name, other in (("A", "B"), ("B", "A"))}
+    parser = _parser_for(cycle)
+    assert parser.resolve_schema("A") == {"id": 123, "b": {"id": 123}}
+    assert parser.resolve_schema("B") == _parser_for(cycle).resolve_schema("B") == {"id": 123, "a": {"id": 123}}
@@ -0,0 +1,101 @@
+from sequence_planner import SequencePlanner, plan_sequence
+
+PETSTORE = {
+    "DELETE /pet/{petId}": {"method": "DELETE", "path": "/pet/{petId}"},
+    "POST /pet/{petId}/uploadImage": {"method": "POST", "path": "/pet/{petId}/uploadImage"},
+    "GET /pet/findByStatus": {"method": "GET", "path": "/pet/findByStatus",
+                              "parameters": [{"name": "status", "in": "query", "required": True}]},
+    "PUT /pet": {"method": "PUT", "path": "/pet"},
+    "GET /pet/{petId}": {"method": "GET", "path": "/pet/{petId}"},
+    "POST /pet": {"method": "POST", "path": "/pet", "responses": {"200": {"id": 1, "status": "available"}}},
+    "GET /store/order/{orderId}": {"method": "GET", "path": "/store/order/{orderId}"},
+    "POST /store/order": {"method": "POST", "path": "/store/order", "responses": {"200": {"id": 1}}},
+    "DELETE /store/order/{orderId}": {"method": "DELETE", "path": "/store/order/{orderId}"},
+    "GET /user/{username}": {"method": "GET", "path": "/user/{username}"},
+    "GET /thing/{thingId}": {"method": "GET", "path": "/thing/{thingId}"},
+}
+
+
+def _before(order, first, second):
+    return order.index(first) < order.index(second)
+
+
+def test_crud_dependencies_keep_every_operation():
+    plan = SequencePlanner().plan(PETSTORE)
+    order = plan.order
+
+    assert sorted(order) == sorted(PETSTORE)
+    assert _before(order, "POST /pet", "GET /pet/{petId}")
+    assert _before(order, "POST /pet", "POST /pet/{petId}/uploadImage")
+    assert _before(order, "POST /pet/{petId}/uploadImage", "DELETE /pet/{petId}")
+    assert _before(order, "GET /pet/{petId}", "DELETE /pet/{petId}")
+    assert _before(order, "POST /store/order", "GET /store/order/{orderId}")
+    assert ("POST /pet", "GET /pet/findByStatus") in plan.edges  # `status` is returned by the create
+    assert plan.ambiguous == ["GET /user/{username}", "GET /thing/{thingId}"]
+
+
+def test_response_field_producers_and_cycles():
+    endpoints = {
+        "GET /owners/{ownerId}": {"method": "GET", "path": "/owners/{ownerId}"},
+        "POST /register": {"method": "POST", "path": "/register", "responses": {"201": {"ownerId": 7}}},
+        "PUT /a": {"method": "PUT", "path": "/a", "parameters": [{"name": "b", "in": "query", "required": True}],
+                   "responses": {"200": {"a": 1}}},
+        "PUT /b": {"method": "PUT", "path": "/b", "parameters": [{"name": "a", "in": "query", "required": True}],
+                   "responses": {"200": {"b": 1}}},
+    }
+    plan = SequencePlanner().plan(endpoints)
+    assert ("POST /register", "GET /owners/{ownerId}") in plan.edges
+    assert sorted(plan.order) == sorted(endpoints)  # the a <-> b cycle is broken, nothing dropped
+
+
+def test_refine_orders_only_ambiguous_operations():
+    asked = {}
+
+    def refine(subset):
+        asked.update(subset)
+        return ["GET /thing/{thingId}", "GET /user/{username}", "NOT /an/operation"]
+
+    order = plan_sequence(PETSTORE, refine)
+    assert set(asked) == {"GET /user/{username}", "GET /thing/{thingId}"}
+    assert _before(order, "GET /thing/{thingId}", "GET /user/{username}")
+
+    def broken(subset):
+        raise TimeoutError("LLM unavailable")
+
+    assert plan_sequence(PETSTORE, broken) == SequencePlanner().plan(PETSTORE).order
+
+
+def test_planned_operation_ids_route_to_method_and_path():
+    import asyncio
+
+    from openapi_parser import OpenAPIParser
+    from sequence_planner import operation_route, operation_runner
+
+    pet = {"type": "object", "properties": {"id": {"type": "integer"}, "name": {"type": "string"}}}
+    pet_id = [{"name": "petId", "in": "path", "required": True, "schema": {"type": "integer"}}]
+    parser = OpenAPIParser("<memory>")
+    parser.load_openapi_dict({"paths": {
+        "/pet": {"post": {"operationId": "addPet", "requestBody": {"content": {"application/json": {"schema": pet}}},
+                          "responses": {"200": {"content": {"application/json": {"schema": pet}}}}}},
+        "/pet/{petId}": {"get": {"operationId": "getPetById", "parameters": pet_id},
+                         "delete": {"operationId": "deletePet", "parameters": pet_id}},
+    }})
+    api_map = parser.extract_api_endpoints()
+    sequence = plan_sequence(api_map)
+    assert sorted(sequence) == ["addPet", "deletePet", "getPetById"]
+
+    calls = []
+
+    async def execute_api(method, endpoint, payload=None, is_first_run=True, executor=None):  # APIWorkflow's
+        calls.append(f"{method} {endpoint}")
+        return {"status_code": 200, "executor": executor}
+
+    execute = operation_runner(api_map, execute_api, executor="session")  # what main.websocket_endpoint runs
+
+    async def run():
+        return [await execute(api) for api in sequence]
+
+    assert asyncio.run(run()) == [{"status_code": 200, "executor": "session"}] * 3
+    assert calls == [f"{api_map[name]['method'].upper()} {api_map[name]['path']}" for name in sequence]
+    assert calls[0] == "POST /pet" and calls[-1] == "DELETE /pet/{petId}"
+    assert operation_route(api_map, "PUT /pet") == ("PUT", "/pet")  # LLM-suggested names still work
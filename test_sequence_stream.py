@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from sequence_stream import IncrementalArrayParser, dependency_map, run_pipelined
+
+
+def test_parser_emits_items_as_they_complete():
+    reply = '```json\n{"note": [1], "execution_order": ["POST /pet", "GET /pet/{petId}",\n "DELETE /pet/\\"x\\"", 12]}\n```'
+    parser = IncrementalArrayParser("execution_order")
+    emitted = []
+    for character in reply:  # worst case: one character per chunk
+        emitted.append(parser.feed(character))
+    items = [item for chunk in emitted for item in chunk]
+
+    assert items == ["POST /pet", "GET /pet/{petId}", 'DELETE /pet/"x"', 12]
+    first = next(index for index, chunk in enumerate(emitted) if chunk)
+    assert first < reply.index("GET")  # the first item is out before the second is generated
+    assert parser.finished and parser.feed('"late"]') == []
+
+
+def test_pipelined_execution_waits_for_dependencies():
+    arrivals = {}
+
+    async def stream():
+        for name in ["PUT /orphan", "GET /pet/{petId}", "POST /store", "POST /pet", "DELETE /pet/{petId}"]:
+            await asyncio.sleep(0.01)  # tokens still arriving
+            arrivals[name] = asyncio.get_running_loop().time()
+            yield name
+
+    started = {}
+
+    async def execute(name):
+        started[name] = asyncio.get_running_loop().time()
+        await asyncio.sleep(0.001)
+        return {"status_code": 200}
+
+    depends_on = dependency_map([("POST /pet", "GET /pet/{petId}"), ("POST /pet", "DELETE /pet/{petId}"),
+                                 ("GET /pet/{petId}", "DELETE /pet/{petId}"), ("GET /missing", "PUT /orphan")])
+    results = asyncio.run(run_pipelined(stream(), execute, depends_on))
+
+    assert [name for name, _ in results][:3] == ["POST /store", "POST /pet", "GET /pet/{petId}"]
+    assert started["POST /store"] < arrivals["POST /pet"]  # execution overlaps generation
+    assert started["DELETE /pet/{petId}"] > started["GET /pet/{petId}"]
+    assert started["PUT /orphan"] >= arrivals["DELETE /pet/{petId}"]  # its producer never came: runs at the end
+
+
+def test_backward_edges_are_dropped_and_errors_surface():
+    assert dependency_map([("a", "b"), ("b", "a")], ["a", "b"]) == {"b": {"a"}}
+
+    async def stream():
+        for name in ("a", "b"):
+            yield name
+
+    async def execute(name):
+        if name == "a":
+            raise ConnectionError("target down")
+        return name
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(run_pipelined(stream(), execute, {"b": {"a"}}))
@@ -0,0 +1,96 @@
+import logging
+
+import pytest
+
+from openapi_parser import OpenAPIParser
+from schema_resolver import SchemaResolver
+from spec_generator import SyntheticSpecGenerator
+
+
+def _refs(node):
+    if isinstance(node, dict):
+        if "$ref" in node:
+            yield node["$ref"].rsplit("/", 1)[-1]
+        for value in node.values():
+            yield from _refs(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _refs(value)
+
+
+def _closes_cycle(node, ancestors):
+    """True when the resolved graph points back at one of its own ancestors (a closed cycle)."""
+    if not isinstance(node, (dict, list)):
+        return False
+    if any(node is ancestor for ancestor in ancestors):
+        return True
+    children = node.values() if isinstance(node, dict) else node
+    return any(_closes_cycle(child, ancestors + [node]) for child in children)
+
+
+def _keys(node, seen):
+    if isinstance(node, (dict, list)) and id(node) not in seen:
+        seen.add(id(node))
+        keys = set(node) if isinstance(node, dict) else set()
+        for child in (node.values() if isinstance(node, dict) else node):
+            keys |= _keys(child, seen)
+        return keys
+    return set()
+
+
+def test_same_seed_same_spec_and_operation_count_matches():
+    generator = SyntheticSpecGenerator(paths=20, components=12, seed=3)
+    assert generator.generate() == generator.generate() == SyntheticSpecGenerator(paths=20, components=12,
+                                                                                  seed=3).generate()
+    assert SyntheticSpecGenerator(paths=20, components=12, seed=4).generate() != generator.generate()
+
+    for paths, methods in ((7, 1), (20, 2), (9, 4)):
+        sized = SyntheticSpecGenerator(paths=paths, methods_per_path=methods, components=8)
+        parser = OpenAPIParser("<memory>")
+        parser.load_openapi_dict(sized.generate())
+        assert len(parser.extract_api_endpoints()) == sized.operation_count
+
+
+@pytest.mark.parametrize("ref_depth", [0, 1, 4])
+def test_longest_ref_chain_is_ref_depth(ref_depth):
+    schemas = SyntheticSpecGenerator(paths=4, components=15, ref_depth=ref_depth, seed=1).generate()[
+        "components"]["schemas"]
+    depth = {}
+
+    def chain(name):
+        if name not in depth:
+            depth[name] = 1 + max((chain(child) for child in _refs(schemas[name])), default=-1)
+        return depth[name]
+
+    assert max(chain(name) for name in schemas) == ref_depth
+
+
+def test_generated_cycles_resolve_and_write_logs_the_written_spec(tmp_path, caplog):
+    generator = SyntheticSpecGenerator(paths=4, components=8, ref_depth=2, cycle_ratio=1.0, seed=2)
+    spec = generator.generate()
+    schemas = spec["components"]["schemas"]
+    leaf = next(name for name, schema in schemas.items() if "owner" in schema.get("properties", {}))
+    resolved = SchemaResolver(spec).resolve_ref(f"#/components/schemas/{leaf}")
+    assert _closes_cycle(resolved, []) and "$ref" not in _keys(resolved, set())
+    parser = OpenAPIParser("<memory>")
+    parser.load_openapi_dict(spec)
+    assert isinstance(parser.resolve_schema(leaf), dict)  # terminates despite the cycles
+
+    small = SyntheticSpecGenerator(paths=2, methods_per_path=1, components=4).generate()
+    with caplog.at_level(logging.INFO):
+        generator.write(str(tmp_path / "small.json"), small)
+    assert "Wrote 2 operations" in caplog.text
+
+
+def test_one_of_variants_define_the_discriminator_property():
+    schemas = SyntheticSpecGenerator(paths=4, components=30, ref_depth=3, one_of_ratio=0.6, seed=5).generate()[
+        "components"]["schemas"]
+    unions = [schema["properties"]["variant"] for schema in schemas.values()
+              if "variant" in schema.get("properties", {})]
+    assert unions
+    for union in unions:
+        assert union["discriminator"]["propertyName"] == "kind"
+        assert set(union["discriminator"]["mapping"]) == set(_refs(union["oneOf"]))
+        for name in _refs(union["oneOf"]):
+            own = schemas[name]["allOf"][-1] if "allOf" in schemas[name] else schemas[name]
+            assert own["properties"]["kind"] == {"type": "string"} and "kind" in own["required"]
@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from openapi_parser import OpenAPIParser
+from spec_registry import SpecRegistry
+
+ERROR = {"type": "object", "properties": {"code": {"type": "integer"}, "message": {"type": "string"}}}
+
+
+def make_spec(resource):
+    return {
+        "paths": {f"/{resource}": {"get": {"operationId": f"list_{resource}", "responses": {
+            "200": {"description": "ok", "content": {"application/json": {
+                "schema": {"$ref": f"#/components/schemas/{resource.title()}"}}}},
+            "default": {"description": "error", "content": {"application/json": {
+                "schema": {"$ref": "#/components/schemas/Error"}}}}}}}},
+        "components": {"schemas": {
+            "Error": json.loads(json.dumps(ERROR)),
+            resource.title(): {"type": "object", "properties": {"name": {"type": "string"},
+                                                                "error": {"$ref": "#/components/schemas/Error"}}},
+        }},
+    }
+
+
+def make_registry(tmp_path):
+    for resource in ("pets", "orders"):
+        (tmp_path / f"{resource}.json").write_text(json.dumps(make_spec(resource)))
+    registry = SpecRegistry()
+    registry.load_directory(str(tmp_path))
+    return registry
+
+
+def test_identical_components_are_shared_across_specs(tmp_path):
+    registry = make_registry(tmp_path)
+
+    assert registry.names() == ["orders", "pets"]
+    pets_error = registry.get_parser("pets").get_schema("Error")
+    assert pets_error is registry.get_parser("orders").get_schema("Error")
+    assert registry.get_parser("orders").get_schema("Orders")["properties"]["error"] is pets_error
+
+
+def test_endpoints_match_a_standalone_parser(tmp_path):
+    registry = make_registry(tmp_path)
+
+    for name in registry.names():
+        assert registry.get_endpoints(name) == OpenAPIParser(str(tmp_path / f"{name}.json")).get_all_endpoints()
+    assert registry.get_endpoints("pets") is registry.get_endpoints("pets")
+
+
+def test_each_spec_has_its_own_base_url_and_auth(tmp_path):
+    pets, orders = make_spec("pets"), make_spec("orders")
+    pets["servers"] = [{"url": "https://{env}.pets.example/v1/", "variables": {"env": {"default": "api"}}}]
+    pets["components"]["securitySchemes"] = {"key": {"type": "apiKey", "in": "header", "name": "X-Pets-Key"}}
+    orders.update({"swagger": "2.0", "host": "orders.example", "schemes": ["http"], "basePath": "/api"})
+    (tmp_path / "pets.json").write_text(json.dumps(pets))
+    (tmp_path / "orders.json").write_text(json.dumps(orders))
+    (tmp_path / "bare.json").write_text(json.dumps({**make_spec("bare"), "servers": [{"url": "/relative"}]}))
+    registry = SpecRegistry()
+    registry.load_directory(str(tmp_path))
+
+    assert registry.get_base_url("pets") == "https://api.pets.example/v1"
+    assert registry.get_base_url("orders") == "http://orders.example/api"
+    assert registry.get_base_url("bare", "http://localhost:8080") == "http://localhost:8080"
+    with pytest.raises(ValueError, match="bare"):
+        registry.get_base_url("bare")
+
+    provider = registry.get_auth_provider("pets", {"key": {"value": "k"}})
+    assert registry.get_auth_provider("pets") is provider and set(provider.schemes) == {"key"}
+    assert registry.get_auth_provider("orders").schemes == {}
@@ -0,0 +1,89 @@
+import copy
+import json
+
+from openapi_parser import OpenAPIParser
+from spec_reload import SpecReloader
+
+
+def ref(name):
+    return {"$ref": f"#/components/schemas/{name}"}
+
+
+def response(schema):
+    return {"200": {"description": "ok", "content": {"application/json": {"schema": schema}}}}
+
+
+SPEC = {
+    "paths": {
+        "/pets": {"get": {"operationId": "listPets", "responses": response({"type": "array", "items": ref("Pet")})}},
+        "/owners": {"get": {"operationId": "listOwners", "responses": response(ref("Owner"))}},
+        "/stores": {"get": {"operationId": "listStores", "responses": response(ref("Store"))}},
+    },
+    "components": {"schemas": {
+        "Tag": {"type": "object", "properties": {"label": {"type": "string"}}},
+        "Pet": {"type": "object", "properties": {"name": {"type": "string"}, "tag": ref("Tag")}},
+        "Owner": {"type": "object", "properties": {"pets": {"type": "array", "items": ref("Pet")}}},
+        "Store": {"type": "object", "properties": {"city": {"type": "string"}}},
+    }},
+}
+
+
+def make_reloader(tmp_path):
+    spec_file = tmp_path / "api.json"
+    spec_file.write_text(json.dumps(SPEC))
+    reloader = SpecReloader(OpenAPIParser(str(spec_file)))
+    reloader.endpoints
+    return reloader
+
+
+def fresh_endpoints(spec):
+    parser = OpenAPIParser("unused.json")
+    parser.load_openapi_dict(copy.deepcopy(spec))
+    return parser.extract_api_endpoints()
+
+
+def test_changed_component_invalidates_only_its_dependents(tmp_path):
+    reloader = make_reloader(tmp_path)
+    store_endpoint = reloader.endpoints["listStores"]
+    store = reloader.parser.get_schema("Store")
+
+    new = copy.deepcopy(SPEC)
+    new["components"]["schemas"]["Tag"]["properties"]["color"] = {"type": "string", "example": "red"}
+    diff = reloader.reload(new)
+
+    assert sorted(diff.changed) == ["listOwners", "listPets"]
+    assert {pointer for _, pointer in diff.dirty_refs} == {
+        "/components/schemas/Tag", "/components/schemas/Pet", "/components/schemas/Owner"}
+    assert reloader.endpoints["listStores"] is store_endpoint
+    assert reloader.parser.get_schema("Store") is store
+    assert reloader.endpoints["listOwners"]["responses"]["200"]["pets"][0]["tag"]["color"] == "red"
+    assert reloader.endpoints == fresh_endpoints(new)
+
+
+def test_added_removed_and_edited_operations(tmp_path):
+    reloader = make_reloader(tmp_path)
+
+    new = copy.deepcopy(SPEC)
+    del new["paths"]["/stores"]
+    new["paths"]["/pets"]["get"]["parameters"] = [{"name": "limit", "in": "query", "schema": {"type": "integer"}}]
+    new["paths"]["/tags"] = {"get": {"operationId": "listTags", "responses": response(ref("Tag"))}}
+    diff = reloader.reload(new)
+
+    assert (diff.added, diff.removed, diff.changed) == (["listTags"], ["listStores"], ["listPets"])
+    assert not diff.dirty_refs
+    assert list(reloader.endpoints) == list(fresh_endpoints(new))
+    assert reloader.endpoints == fresh_endpoints(new)
+
+
+def test_file_watch_detects_edits(tmp_path):
+    reloader = make_reloader(tmp_path)
+    assert not reloader.changed_files()
+    assert not reloader.reload()
+
+    new = copy.deepcopy(SPEC)
+    new["components"]["schemas"]["Store"]["properties"]["zip"] = {"type": "string"}
+    (tmp_path / "api.json").write_text(json.dumps(new))
+
+    assert reloader.changed_files() == [str(tmp_path / "api.json")]
+    assert reloader.reload().changed == ["listStores"]
+    assert not reloader.changed_files()
@@ -0,0 +1,142 @@
+import asyncio
+
+import pytest
+
+from mock_server import MockAPIServer
+from teardown import ResourceTracker, Teardown, TeardownJournal, infer_delete_routes
+
+ENDPOINTS = {
+    "addOwner": {"method": "POST", "path": "/owner", "responses": {"200": {"id": 1, "name": "ann"}}},
+    "deleteOwner": {"method": "DELETE", "path": "/owner/{ownerId}", "responses": {"200": None}},
+    "addPet": {"method": "POST", "path": "/owner/{ownerId}/pet", "responses": {"200": {"id": 1, "name": "rex"}}},
+    "deletePet": {"method": "DELETE", "path": "/owner/{id}/pet/{petId}", "responses": {"200": None}},
+    "createUser": {"method": "POST", "path": "/user", "responses": {"200": {"code": 200}}},
+    "deleteUser": {"method": "DELETE", "path": "/user/{username}", "responses": {"200": None}},
+    "placeOrder": {"method": "POST", "path": "/store/order", "responses": {"200": {"id": 5}}},
+}
+
+
+def test_delete_routes_are_inferred_with_dependency_levels():
+    routes = infer_delete_routes(ENDPOINTS)
+    assert set(routes) == {"addOwner", "POST /owner", "addPet", "POST /owner/{ownerId}/pet",
+                           "createUser", "POST /user"}  # no DELETE for orders: nothing to track
+    assert routes["addPet"].delete == "DELETE /owner/{id}/pet/{petId}"
+    assert routes["addPet"].parent_parameters == [("ownerId", "id")]
+    assert routes["addPet"].level > routes["addOwner"].level == 0
+
+
+def test_journal_survives_an_interrupted_run(tmp_path):
+    path = str(tmp_path / "teardown.jsonl")
+    journal = TeardownJournal(path)
+    tracker = ResourceTracker(ENDPOINTS, journal)
+
+    owner = tracker.record("addOwner", {"status": 200, "response": '{"ownerId": 7, "id": 70}'})
+    tracker.record("POST /owner/{ownerId}/pet", {"status": 201, "response": b'{"id": 3}'}, params={"ownerId": 7})
+    tracker.record("createUser", {"status": 200, "response": '{"code": 200}'}, payload={"username": "ann"})
+    tracker.record("addOwner", {"status": 500, "response": ""})  # failed creates are not tracked
+    journal.deleted(owner)
+    journal.close()
+    with open(path, "ab") as torn:
+        torn.write(b'{"event": "created", "ke')  # the process died mid-write
+
+    resumed = TeardownJournal(path)
+    assert [(entry["delete"], entry["params"]) for entry in resumed.pending()] == [
+        ("DELETE /owner/{id}/pet/{petId}", {"petId": 3, "id": 7}),
+        ("DELETE /user/{username}", {"username": "ann"}),
+    ]
+    assert resumed.created("DELETE /owner/{ownerId}", {"ownerId": 8}) == 3  # keys are never reused
+    resumed.close()
+    assert len(TeardownJournal(path)) == 3
+
+
+def test_teardown_deletes_children_first_and_compacts(tmp_path):
+    pytest.importorskip("aiohttp")
+    server = MockAPIServer(ENDPOINTS)
+    journal = TeardownJournal(str(tmp_path / "teardown.jsonl"))
+    tracker = ResourceTracker(ENDPOINTS, journal)
+    deletes, respond = [], server._respond
+
+    def record_deletes(method, path, payload):
+        if method == "DELETE":
+            deletes.append(path)
+        return respond(method, path, payload)
+
+    async def main():
+        async with server:
+            server._respond = record_deletes  # the order requests arrive in
+            for _ in range(5):
+                status, owner = server.respond("POST", "/owner", {})
+                tracker.record("addOwner", {"status": status, "response": owner})
+                status, pet = server.respond("POST", f"/owner/{owner['id']}/pet", {})
+                tracker.record("addPet", {"status": status, "response": pet}, params={"ownerId": owner["id"]})
+            journal.created("DELETE /owner/{ownerId}", {"ownerId": 999})  # already gone: 404 counts as done
+            return await Teardown(server.base_url, journal=journal, concurrency=4, retries=1, backoff=0.01).run()
+
+    summary = asyncio.run(main())
+    assert summary == {"deleted": 10, "gone": 1, "failed": 0, "pending": 0}
+    assert len(journal) == 0 and not server.resources["/owner"]
+    assert server.request_counts["DELETE /owner/{id}/pet/{petId}"] == 5
+    for path in deletes:
+        if "/pet/" in path:  # every pet goes before its owner
+            owner = path.split("/pet/")[0]
+            assert deletes.index(path) < deletes.index(owner)
+    assert len(deletes) == 11 and all("/pet/" in path for path in deletes[:5])
+
+
+def test_sessions_tear_down_only_their_own_journal(tmp_path, monkeypatch):
+    pytest.importorskip("aiohttp")
+    from teardown import main
+
+    server = MockAPIServer(ENDPOINTS)
+    base_url = server.start_in_thread()
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "teardown").mkdir()
+    sessions = [TeardownJournal(str(tmp_path / "teardown" / f"session-{name}.jsonl")) for name in "ab"]
+    try:
+        for journal in sessions:
+            for _ in range(2):
+                status, owner = server.respond("POST", "/owner", {})
+                ResourceTracker(ENDPOINTS, journal).record("addOwner", {"status": status, "response": owner})
+        first = asyncio.run(Teardown(base_url, journal=sessions[0]).run())
+        assert first["deleted"] == 2 and len(server.resources["/owner"]) == 2  # session b is still running
+        sessions[1].close()
+        assert main(["--base-url", base_url]) == 0  # resumes every leftover teardown/*.jsonl
+    finally:
+        server.stop_thread()
+    assert not server.resources["/owner"] and not list((tmp_path / "teardown").iterdir())
+
+
+def test_cli_teardown_signs_deletes_with_the_spec_credentials(tmp_path):
+    pytest.importorskip("aiohttp")
+    import json
+
+    from teardown import main
+
+    spec = {"components": {"securitySchemes": {"key": {"type": "apiKey", "in": "query", "name": "api_key"}}},
+            "security": [{"key": []}], "paths": {}}
+    (tmp_path / "spec.json").write_text(json.dumps(spec))
+    (tmp_path / "credentials.yaml").write_text("key: {value: s3cret}\n")
+    server = MockAPIServer(ENDPOINTS)
+    handle = server.handle
+
+    async def protected(method, target, body=b""):
+        if "api_key=s3cret" not in target:
+            return 401, {"code": 401, "message": "Unauthorized"}
+        return await handle(method, target, body)
+
+    server.handle = protected
+    base_url = server.start_in_thread()
+    path = str(tmp_path / "teardown.jsonl")
+    journal = TeardownJournal(path)
+    for _ in range(3):
+        status, owner = server.respond("POST", "/owner", {})
+        journal.created("DELETE /owner/{ownerId}", {"ownerId": owner["id"]})
+    journal.close()
+    try:
+        assert main([path, "--base-url", base_url, "--retries", "0"]) == 1  # unsigned: all rejected
+        assert len(server.resources["/owner"]) == 3
+        assert main([path, "--base-url", base_url, "--spec", str(tmp_path / "spec.json"),
+                     "--credentials", str(tmp_path / "credentials.yaml")]) == 0
+    finally:
+        server.stop_thread()
+    assert not server.resources["/owner"]
@@ -0,0 +1,147 @@
+import asyncio
+import json
+
+import pytest
+
+from mock_server import MockAPIServer
+from request_template import PreparedRequest
+from traffic_recorder import Recording, TrafficRecorder, TrafficReplayer
+
+ENDPOINTS = {
+    "addPet": {"method": "POST", "path": "/pet", "responses": {"200": {"id": 1, "name": "doggie"}}},
+    "getPetById": {"method": "GET", "path": "/pet/{petId}", "responses": {"200": {"id": 1, "name": "doggie"}}},
+}
+
+
+def test_recording_round_trip_retargets_and_redacts(tmp_path):
+    path = str(tmp_path / "run.jsonl.gz")
+    with TrafficRecorder(path, "http://staging:8080/v2/") as recorder:
+        recorder.record("POST /pet", PreparedRequest("POST", "http://staging:8080/v2/pet",
+                                                     {"Authorization": "Bearer s3cret", "X-Trace": "1"},
+                                                     b'{"name":"rex","seed":0.4142}'), virtual_user=3)
+        recorder.record("PUT /upload", PreparedRequest("PUT", "http://elsewhere/upload", {}, b"\xff\x00"))
+
+    recording = Recording(path)
+    assert recording.header["base_url"] == "http://staging:8080/v2"
+    (t1, api1, pet), (t2, api2, upload) = recording.entries("http://build-42:9000")
+    assert 0 <= t1 <= t2 and (api1, api2) == ("POST /pet", "PUT /upload")
+    assert pet == PreparedRequest("POST", "http://build-42:9000/pet", {"X-Trace": "1"}, b'{"name":"rex","seed":0.4142}')
+    assert upload.url == "http://elsewhere/upload" and upload.body == b"\xff\x00"  # absolute URLs are kept
+    assert [request.url for _, _, request in recording][0] == "http://staging:8080/v2/pet"
+
+    spec = {"swagger": "2.0", "securityDefinitions": {"api_key": {"type": "apiKey", "in": "header", "name": "api_key"},
+                                                      "q": {"type": "apiKey", "in": "query", "name": "token"}}}
+    keyed = str(tmp_path / "keyed.jsonl")
+    with TrafficRecorder(keyed, "http://staging", spec=spec) as recorder:  # a static header, not signed by auth
+        recorder.record("GET /pet/1", PreparedRequest("GET", "http://staging/pet/1", {"api_key": "s3cret",
+                                                                                      "token": "t"}, None))
+    assert recorder.redact >= {"authorization", "api_key"} and "token" not in recorder.redact
+    assert next(iter(Recording(keyed)))[2].headers == {"token": "t"}
+
+
+def _write_recording(path, count, spacing_ms):
+    lines = [{"version": 1, "base_url": "http://recorded", "started": 0}]
+    for i in range(count):
+        lines.append({"t": i * spacing_ms, "api": "POST /pet", "method": "POST", "url": "/pet",
+                      "headers": {"Content-Type": "application/json"}, "body": json.dumps({"name": f"pet{i}"})})
+    path.write_text("".join(json.dumps(line) + "\n" for line in lines))
+    return str(path)
+
+
+def test_replay_keeps_inter_arrival_times_and_payloads(tmp_path):
+    pytest.importorskip("aiohttp")
+    recording = _write_recording(tmp_path / "run.jsonl", 20, 10)  # 190ms of traffic
+
+    async def replay(speed):
+        server = MockAPIServer(ENDPOINTS)
+        async with server:
+            summary = await TrafficReplayer(recording, server.base_url, speed=speed).run()
+        return summary, server
+
+    original, server = asyncio.run(replay(1))
+    accelerated, _ = asyncio.run(replay(4))
+    flat_out, _ = asyncio.run(replay(0))
+
+    assert original["statuses"] == {200: 20} and original["errors"] == 0
+    assert sorted(pet["name"] for pet in server.resources["/pet"].values()) == sorted(f"pet{i}" for i in range(20))
+    assert original["duration_s"] >= 0.19 and accelerated["duration_s"] < original["duration_s"]
+    assert accelerated["duration_s"] >= 0.19 / 4 and original["lag"]["count"] == 20
+    assert flat_out["lag"] is None and flat_out["requests"] == 20
+
+
+def test_executor_records_unsigned_requests(tmp_path):
+    pytest.importorskip("aiohttp")
+    from auth_provider import AuthProvider
+    from executor import execute_api
+
+    path = str(tmp_path / "run.jsonl")
+    auth = AuthProvider({"bearer": {"type": "http", "scheme": "bearer"}}, {"bearer": {"token": "s3cret"}})
+    server = MockAPIServer(ENDPOINTS)
+
+    async def main():
+        async with server:
+            with TrafficRecorder(path, server.base_url) as recorder:
+                await execute_api(server.base_url, "POST /pet", ENDPOINTS["addPet"], {}, payload={"name": "llm-42"},
+                                  auth=auth, recorder=recorder)
+                await execute_api(server.base_url, "GET /pet/{petId}", ENDPOINTS["getPetById"], {},
+                                  params={"petId": 1}, auth=auth, recorder=recorder)
+
+    asyncio.run(main())
+    with open(path) as recorded:
+        text = recorded.read()
+    assert "s3cret" not in text and "llm-42" in text  # credentials are added after recording
+    assert [(api, request.url) for _, api, request in Recording(path)] == [
+        ("POST /pet", f"{server.base_url}/pet"), ("GET /pet/{petId}", f"{server.base_url}/pet/1")]
+
+
+def test_recorded_offsets_follow_the_rate_limiter(tmp_path):
+    pytest.importorskip("aiohttp")
+    from executor import execute_api
+    from rate_limiter import RateLimiter
+
+    path = str(tmp_path / "run.jsonl")
+    server = MockAPIServer(ENDPOINTS)
+    limiter = RateLimiter(20, burst=1)  # one request every 50ms
+
+    async def main():
+        async with server:
+            with TrafficRecorder(path, server.base_url) as recorder:
+                await asyncio.gather(*[execute_api(server.base_url, "POST /pet", ENDPOINTS["addPet"], {}, limiter,
+                                                   payload={"name": f"pet{i}"}, recorder=recorder)
+                                       for i in range(5)])
+
+    asyncio.run(main())
+    offsets = [t for t, _, _ in Recording(path)]
+    assert len(offsets) == 5
+    assert all(later - earlier >= 40 for earlier, later in zip(offsets, offsets[1:]))  # not one prepared burst
+
+
+def test_replay_cli_signs_requests_with_the_spec_credentials(tmp_path, capsys):
+    pytest.importorskip("aiohttp")
+    from traffic_recorder import main
+
+    recording = _write_recording(tmp_path / "run.jsonl", 3, 0)
+    (tmp_path / "spec.json").write_text(json.dumps({
+        "components": {"securitySchemes": {"key": {"type": "apiKey", "in": "query", "name": "api_key"}}},
+        "security": [{"key": []}], "paths": {}}))
+    (tmp_path / "credentials.yaml").write_text("key: {value: s3cret}\n")
+    server = MockAPIServer(ENDPOINTS)
+    handle = server.handle
+
+    async def protected(method, target, body=b""):
+        if "api_key=s3cret" not in target:
+            return 401, {"code": 401, "message": "Unauthorized"}
+        return await handle(method, target, body)
+
+    server.handle = protected
+    base_url = server.start_in_thread()
+    try:
+        main([recording, "--base-url", base_url, "--speed", "0"])
+        unsigned = json.loads(capsys.readouterr().out)
+        main([recording, "--base-url", base_url, "--speed", "0", "--header", "X-Replay: 1",
+              "--spec", str(tmp_path / "spec.json"), "--credentials", str(tmp_path / "credentials.yaml")])
+        signed = json.loads(capsys.readouterr().out)
+    finally:
+        server.stop_thread()
+    assert unsigned["statuses"] == {"401": 3} and signed["statuses"] == {"200": 3}
+    assert len(server.resources["/pet"]) == 3
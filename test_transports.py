@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from mock_server import MockAPIServer
+from request_tracing import RequestTracer
+from transports import HTTP2Transport, Transport, Transports
+
+ENDPOINTS = {
+    "addPet": {"method": "POST", "path": "/pet", "responses": {"200": {"id": 1, "name": "doggie"}}},
+    "getPetById": {"method": "GET", "path": "/pet/{petId}", "responses": {"200": {"id": 1, "name": "doggie"}}},
+}
+
+
+def test_transport_is_selected_per_base_url():
+    h2 = HTTP2Transport()
+    transports = Transports({"https://api.example.com": "http2", "https://api.example.com/legacy": "http1",
+                             "http://mock:8080/": h2})
+    assert isinstance(transports.for_url("https://api.example.com/v2"), HTTP2Transport)
+    assert transports.for_url("https://api.example.com/legacy") is None  # the aiohttp HTTP/1.1 session
+    assert transports.for_url("https://api.example.com.evil") is None
+    assert transports.for_url("http://mock:8080") is h2
+    assert transports.for_url("https://api.example.com/v2") is transports.for_url("https://api.example.com/v2")
+    assert Transports(default="h2c").for_url("http://other").prior_knowledge
+    with pytest.raises(ValueError):
+        Transports({"http://x": "spdy"})
+    with pytest.raises(TypeError):
+        Transport()  # send is abstract
+
+
+def test_http2_multiplexes_concurrent_requests_over_one_connection():
+    pytest.importorskip("httpx")
+    pytest.importorskip("h2")
+    pytest.importorskip("aiohttp")
+    from executor import execute_api
+
+    server = MockAPIServer(ENDPOINTS)
+    tracer = RequestTracer()
+    transport = HTTP2Transport(max_connections=1, prior_knowledge=True)
+
+    async def main():
+        async with server:
+            created = await execute_api(server.base_url, "POST /pet", ENDPOINTS["addPet"], {}, payload={"name": "a"},
+                                        tracer=tracer, transport=transport)
+            reads = await asyncio.gather(*[
+                execute_api(server.base_url, "GET /pet/{petId}", ENDPOINTS["getPetById"], {}, params={"petId": 1},
+                            tracer=tracer, transport=transport) for _ in range(50)])
+            await transport.close()
+            return created, reads
+
+    created, reads = asyncio.run(main())
+    assert created["status"] == 200 and created["protocol"] == "HTTP/2"
+    assert {(r["status"], r["protocol"]) for r in reads} == {(200, "HTTP/2")}
+    assert '"name":"a"' in reads[0]["response"].replace(" ", "")
+    assert server.connections_opened == 1  # 51 requests, one socket
+    assert created["timings"]["connect_ms"] > 0 and not created["timings"]["reused_connection"]
+    assert tracer.summary()["*"]["total"]["count"] == 51  # same histograms as the HTTP/1.1 path
+
+
+def test_http1_and_http2_results_have_the_same_shape():
+    pytest.importorskip("httpx")
+    pytest.importorskip("h2")
+    pytest.importorskip("aiohttp")
+    from executor import execute_api
+
+    server = MockAPIServer(ENDPOINTS)
+
+    async def main():
+        async with server:
+            h2 = HTTP2Transport(prior_knowledge=True)
+            results = [await execute_api(server.base_url, "GET /pet/{petId}", ENDPOINTS["getPetById"], {},
+                                         params={"petId": 9}, tracer=RequestTracer(), transport=transport)
+                       for transport in (None, h2)]
+            await h2.close()
+            return results
+
+    http1, http2 = asyncio.run(main())
+    assert (http1["protocol"], http2["protocol"]) == ("HTTP/1.1", "HTTP/2")
+    assert http1.keys() == http2.keys() and http1["timings"].keys() == http2["timings"].keys()
+    assert (http1["status"], http1["response"]) == (http2["status"], http2["response"]) == \
+        (404, http1["response"])
@@ -0,0 +1,241 @@
+import argparse
+import asyncio
+import base64
+import gzip
+import logging
+import sys
+import threading
+import time
+from time import perf_counter_ns
+
+import json_codec
+from auth_provider import AuthProvider, add_auth_arguments, auth_from_args
+from histogram import LatencyHistogram
+from request_template import PreparedRequest
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+FORMAT_VERSION = 1
+REDACTED_HEADERS = ("authorization", "cookie", "proxy-authorization", "x-api-key")
+
+
+def spec_secret_headers(spec: dict) -> tuple:
+    """Headers the spec's apiKey schemes put a key in, e.g. petstore's `api_key`."""
+    schemes = AuthProvider.security_from_spec(spec)["schemes"]
+    return tuple(scheme["name"] for scheme in schemes.values()
+                 if scheme.get("type") == "apiKey" and scheme.get("in", "header") == "header" and "name" in scheme)
+
+
+def _open(path: str, mode: str):
+    return gzip.open(path, mode, compresslevel=6) if path.endswith(".gz") else open(path, mode)
+
+
+class TrafficRecorder:
+    """
+    Records every executed request as one JSON line (gzip-compressed for `.gz` paths).
+
+    The first line is a header (`base_url`, wall-clock start); each request line holds its
+    send offset `t` in ms, the operation, method, URL path (relative to `base_url`), headers
+    and the resolved body, exactly as sent, so LLM payloads and random values are replayed
+    unchanged. Requests are recorded before an `AuthProvider` signs them, and the
+    `redact` headers are dropped, so no credentials end up in the file. With the OpenAPI
+    `spec`, the headers of its apiKey schemes are dropped too, whatever their name.
+    """
+
+    def __init__(self, path: str, base_url: str = "", redact=REDACTED_HEADERS, flush_every: int = 1000,
+                 spec: dict = None):
+        self.path = path
+        self.base_url = base_url.rstrip("/")
+        self.redact = {header.lower() for header in (*redact, *(spec_secret_headers(spec) if spec else ()))}
+        self.flush_every = flush_every
+        self.recorded = 0
+        self._lock = threading.Lock()
+        self._file = _open(path, "wb")
+        self._started = perf_counter_ns()
+        self._write({"version": FORMAT_VERSION, "base_url": self.base_url, "started": time.time()})
+
+    def _write(self, entry: dict):
+        self._file.write(json_codec.dumps(entry) + b"\n")
+
+    def record(self, api_name: str, request: PreparedRequest, virtual_user: int = -1):
+        offset_ms = (perf_counter_ns() - self._started) / 1e6
+        url = request.url
+        if self.base_url and url.startswith(self.base_url):
+            url = url[len(self.base_url):]
+        entry = {"t": round(offset_ms, 3), "api": api_name, "method": request.method, "url": url,
+                 "headers": {name: value for name, value in request.headers.items() if name.lower() not in self.redact}}
+        if virtual_user >= 0:
+            entry["vu"] = virtual_user
+        if request.body is not None:
+            try:
+                entry["body"] = request.body.decode("utf-8")
+            except UnicodeDecodeError:
+                entry["body_b64"] = base64.b64encode(request.body).decode("ascii")
+        with self._lock:
+            self._write(entry)
+            self.recorded += 1
+            if self.recorded % self.flush_every == 0:
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                logging.info(f"📼 Recorded {self.recorded} requests to {self.path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class Recording:
+    """A recorded run, streamed from disk: `header` plus `(offset_ms, api_name, PreparedRequest)` entries."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with _open(path, "rb") as recording:
+            first = recording.readline()
+        self.header = json_codec.loads(first) if first.strip() else {"base_url": ""}
+        if self.header.get("version", FORMAT_VERSION) > FORMAT_VERSION:
+            raise ValueError(f"{path} was recorded by a newer version (format {self.header['version']})")
+
+    def __iter__(self):
+        return self.entries()
+
+    def entries(self, base_url: str = None):
+        """Yields entries in send order; `base_url` retargets them (e.g. at another build)."""
+        base_url = (base_url if base_url is not None else self.header.get("base_url", "")).rstrip("/")
+        with _open(self.path, "rb") as recording:
+            recording.readline()
+            for line in recording:
+                if not line.strip():
+                    continue
+                entry = json_codec.loads(line)
+                body = entry.get("body")
+                if body is not None:
+                    body = body.encode("utf-8")
+                elif "body_b64" in entry:
+                    body = base64.b64decode(entry["body_b64"])
+                url = entry["url"]
+                if url.startswith("/"):
+                    url = base_url + url
+                yield entry["t"], entry["api"], PreparedRequest(entry["method"], url, entry["headers"], body)
+
+
+class TrafficReplayer:
+    """
+    Re-issues a `Recording` over one pooled session (or `transport`).
+
+    `speed=1` keeps the original inter-arrival times, `speed=N` compresses them N times
+    and `speed=0` sends as fast as `max_in_flight` allows. The schedule is open-loop: a
+    slow target does not slow the arrivals down, up to `max_in_flight` outstanding
+    requests; how late requests went out is reported as `lag`. Pass a `RequestTracer`
+    and a `ResultSink` to compare the replay against other builds with `run_compare`.
+
+    Credentials are never recorded: pass an `AuthProvider` as `auth`, or static `headers`
+    (e.g. an API key) that are added to every replayed request.
+    """
+
+    def __init__(self, recording, base_url: str = None, speed: float = 1.0, max_in_flight: int = 1000,
+                 rate_limiter=None, tracer=None, sink=None, auth=None, transport=None, validator=None,
+                 headers: dict = None):
+        self.recording = recording if isinstance(recording, Recording) else Recording(recording)
+        self.base_url = base_url
+        self.speed = speed
+        self.max_in_flight = max_in_flight
+        self.rate_limiter = rate_limiter
+        self.tracer = tracer
+        self.sink = sink
+        self.auth = auth
+        self.transport = transport
+        self.validator = validator
+        self.headers = headers or {}
+
+    async def run(self) -> dict:
+        """Returns `{"requests", "errors", "statuses", "duration_s", "rps", "lag": histogram summary in ms}`."""
+        import aiohttp
+        from executor import execute_prepared
+
+        statuses, errors, lag = {}, [0], LatencyHistogram()
+        slots = asyncio.Semaphore(self.max_in_flight)
+        loop = asyncio.get_running_loop()
+        tasks = set()
+
+        async def send(session, api_name, request):
+            try:
+                result = await execute_prepared(request, api_name, self.rate_limiter, session,
+                                                validator=self.validator, tracer=self.tracer, sink=self.sink,
+                                                auth=self.auth, transport=self.transport)
+                statuses[result["status"]] = statuses.get(result["status"], 0) + 1
+            except Exception as e:
+                errors[0] += 1
+                logging.warning(f"⚠️ Replayed {api_name} failed: {e}")
+            finally:
+                slots.release()
+
+        trace_configs = [self.tracer.trace_config()] if self.tracer and self.transport is None else None
+        connector = aiohttp.TCPConnector(limit=self.max_in_flight)  # the pool must not cap the schedule
+        async with aiohttp.ClientSession(connector=connector, trace_configs=trace_configs) as session:
+            started = loop.time()
+            count = 0
+            for offset_ms, api_name, request in self.recording.entries(self.base_url):
+                if self.headers:
+                    request = request._replace(headers={**request.headers, **self.headers})
+                if self.speed > 0:
+                    due = started + offset_ms / 1000 / self.speed
+                    delay = due - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                await slots.acquire()
+                if self.speed > 0:
+                    lag.record(max(0, int((loop.time() - due) * 1e9)))
+                task = loop.create_task(send(session, api_name, request))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                count += 1
+            if tasks:
+                await asyncio.gather(*tasks)
+            duration = loop.time() - started
+
+        summary = {"requests": count, "errors": errors[0], "statuses": statuses, "duration_s": round(duration, 3),
+                   "rps": round(count / duration, 1) if duration > 0 else 0.0,
+                   "lag": lag.summary() if lag.count else None}
+        logging.info(f"📼 Replayed {count} requests in {duration:.2f}s ({summary['rps']} req/s, {errors[0]} errors)")
+        return summary
+
+
+def main(argv=None):
+    cli = argparse.ArgumentParser(description="Replay recorded traffic at the original or an accelerated rate.")
+    cli.add_argument("recording", help="A .jsonl or .jsonl.gz traffic recording")
+    cli.add_argument("--base-url", help="Target to replay against (defaults to the recorded one)")
+    cli.add_argument("--speed", type=float, default=1.0,
+                     help="1 = original timing, 4 = 4x faster, 0 = as fast as possible")
+    cli.add_argument("--max-in-flight", type=int, default=1000)
+    cli.add_argument("--results", help="Write one row per replayed request (.csv/.parquet/.arrow) for run_compare")
+    cli.add_argument("--header", action="append", default=[], help="'Name: value' added to every request")
+    add_auth_arguments(cli)
+    args = cli.parse_args(argv)
+
+    from request_tracing import RequestTracer
+    from result_sink import ResultSink
+
+    headers = dict(header.split(":", 1) for header in args.header)
+    headers = {name.strip(): value.strip() for name, value in headers.items()}
+    sink = ResultSink(args.results) if args.results else None
+    try:
+        replayer = TrafficReplayer(args.recording, args.base_url, args.speed, args.max_in_flight,
+                                   tracer=RequestTracer(), sink=sink, auth=auth_from_args(args), headers=headers)
+        summary = asyncio.run(replayer.run())
+    finally:
+        if sink is not None:
+            sink.close()
+    print(json_codec.dumps(summary).decode("utf-8"))
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
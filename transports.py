@@ -0,0 +1,143 @@
+import abc
+import logging
+from time import perf_counter_ns
+from typing import NamedTuple
+
+from request_tracing import RequestTimings
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+TRANSPORTS = ("http1", "http2", "h2c")
+
+
+class TransportResponse(NamedTuple):
+    status: int
+    headers: dict
+    body: bytes
+    protocol: str  # "HTTP/1.1", "HTTP/2"
+
+
+class Transport(abc.ABC):
+    """
+    Sends a `PreparedRequest` and returns a `TransportResponse` with the body fully read.
+
+    Implementations fill the `RequestTimings` they are given (when not None) so results,
+    `RequestTracer` histograms and live metrics look the same whatever the protocol. The
+    built-in HTTP/1.1 path is the executor's aiohttp session and needs no transport.
+    """
+
+    protocol = "HTTP/1.1"
+
+    @abc.abstractmethod
+    async def send(self, request, timings: RequestTimings = None) -> TransportResponse:
+        """Sends one request; the whole body is read before returning."""
+
+    async def close(self):
+        pass
+
+
+class HTTP2Transport(Transport):
+    """
+    HTTP/2 over httpx (`pip install httpx[http2]`): concurrent requests to a host are
+    multiplexed as streams over at most `max_connections` connections instead of one
+    socket each.
+
+    `https` targets negotiate h2 through ALPN (falling back to HTTP/1.1 if the server
+    refuses); `prior_knowledge=True` speaks cleartext h2c to `http` targets, e.g. the mock
+    server. Timings come from httpcore trace events: there is no separate DNS event, so
+    `connect` includes name resolution, and the TLS handshake as for aiohttp.
+    """
+
+    protocol = "HTTP/2"
+
+    def __init__(self, max_connections: int = 4, prior_knowledge: bool = False, timeout: float = 30.0,
+                 verify=True):
+        self.max_connections = max_connections
+        self.prior_knowledge = prior_knowledge
+        self.timeout = timeout
+        self.verify = verify
+        self._client = None
+
+    def client(self):
+        if self._client is None:
+            try:
+                import httpx
+            except ImportError as error:
+                raise ImportError("The HTTP/2 transport needs httpx with h2: pip install 'httpx[http2]'") from error
+            limits = httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+            self._client = httpx.AsyncClient(http1=not self.prior_knowledge, http2=True, limits=limits,
+                                             timeout=self.timeout, verify=self.verify)
+        return self._client
+
+    async def send(self, request, timings: RequestTimings = None) -> TransportResponse:
+        extensions = {"trace": _tracer(timings)} if timings is not None else None
+        if timings is not None:
+            timings.start = perf_counter_ns()
+            timings.reused = True  # until a connect event says otherwise
+            timings.tls = request.url.startswith("https")
+        response = await self.client().request(request.method, request.url, content=request.body,
+                                               headers=request.headers, extensions=extensions)
+        return TransportResponse(response.status_code, response.headers, response.content, response.http_version)
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+def _tracer(timings):
+    async def trace(event, info):
+        # e.g. "connection.connect_tcp.started", "http2.receive_response_headers.complete"
+        now = perf_counter_ns()
+        if event == "connection.connect_tcp.started":
+            timings.connect_start, timings.reused = now, False
+        elif event in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+            timings.connect_end = now
+        elif event.endswith(".send_request_headers.complete") or event.endswith(".send_request_body.complete"):
+            timings.sent = now
+        elif event.endswith(".receive_response_headers.complete"):
+            timings.response_start = now
+    return trace
+
+
+def create_transport(name: str) -> Transport:
+    """`"http1"` (None: use the aiohttp session), `"http2"` (ALPN) or `"h2c"` (cleartext, prior knowledge)."""
+    if name not in TRANSPORTS:
+        raise ValueError(f"Unknown transport '{name}'; expected one of {TRANSPORTS}")
+    if name == "http1":
+        return None
+    return HTTP2Transport(prior_knowledge=name == "h2c")
+
+
+class Transports:
+    """
+    Picks the transport for each base URL: the longest matching prefix in `routes`
+    (base URL -> transport name or `Transport`), else `default`. `None` means the caller's
+    aiohttp HTTP/1.1 session.
+    """
+
+    def __init__(self, routes: dict = None, default="http1"):
+        self.routes = sorted(((prefix.rstrip("/"), self._resolve(transport)) for prefix, transport in
+                              (routes or {}).items()), key=lambda route: -len(route[0]))
+        self.default = self._resolve(default)
+        self._cache = {}  # base URL -> transport
+
+    @staticmethod
+    def _resolve(transport):
+        return create_transport(transport) if isinstance(transport, str) else transport
+
+    def for_url(self, url: str):
+        if url in self._cache:
+            return self._cache[url]
+        selected = self.default
+        for prefix, transport in self.routes:
+            if url.startswith(prefix) and url[len(prefix):len(prefix) + 1] in ("", "/", "?"):
+                selected = transport
+                break
+        self._cache[url] = selected
+        return selected
+
+    async def close(self):
+        for transport in {id(t): t for t in [self.default, *(t for _, t in self.routes)] if t is not None}.values():
+            await transport.close()
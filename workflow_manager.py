@@ -2,6 +2,7 @@ import asyncio
 import logging
 from langgraph.graph import StateGraph
 from api_executor import APIExecutor
+import profiler
 from pydantic import BaseModel
 from typing import Dict, Optional
 
@@ -54,4 +55,5 @@ class APIWorkflowManager:
         async def execute_graph(state: APIExecutionState):
             return await self.state_graph.execute(state)  # ✅ Executes workflow correctly
 
-        return await execute_graph(APIExecutionState())  # ✅ Correctly initializes the state
+        with profiler.span("workflow"):  # LangGraph overhead is this stage's self time
+            return await execute_graph(APIExecutionState())  # ✅ Correctly initializes the state